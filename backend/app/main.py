@@ -1,11 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import game
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up regenerated cache files without restarting the workers
+    game.nba_service.start_cache_watcher()
+    yield
+    # Write player details fetched since the last background flush
+    game.nba_service.shutdown()
+
 app = FastAPI(
     title="NBA Wordle API",
     description="Backend API for NBA Wordle game",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for frontend
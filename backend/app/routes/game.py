@@ -1,11 +1,20 @@
 """
 Game Routes - API endpoints for NBA Wordle game
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+import hmac
+import json
+import os
+from fastapi import APIRouter, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Optional, Dict
 from app.services.nba_data import NBADataService
+from app.services.retry import deadline_scope
 from app.services.wordle_engine import WordleEngine
+from app.services.player_index import normalize_name
+from app.services.caching import VersionedLRUCache
+from app.services.player_record import Player, GUESSED_PLAYER_FIELDS
 
 router = APIRouter()
 
@@ -13,6 +22,10 @@ router = APIRouter()
 games: Dict[str, WordleEngine] = {}
 nba_service = NBADataService()
 
+# Ready-to-send JSON bodies for /player-search, keyed by season, normalized query,
+# limit, modes and filters. Cleared whenever the service re-indexes players.
+search_response_cache = VersionedLRUCache(max_entries=4096, max_weight=8 * 1024 * 1024, weigher=len)
+
 
 class StartGameResponse(BaseModel):
     game_id: str
@@ -26,6 +39,21 @@ class PlayerSearchResult(BaseModel):
     image_url: Optional[str] = None
 
 
+_search_results_adapter = TypeAdapter(List[PlayerSearchResult])
+
+
+class RosterBundleInfo(BaseModel):
+    season: str
+    version: str
+    player_count: int
+    url: str
+
+
+class ReloadResponse(BaseModel):
+    reloaded: bool
+    data_version: int
+
+
 class GuessRequest(BaseModel):
     game_id: str
     player_id: int
@@ -59,8 +87,9 @@ async def start_game():
         # Hardcode to 2025-26 season
         season = "2025-26"
         
-        # Service will automatically fall back to cache if API fails
-        target_player = nba_service.get_random_player(season)
+        # Service will automatically fall back to cache if API fails (or runs out of time)
+        with deadline_scope(nba_service.request_deadline_seconds):
+            target_player = await nba_service.aget_random_player(season)
         game_engine = WordleEngine(target_player, season)
         
         # Generate simple game ID (in production, use UUID)
@@ -80,18 +109,216 @@ async def start_game():
 
 
 @router.get("/player-search", response_model=List[PlayerSearchResult])
-async def search_players(q: str, limit: int = 20):
-    """Search for players by name"""
-    if not q or len(q) < 2:
-        return []
+async def search_players(
+    q: str = "",
+    limit: int = 20,
+    fuzzy: bool = False,
+    phonetic: bool = False,
+    team: Optional[str] = None,
+    conference: Optional[str] = None,
+    division: Optional[str] = None,
+    position: Optional[str] = None,
+    age_min: Optional[int] = None,
+    age_max: Optional[int] = None,
+    height_min: Optional[int] = None,
+    height_max: Optional[int] = None,
+    ppg_min: Optional[float] = None,
+    ppg_max: Optional[float] = None
+):
+    """
+    Search for players by name
+    
+    fuzzy=true also returns close misspellings, phonetic=true names that sound alike.
+    Optional filters: team (abbreviation or name), conference, division, position
+    group (guard/forward/center), and age, height (inches) and ppg ranges. With a
+    filter, q may be empty to list every matching player.
+    """
+    filters = {
+        'team': team,
+        'conference': conference,
+        'division': division,
+        'position': position,
+        'age_min': age_min,
+        'age_max': age_max,
+        'height_min': height_min,
+        'height_max': height_max,
+        'ppg_min': ppg_min,
+        'ppg_max': ppg_max
+    }
+    try:
+        # Hardcode to 2025-26 season; loading it may hit nba_api, so do that off the event loop
+        with deadline_scope(nba_service.request_deadline_seconds):
+            await nba_service.aget_season_data("2025-26")
+        body = _search_response_body(q, limit, fuzzy, phonetic, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Search failed: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+    return Response(content=body, media_type="application/json")
+
+
+def _search_response_body(q: str, limit: int, fuzzy: bool, phonetic: bool,
+                          filters: Optional[Dict] = None) -> bytes:
+    """Serialized search results, from the response cache when possible"""
+    active_filters = tuple(sorted((key, value) for key, value in (filters or {}).items() if value is not None))
+    if not active_filters and (not q or len(q) < 2):
+        return b"[]"
+    
+    # Hardcode to 2025-26 season
+    season = "2025-26"
+    cache_key = (season, normalize_name(q), limit, fuzzy, phonetic, active_filters)
+    
+    # Load (and index) the season first so the version below covers it
+    nba_service.get_search_index(season)
+    data_version = nba_service.data_version
+    search_response_cache.sync(data_version)
+    body = search_response_cache.get(cache_key)
+    if body is not None:
+        # Cache hit: skip the service call and model validation entirely
+        return body
+    
+    results = nba_service.search_players(
+        q, limit, season, fuzzy=fuzzy, phonetic=phonetic,
+        filters=dict(active_filters) if active_filters else None
+    )
+    body = _search_results_adapter.dump_json([PlayerSearchResult(**r) for r in results])
+    
+    # Don't cache results computed from data that a hot reload has since replaced
+    if nba_service.data_version == data_version:
+        search_response_cache.set(cache_key, body)
+    return body
+
+
+@router.websocket("/ws/player-search")
+async def player_search_socket(websocket: WebSocket):
+    """
+    Autocomplete over a WebSocket
+    
+    The client sends one JSON message per keystroke, e.g.
+    {"id": 3, "q": "lebr", "limit": 10, "fuzzy": false, "phonetic": false, "filters": {...}},
+    and receives {"id": 3, "q": "lebr", "results": [...]}. A new message cancels
+    the previous query if it hasn't been answered yet, so only the latest
+    keystroke gets a reply.
+    """
+    await websocket.accept()
+    pending: Optional[asyncio.Task] = None
+    try:
+        while True:
+            message = await websocket.receive_text()
+            if pending and not pending.done():
+                pending.cancel()
+            pending = asyncio.create_task(_answer_socket_search(websocket, message))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if pending and not pending.done():
+            pending.cancel()
+
+
+async def _answer_socket_search(websocket: WebSocket, message: str):
+    """Run one WebSocket search and send the result unless a newer query superseded it"""
+    request_id = None
+    try:
+        request = json.loads(message)
+        if not isinstance(request, dict):
+            raise ValueError("Expected a JSON object")
+        request_id = request.get('id')
+        q = str(request.get('q', ''))
+        body = await run_in_threadpool(
+            _search_response_body,
+            q,
+            int(request.get('limit', 20)),
+            bool(request.get('fuzzy', False)),
+            bool(request.get('phonetic', False)),
+            request.get('filters') or None
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await websocket.send_text(json.dumps({'id': request_id, 'error': f"Search failed: {str(e)}"}))
+        return
     
+    # Splice the cached bytes in rather than decoding and re-encoding them
+    await websocket.send_text(
+        f'{{"id":{json.dumps(request_id)},"q":{json.dumps(q)},"results":{body.decode("utf-8")}}}'
+    )
+
+
+@router.get("/roster-bundle", response_model=RosterBundleInfo)
+async def get_roster_bundle_info(response: Response):
+    """Get the current roster bundle version and its immutable URL"""
     try:
         # Hardcode to 2025-26 season
         season = "2025-26"
-        results = nba_service.search_players(q, limit, season)
-        return [PlayerSearchResult(**r) for r in results]
+        bundle = (await nba_service.aget_season_data(season)).roster_bundle
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Roster bundle failed: {str(e)}")
+    
+    # The pointer must be revalidated so clients notice a new version
+    response.headers["Cache-Control"] = "no-cache"
+    return RosterBundleInfo(
+        season=bundle.season,
+        version=bundle.digest,
+        player_count=bundle.player_count,
+        url=f"/api/roster-bundle/{bundle.digest}"
+    )
+
+
+@router.get("/roster-bundle/{version}")
+async def get_roster_bundle(version: str, request: Request):
+    """Serve the compressed roster bundle for client-side search"""
+    try:
+        # Hardcode to 2025-26 season
+        season = "2025-26"
+        bundle = (await nba_service.aget_season_data(season)).roster_bundle
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Roster bundle failed: {str(e)}")
+    
+    if version != bundle.digest:
+        raise HTTPException(status_code=404, detail="Roster bundle version not found")
+    
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{bundle.digest}"',
+        "Vary": "Accept-Encoding"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=bundle.body, media_type="application/json", headers=headers)
+    return Response(content=bundle.decompressed(), media_type="application/json", headers=headers)
+
+
+@router.get("/diagnostics")
+async def get_diagnostics():
+    """Upstream circuit breaker state and cache statistics"""
+    return {
+        **nba_service.diagnostics(),
+        'search_response_cache': search_response_cache.stats()
+    }
+
+
+@router.post("/admin/reload-cache", response_model=ReloadResponse)
+async def reload_cache(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Reload the player cache files after they were regenerated
+    
+    Only reloads when the files changed since they were last loaded, unless force=true.
+    New indexes are built in a worker thread and swapped in atomically.
+    Requires the X-Admin-Token header to match the ADMIN_TOKEN environment
+    variable; without ADMIN_TOKEN set the endpoint is disabled.
+    """
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        reloaded = await run_in_threadpool(nba_service.reload_cache_files, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+    return ReloadResponse(reloaded=reloaded, data_version=nba_service.data_version)
 
 
 @router.post("/guess", response_model=GuessResponse)
@@ -109,22 +336,28 @@ async def make_guess(request: GuessRequest):
     
     try:
         # Get player details for the game's season
-        # Service will handle timeouts and fallbacks automatically
-        guessed_player = nba_service.get_player_details(request.player_id, game_engine.season)
-        
-        # Make guess
-        result = game_engine.make_guess(guessed_player)
-        
-        # If game is over, get target player details for the overlay
-        target_player_details = None
-        if game_engine.is_game_over():
-            target_player_details = nba_service.get_player_details(
-                game_engine.target_player.get('id'), 
-                game_engine.season
-            )
+        # Service will handle timeouts and fallbacks automatically; every upstream
+        # call behind this guess shares one deadline, which bounds guess latency
+        with deadline_scope(nba_service.request_deadline_seconds):
+            guessed_player = await nba_service.aget_player_details(request.player_id, game_engine.season)
+            
+            # Another guess on this game may have finished it while we awaited the details
+            if game_engine.is_game_over():
+                raise ValueError("Game is already over")
+            
+            # Make guess
+            result = game_engine.make_guess(guessed_player)
+            
+            # If game is over, get target player details for the overlay
+            target_player_details = None
+            if game_engine.is_game_over():
+                target_player_details = await nba_service.aget_player_details(
+                    game_engine.target_player.id, 
+                    game_engine.season
+                )
         
         response_data = {
-            'guessed_player': result['guessed_player'],
+            'guessed_player': result['guessed_player'].to_dict(GUESSED_PLAYER_FIELDS),
             'comparison': result['comparison'],
             'is_correct': result['is_correct'],
             'guess_number': result['guess_number'],
@@ -134,7 +367,7 @@ async def make_guess(request: GuessRequest):
         
         # Add target player details if game is over
         if target_player_details:
-            response_data['target_player'] = target_player_details
+            response_data['target_player'] = target_player_details.to_dict()
         
         return GuessResponse(**response_data)
     except ValueError as e:
@@ -150,4 +383,12 @@ async def get_game_state(game_id: str):
         raise HTTPException(status_code=404, detail="Game not found")
     
     game_engine = games[game_id]
-    return game_engine.get_game_state()
+    state = game_engine.get_game_state()
+    state['guesses'] = [_guess_to_json(guess) for guess in state['guesses']]
+    return state
+
+
+def _guess_to_json(guess: Dict) -> Dict:
+    """Guess record with its Player converted to the guessed_player JSON shape"""
+    guessed_player: Player = guess['guessed_player']
+    return {**guess, 'guessed_player': guessed_player.to_dict(GUESSED_PLAYER_FIELDS)}
@@ -0,0 +1,134 @@
+"""
+Cache Writer - Write-behind persistence of in-memory caches to JSON files
+"""
+from typing import Callable, ContextManager, Dict, Hashable, Optional
+from contextlib import nullcontext
+from pathlib import Path
+import json
+import os
+import tempfile
+import threading
+
+
+# Seconds a dirty entry may wait before the background thread writes it
+FLUSH_INTERVAL_SECONDS = 5.0
+# Dirty entries that trigger a write without waiting for the interval
+FLUSH_BATCH_SIZE = 10
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write data to a temp file next to path, fsync it and rename it over path"""
+    path = Path(path)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # Readers see either the old file or the new one, never a partial write
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class WriteBehindWriter:
+    """
+    Persists a cache to a JSON file from a background thread
+
+    Request threads only mark keys dirty; the writer batches them and writes
+    the whole payload once per FLUSH_BATCH_SIZE entries or FLUSH_INTERVAL_SECONDS,
+    whichever comes first. The thread starts on the first dirty key and
+    stop() performs a final synchronous flush (call it on application shutdown).
+
+    Args:
+        path: JSON file to (atomically) replace
+        serialize: Returns the JSON payload for the current cache contents
+        interval: Max seconds between a key becoming dirty and being written
+        batch_size: Dirty keys that trigger an immediate write
+        after_write: Optional callback run after each successful write
+        lock: Optional lock held around each serialize, write and after_write
+    """
+
+    def __init__(self, path: Path, serialize: Callable[[], Dict],
+                 interval: float = FLUSH_INTERVAL_SECONDS, batch_size: int = FLUSH_BATCH_SIZE,
+                 after_write: Optional[Callable[[], None]] = None,
+                 lock: Optional[ContextManager] = None):
+        self.path = Path(path)
+        self._serialize = serialize
+        self._after_write = after_write
+        self.interval = interval
+        self.batch_size = batch_size
+        self._dirty = set()
+        self._lock = threading.Lock()
+        # Serializes writes between the background thread and flush()
+        self._write_lock = threading.Lock()
+        self._lock_around_write = lock if lock is not None else nullcontext()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.writes = 0
+
+    def mark_dirty(self, key: Hashable):
+        """Record that a cache entry changed; never blocks on disk I/O"""
+        with self._lock:
+            self._dirty.add(key)
+            dirty_count = len(self._dirty)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='cache-writer', daemon=True)
+                self._thread.start()
+        if dirty_count >= self.batch_size:
+            self._wake.set()
+
+    @property
+    def pending(self) -> int:
+        """Dirty entries not yet written"""
+        with self._lock:
+            return len(self._dirty)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Error writing {self.path.name}: {e}")
+
+    def flush(self) -> bool:
+        """Write the cache now if anything is dirty; returns True if a write happened"""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                batch = self._dirty
+                self._dirty = set()
+            with self._lock_around_write:
+                try:
+                    payload = json.dumps(self._serialize(), indent=2, ensure_ascii=False)
+                    atomic_write(self.path, payload.encode('utf-8'))
+                except BaseException:
+                    # Keep the batch so the next flush retries it
+                    with self._lock:
+                        self._dirty |= batch
+                    raise
+                self.writes += 1
+                if self._after_write is not None:
+                    self._after_write()
+            return True
+
+    def stop(self):
+        """Stop the background thread and write anything still dirty"""
+        with self._lock:
+            self._stopping = True
+            thread = self._thread
+            self._thread = None
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        self._wake.clear()
+        self.flush()
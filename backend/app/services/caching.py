@@ -0,0 +1,173 @@
+"""
+Caching helpers - Small in-process caches shared by the services
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and, optionally, total weight
+
+    The weigher returns the cost of one value (e.g. number of rows it holds);
+    least recently used entries are evicted until both limits are satisfied.
+    """
+
+    def __init__(self, max_entries: int = 256, max_weight: Optional[int] = None,
+                 weigher: Optional[Callable[[Any], int]] = None):
+        self.max_entries = max_entries
+        self.max_weight = max_weight
+        self._weigher = weigher or (lambda value: 1)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._weights: Dict[Hashable, int] = {}
+        self._total_weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value and mark it most recently used"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value without touching recency or hit counters"""
+        with self._lock:
+            return self._entries.get(key, default)
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value, evicting old entries past the limits"""
+        weight = self._weigher(value)
+        with self._lock:
+            if key in self._entries:
+                self._total_weight -= self._weights.pop(key)
+                del self._entries[key]
+            # A single value heavier than the whole budget is not worth caching
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._entries[key] = value
+            self._weights[key] = weight
+            self._total_weight += weight
+            while len(self._entries) > self.max_entries or (
+                    self.max_weight is not None and self._total_weight > self.max_weight):
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_weight -= self._weights.pop(old_key)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value"""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._total_weight -= self._weights.pop(key)
+            return self._entries.pop(key)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Copy of the entries, least recently used first, without touching recency"""
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._weights.clear()
+            self._total_weight = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Size and hit/miss counters for diagnostics"""
+        return {
+            'entries': len(self._entries),
+            'weight': self._total_weight,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class VersionedLRUCache(LRUCache):
+    """
+    LRU cache tied to a data version
+
+    Callers pass the current version of the data the values were built from;
+    when it changes, everything cached from the old data is dropped at once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = None
+
+    def sync(self, version: Hashable):
+        """Clear the cache if the underlying data changed since it was filled"""
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+
+class TTLCache(LRUCache):
+    """
+    LRU cache whose entries expire ttl seconds after they were set
+
+    Used as a negative cache: remembering recent failures (bounded by
+    max_entries) so repeat requests don't retry them until the TTL passes.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(max_entries)
+        self.ttl = ttl
+        self._clock = clock
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value unless it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._total_weight -= self._weights.pop(key)
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace a value; it expires ttl seconds from now"""
+        super().set(key, (self._clock() + self.ttl, value))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = super().pop(key)
+        if entry is None or entry[0] <= self._clock():
+            return default
+        return entry[1]
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        now = self._clock()
+        return [(key, entry[1]) for key, entry in super().items() if entry[0] > now]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key, _MISSING) is not _MISSING
+
+
+_MISSING = object()
@@ -0,0 +1,132 @@
+"""
+Circuit Breaker - Fail fast while an upstream dependency keeps failing
+"""
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker
+
+    Closed: calls go through; failure_threshold consecutive failures open it.
+    Open: calls raise CircuitOpenError immediately for recovery_timeout seconds.
+    Half-open: up to half_open_max_calls probe calls go through; one success
+    closes the circuit again, one failure re-opens it for another timeout.
+
+    Args:
+        name: Label used in logs and diagnostics
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds to stay open before letting a probe through
+        half_open_max_calls: Concurrent probe calls allowed while half-open
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self._last_error: Optional[str] = None
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+
+    def _current_state(self) -> str:
+        # Caller holds the lock; an open circuit turns half-open once the timeout passes
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _open(self):
+        if self._state != OPEN:
+            print(f"⚠️ Circuit '{self.name}' opened after {self._consecutive_failures} failures")
+        self._state = OPEN
+        self._opened_at = self._clock()
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func through the breaker, raising CircuitOpenError if the circuit is open"""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self.half_open_max_calls):
+                self.rejected += 1
+                retry_in = max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+                raise CircuitOpenError(
+                    f"Circuit '{self.name}' is open after repeated upstream failures "
+                    f"(next probe in {retry_in:.0f}s): {self._last_error}"
+                )
+            is_probe = state == HALF_OPEN
+            if is_probe:
+                self._probes_in_flight += 1
+
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                self._consecutive_failures += 1
+                self._last_error = str(e)
+                if is_probe:
+                    self._probes_in_flight -= 1
+                if is_probe or self._consecutive_failures >= self.failure_threshold:
+                    self._open()
+            raise
+
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            if is_probe:
+                self._probes_in_flight -= 1
+            if self._state != CLOSED:
+                print(f"✅ Circuit '{self.name}' closed again")
+            self._state = CLOSED
+            self._opened_at = None
+        return result
+
+    def reset(self):
+        """Force the circuit closed and forget recent failures"""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def stats(self) -> Dict:
+        """State and counters for diagnostics"""
+        with self._lock:
+            state = self._current_state()
+            return {
+                'name': self.name,
+                'state': state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout': self.recovery_timeout,
+                'open_for': None if self._opened_at is None else round(self._clock() - self._opened_at, 1),
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'last_error': self._last_error
+            }
@@ -0,0 +1,279 @@
+"""
+Player Details Cache - Player details keyed by (player id, season)
+"""
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from datetime import datetime
+import threading
+import time
+from app.services.caching import LRUCache
+from app.services.player_record import Player
+
+
+# Runtime entries kept per season; records in the snapshot base layer don't count
+MAX_DETAILS_PER_SEASON = 2048
+
+# Section of the cache file holding details that apply to every season
+GENERAL_SEASON_KEY = 'general'
+
+
+class CachedDetails(NamedTuple):
+    """A cache entry: the details and when they were fetched from the API"""
+    details: Player
+    fetched_at: float  # Unix time; 0.0 if unknown
+
+
+def parse_fetched_at(value) -> float:
+    """Unix time of an ISO 'fetched_at'/'last_updated' value, or 0.0 (long stale) if missing"""
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def format_fetched_at(fetched_at: float) -> Optional[str]:
+    """ISO 'fetched_at' value of a fetch time; None round-trips as unknown (0.0)"""
+    return datetime.fromtimestamp(fetched_at).isoformat() if fetched_at else None
+
+
+def iter_cached_details(cache_data: Dict) -> Iterator[Dict]:
+    """
+    Details dicts from a player_details_cache.json payload
+
+    Reads the per-season layout ({'seasons': {season: {player_id: details}}})
+    as well as the legacy single map ({'players': {player_id: details}}).
+    Each dict carries its own 'season', which is what entries are keyed by,
+    and a 'fetched_at' time; records written without one (older populate_cache.py
+    runs) are as old as the file's 'last_updated'.
+    """
+    last_updated = cache_data.get('last_updated')
+    for section in [*cache_data.get('seasons', {}).values(), cache_data.get('players', {})]:
+        for details in section.values():
+            yield details if details.get('fetched_at') else {**details, 'fetched_at': last_updated}
+
+
+class DetailRecords:
+    """
+    Details loaded from the cache file, with the snapshot's detail-record interface
+
+    The base layer of a PlayerDetailsCache when no snapshot could be mapped.
+
+    Args:
+        entries: The file's records with their fetch times
+    """
+
+    def __init__(self, entries: List[CachedDetails]):
+        self._entries = entries
+        self._rows: Dict[int, List[int]] = {}
+        for row, entry in enumerate(entries):
+            self._rows.setdefault(entry.details.id, []).append(row)
+        self.details_count = len(entries)
+
+    def detail(self, row: int) -> Player:
+        return self._entries[row].details
+
+    def detail_fetched_at(self, row: int) -> float:
+        return self._entries[row].fetched_at
+
+    def details(self) -> Iterator[Player]:
+        for entry in self._entries:
+            yield entry.details
+
+    def find_detail_rows(self, player_id: int) -> List[int]:
+        return self._rows.get(player_id, [])
+
+
+class PlayerDetailsCache:
+    """
+    Player details partitioned by season, each partition an LRU cache
+
+    A lookup for (player_id, season) checks that season's partition, then the
+    partition of details without a season (general info), then the read-only
+    base layer, so fetching one season never overwrites or evicts another.
+    Every entry remembers when it was fetched, for stale-while-revalidate.
+
+    The base layer holds what the cache file had when it was loaded; the
+    partitions hold only details fetched (or refreshed) at runtime.
+
+    Args:
+        base: Optional PlayerSnapshot or DetailRecords whose records sit below the partitions
+        max_entries_per_season: LRU limit of each season's partition
+    """
+
+    def __init__(self, base=None, max_entries_per_season: int = MAX_DETAILS_PER_SEASON):
+        self.base = base
+        self.max_entries_per_season = max_entries_per_season
+        self._partitions: Dict[Optional[str], LRUCache] = {}
+        self._lock = threading.Lock()
+
+    def _partition(self, season: Optional[str]) -> LRUCache:
+        with self._lock:
+            if season not in self._partitions:
+                self._partitions[season] = LRUCache(self.max_entries_per_season)
+            return self._partitions[season]
+
+    def _base_entry(self, player_id: int, season: Optional[str]) -> Optional[CachedDetails]:
+        if self.base is None:
+            return None
+        for row in self.base.find_detail_rows(player_id):
+            details = self.base.detail(row)
+            if details.season == season:
+                return CachedDetails(details, self.base.detail_fetched_at(row))
+        return None
+
+    def _exact(self, player_id: int, season: Optional[str]) -> Optional[CachedDetails]:
+        partition = self._partitions.get(season)
+        entry = partition.peek(player_id) if partition is not None else None
+        return entry if entry is not None else self._base_entry(player_id, season)
+
+    def lookup(self, player_id: int, season: str) -> Optional[CachedDetails]:
+        """Entry for a player in a season (or season-less details), if cached"""
+        player_id = int(player_id)
+        for key in (season, None):
+            partition = self._partitions.get(key)
+            entry = partition.get(player_id) if partition is not None else None
+            if entry is None:
+                entry = self._base_entry(player_id, key)
+            if entry is not None:
+                return entry
+        return None
+
+    def peek(self, player_id: int, season: str) -> Optional[CachedDetails]:
+        """Like lookup, without counting as a use for LRU eviction"""
+        player_id = int(player_id)
+        for key in (season, None):
+            entry = self._exact(player_id, key)
+            if entry is not None:
+                return entry
+        return None
+
+    def get(self, player_id: int, season: str) -> Optional[Player]:
+        """Details for a player in a season (or season-less details), if cached"""
+        entry = self.lookup(player_id, season)
+        return entry.details if entry is not None else None
+
+    def get_any_season(self, player_id: int) -> Optional[Player]:
+        """Cached details for a player from whichever season has them"""
+        player_id = int(player_id)
+        for partition in list(self._partitions.values()):
+            entry = partition.peek(player_id)
+            if entry is not None:
+                return entry.details
+        if self.base is not None:
+            for row in self.base.find_detail_rows(player_id):
+                return self.base.detail(row)
+        return None
+
+    def put(self, details: Player, fetched_at: Optional[float] = None):
+        """Cache details under (details.id, details.season), fetched now unless given"""
+        entry = CachedDetails(details, time.time() if fetched_at is None else fetched_at)
+        self._partition(details.season).set(details.id, entry)
+
+    def carry_over(self, previous: 'PlayerDetailsCache'):
+        """Copy entries of a previous cache for (player, season) pairs this one has no record of"""
+        for season, partition in list(previous._partitions.items()):
+            for player_id, entry in partition.items():
+                if self._exact(player_id, season) is None:
+                    self.put(*entry)
+
+    def season_view(self, season: str) -> 'SeasonDetails':
+        """Details that apply to a season, looked up per player instead of copied"""
+        return SeasonDetails(self, season)
+
+    def season_details(self, season: str) -> Dict[str, Player]:
+        """Details that apply to a season, keyed by player id string (decodes every base record)"""
+        exact: Dict[str, Player] = {}
+        general: Dict[str, Player] = {}
+        if self.base is not None:
+            for details in self.base.details():
+                if details.season == season:
+                    exact[str(details.id)] = details
+                elif details.season is None:
+                    general[str(details.id)] = details
+        # Partition entries replace base records; season-specific details beat general ones
+        for key, layer in ((season, exact), (None, general)):
+            partition = self._partitions.get(key)
+            if partition is not None:
+                for player_id, entry in partition.items():
+                    layer[str(player_id)] = entry.details
+        return {**general, **exact}
+
+    def entries(self) -> Iterator[CachedDetails]:
+        """Every cached entry; partition entries replace base records in place"""
+        overrides = {
+            (player_id, season): entry
+            for season, partition in list(self._partitions.items())
+            for player_id, entry in partition.items()
+        }
+        if self.base is not None:
+            for row in range(self.base.details_count):
+                details = self.base.detail(row)
+                base_entry = CachedDetails(details, self.base.detail_fetched_at(row))
+                yield overrides.pop((details.id, details.season), base_entry)
+        yield from overrides.values()
+
+    def runtime_entries(self) -> Iterator[CachedDetails]:
+        """Entries fetched at runtime (the partitions), without the base layer's records"""
+        for partition in list(self._partitions.values()):
+            for _, entry in partition.items():
+                yield entry
+
+    def __iter__(self) -> Iterator[Player]:
+        """Every cached record"""
+        for entry in self.entries():
+            yield entry.details
+
+    def __len__(self) -> int:
+        # Counted without decoding the base layer: only runtime entries are checked against it
+        base_count = self.base.details_count if self.base is not None else 0
+        return base_count + sum(
+            1
+            for season, partition in list(self._partitions.items())
+            for player_id, _ in partition.items()
+            if self._base_entry(player_id, season) is None
+        )
+
+    def to_json(self, persisted: Optional[Dict] = None) -> Dict:
+        """
+        Per-season layout of the cache file (see iter_cached_details)
+
+        Pass the file's current payload as persisted to write it back with the
+        runtime entries merged in: only those override it, so records the file
+        has (including ones evicted from memory, or written by a newer populate
+        run than the base layer) are kept. Without persisted, every entry is written.
+        """
+        records: Dict = {}
+        if persisted is None:
+            entries = self.entries()
+        else:
+            for details in iter_cached_details(persisted):
+                records[(int(details['id']), details.get('season'))] = details
+            entries = self.runtime_entries()
+        for details, fetched_at in entries:
+            records[(details.id, details.season)] = {
+                **details.to_dict(),
+                'fetched_at': format_fetched_at(fetched_at)
+            }
+        seasons: Dict[str, Dict[str, Dict]] = {}
+        for (player_id, season), details in records.items():
+            seasons.setdefault(season or GENERAL_SEASON_KEY, {})[str(player_id)] = details
+        return {'seasons': seasons}
+
+
+class SeasonDetails:
+    """
+    Read-through view of the details that apply to one season
+
+    get() looks a player up in the cache (season-specific, then general
+    details) on every call, so building a season's indexes reads base records
+    one at a time instead of holding a copy of all of them.
+    """
+
+    def __init__(self, cache: PlayerDetailsCache, season: str):
+        self._cache = cache
+        self.season = season
+
+    def get(self, player_id, default: Optional[Player] = None) -> Optional[Player]:
+        entry = self._cache.peek(player_id, self.season)
+        return entry.details if entry is not None else default
@@ -0,0 +1,109 @@
+"""
+Facet Index - Bitmap indexes over player details for filtered search
+"""
+from typing import List, Dict, Mapping, Optional, Iterator
+import numpy as np
+from app.services.wordle_engine import get_position_groups
+from app.services.player_record import Player
+from app.services.player_table import PlayerTable
+
+
+CATEGORY_FACETS = ('team', 'conference', 'division', 'position')
+RANGE_FACETS = ('age', 'height', 'ppg')
+FILTER_KEYS = CATEGORY_FACETS + tuple(
+    f"{facet}_{bound}" for facet in RANGE_FACETS for bound in ('min', 'max')
+)
+
+
+def _facet_key(value: str) -> str:
+    """Case-insensitive facet value; 'Western' and 'West' are the same conference"""
+    key = str(value).strip().lower()
+    if key in ('eastern', 'western'):
+        key = key[:-3]
+    return key
+
+
+def iter_rows(mask: int) -> Iterator[int]:
+    """Yield the row numbers of the set bits in a mask, lowest first"""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def to_bitmask(mask: np.ndarray) -> int:
+    """Pack a boolean row mask into an int whose bit i is row i"""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+class FacetIndex:
+    """
+    Per-facet bitsets over one season's players
+
+    Rows line up with PlayerSearchIndex rows (positions in the players list),
+    so a filter is a Python int whose set bits are the allowed rows. Range
+    filters are vectorized over a row-aligned PlayerTable (table), and
+    players without cached details only appear in unfiltered results.
+
+    Args:
+        players: Player records from the players list (PERSON_ID, TEAM_ABBREVIATION, ...)
+        details: Player id (as str) -> Player details for the season; anything with
+                 a get(), e.g. a details_cache.SeasonDetails view
+    """
+
+    def __init__(self, players: List[Dict], details: Mapping[str, Player]):
+        self.size = len(players)
+        self._categories: Dict[str, Dict[str, int]] = {facet: {} for facet in CATEGORY_FACETS}
+        rows = [details.get(str(player.get('PERSON_ID'))) or None for player in players]
+        self.table = PlayerTable.from_rows(rows)
+
+        def add(facet: str, value, row: int):
+            if value:
+                key = _facet_key(value)
+                self._categories[facet][key] = self._categories[facet].get(key, 0) | (1 << row)
+
+        for row, (player, info) in enumerate(zip(players, rows)):
+            if not info:
+                add('team', player.get('TEAM_ABBREVIATION'), row)
+                continue
+
+            # Teams can be filtered by abbreviation ("LAL") or name ("Lakers")
+            add('team', info.team_abbreviation or player.get('TEAM_ABBREVIATION'), row)
+            add('team', info.team, row)
+            add('conference', info.conference, row)
+            add('division', info.division, row)
+            for group in get_position_groups(info.position):
+                add('position', group, row)
+
+    def values(self, facet: str) -> List[str]:
+        """Known values of a category facet"""
+        return sorted(self._categories[facet])
+
+    def filter_mask(self, filters: Optional[Dict]) -> Optional[int]:
+        """
+        AND together the masks for the given filters
+
+        Args:
+            filters: Any of FILTER_KEYS, e.g. {'division': 'Pacific', 'position': 'guard',
+                     'ppg_min': 20}. None values are ignored.
+
+        Returns:
+            Bitmask of matching rows, or None when no filter is active
+        """
+        active = {key: value for key, value in (filters or {}).items() if value is not None}
+        unknown = set(active) - set(FILTER_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown search filters: {', '.join(sorted(unknown))}")
+        if not active:
+            return None
+
+        mask = (1 << self.size) - 1
+        for facet in CATEGORY_FACETS:
+            if facet in active:
+                mask &= self._categories[facet].get(_facet_key(active[facet]), 0)
+        for facet in RANGE_FACETS:
+            low = active.get(f"{facet}_min")
+            high = active.get(f"{facet}_max")
+            if low is not None or high is not None:
+                mask &= to_bitmask(self.table.range_mask(facet, low, high))
+        return mask
@@ -0,0 +1,104 @@
+"""
+HTTP Pool - Shared keep-alive connection pool for stats.nba.com requests
+"""
+from typing import Dict, Optional
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from app.services.retry import RETRYABLE_STATUS_CODES
+
+
+# Keep-alive connections kept open per host; matches the threads that call nba_api
+# (NBADataService's upstream and background refresh workers). NBA_API_POOL_SIZE overrides it.
+HTTP_POOL_SIZE = 10
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that reports how often requests reuse a pooled connection
+
+    urllib3 counts requests and newly opened connections per host pool; this
+    adds up the live pools plus any the pool manager has already discarded.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._closed_requests = 0
+        self._closed_connections = 0
+        self.poolmanager.pools.dispose_func = self._dispose_pool
+
+    def _dispose_pool(self, pool):
+        with self._stats_lock:
+            self._closed_requests += pool.num_requests
+            self._closed_connections += pool.num_connections
+        pool.close()
+
+    def stats(self) -> Dict:
+        """Requests sent, connections opened and the share of requests that reused one"""
+        pools = self.poolmanager.pools
+        with self._stats_lock:
+            total_requests = self._closed_requests
+            connections = self._closed_connections
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    total_requests += pool.num_requests
+                    connections += pool.num_connections
+        return {
+            'pool_size': self._pool_maxsize,
+            'requests': total_requests,
+            'connections_opened': connections,
+            'reuse_rate': round(1 - connections / total_requests, 3) if total_requests else None
+        }
+
+
+def raise_for_retryable_status(response: requests.Response, *args, **kwargs):
+    """
+    Response hook: raise HTTPError for 429/5xx responses
+
+    nba_api never checks the status and fails parsing a throttled or error
+    page (JSONDecodeError, KeyError), which looks like bad data and isn't
+    retried; raising here lets the retry policy see the status instead.
+    """
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        response.raise_for_status()
+
+
+def create_session(pool_size: int = HTTP_POOL_SIZE, headers: Optional[Dict] = None,
+                   adapter: Optional[PooledHTTPAdapter] = None) -> requests.Session:
+    """
+    Session with a keep-alive pool of pool_size connections per host
+
+    The adapter doesn't retry; callers own their retry policy so a slow
+    upstream isn't retried twice over, and retryable statuses are raised as
+    HTTPError for it (see raise_for_retryable_status). Pass adapter to use
+    another transport (see transport.TransportAdapter); it then sets its own
+    pool size.
+    """
+    if adapter is None:
+        adapter = PooledHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks['response'].append(raise_for_retryable_status)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def session_stats(session: requests.Session) -> Dict:
+    """Pool stats of a session made by create_session"""
+    adapter = session.get_adapter("https://")
+    return adapter.stats() if isinstance(adapter, PooledHTTPAdapter) else {}
+
+
+def install_nba_api_session(session: requests.Session):
+    """Make every nba_api stats endpoint send its requests through session"""
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    # Older nba_api releases call requests.get directly: no pooling, no record/replay transport
+    if not hasattr(NBAStatsHTTP, 'set_session'):
+        raise RuntimeError("nba_api has no NBAStatsHTTP.set_session hook; install the version "
+                           "pinned in requirements.txt (nba-api==1.11.4)")
+    NBAStatsHTTP.set_session(session)
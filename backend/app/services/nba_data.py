@@ -1,7 +1,7 @@
 """
 NBA Data Service - Fetches player data and statistics using nba_api
 """
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple, TypeVar
 from nba_api.stats.endpoints import commonplayerinfo, playergamelog, commonallplayers, teaminfocommon
 from nba_api.stats.static import players, teams
 import random
@@ -10,9 +10,67 @@ import json
 import os
 from pathlib import Path
 from datetime import datetime, date
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from app.services.player_index import PlayerSearchIndex
+from app.services.roster_bundle import RosterBundle
+from app.services.facets import FacetIndex
+from app.services.player_record import Player
+from app.services.player_table import PlayerTable
+from app.services.snapshot import PlayerSnapshot, open_snapshot, source_signature, write_snapshot
+from app.services.details_cache import (
+    CachedDetails, DetailRecords, PlayerDetailsCache, iter_cached_details, parse_fetched_at
+)
+from app.services.caching import LRUCache, TTLCache
+from app.services.single_flight import SingleFlight
+from app.services.http_pool import HTTP_POOL_SIZE, create_session, install_nba_api_session, session_stats
+from app.services.transport import TransportConfig
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.retry import DeadlineExceeded, RetryPolicy, current_deadline, request_timeout
+from app.services.cache_writer import WriteBehindWriter, atomic_write
+
+
+T = TypeVar('T')
+
+# Cache files (players list, details, aliases, snapshot); NBA_DATA_DIR or data_dir overrides it
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Seconds between checks of the cache files for changes (hot reload)
+RELOAD_POLL_SECONDS = 30.0
+
+# Cached details older than this are served as-is and refreshed in the background
+DETAILS_MAX_AGE_SECONDS = 6 * 60 * 60
+# Minimum seconds between background refresh attempts for the same player and season
+REFRESH_RETRY_SECONDS = 5 * 60
+REFRESH_WORKERS = 2
+
+# Player ids that failed upstream skip the API for this long (negative cache)
+FAILED_LOOKUP_TTL_SECONDS = 2 * 60
+FAILED_LOOKUP_MAX_ENTRIES = 4096
+
+# Threads for blocking nba_api work started from async routes, by default: the HTTP pool
+# minus the refresh workers, so every thread calling nba_api has a pooled connection
+UPSTREAM_WORKERS = HTTP_POOL_SIZE - REFRESH_WORKERS
+
+# Consecutive nba_api failures that open the circuit, and seconds before probing again
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_SECONDS = 30.0
+
+# Time budget for all upstream work behind one API request (e.g. a guess)
+REQUEST_DEADLINE_SECONDS = 8.0
+# Per-attempt nba_api connect and read timeouts, further capped to what is left of the request deadline
+UPSTREAM_CONNECT_TIMEOUT_SECONDS = 2.0
+UPSTREAM_TIMEOUT_SECONDS = 5.0
+
+# Retry policies per upstream call; each attempt still goes through the circuit breaker
+PLAYERS_RETRY_POLICY = RetryPolicy(max_attempts=2, base_delay=1.0)
+DETAILS_RETRY_POLICY = RetryPolicy(max_attempts=2, base_delay=0.5)
+# Team info is only used for division/conference - not worth a retry
+TEAM_INFO_RETRY_POLICY = RetryPolicy(max_attempts=1)
 
 
 def get_available_seasons() -> List[str]:
@@ -43,44 +101,79 @@ def get_available_seasons() -> List[str]:
     return list(reversed(seasons))
 
 
+@dataclass(frozen=True)
+class SeasonData:
+    """A season's players list and everything indexed from it, replaced as one unit"""
+    players: List[Dict]
+    source: str  # 'api', 'cache' or 'static' - where the players list came from
+    search_index: PlayerSearchIndex
+    roster_bundle: RosterBundle
+    facet_index: FacetIndex  # over the player details cache
+    records: Dict[int, Dict]  # PERSON_ID -> players list record
+
+
 class NBADataService:
     """Service for fetching NBA player data and statistics"""
     
-    def __init__(self):
-        self._all_players_cache = {}
+    def __init__(self, circuit_failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 circuit_recovery_seconds: float = CIRCUIT_RECOVERY_SECONDS,
+                 http_pool_size: Optional[int] = None,
+                 request_deadline_seconds: float = REQUEST_DEADLINE_SECONDS,
+                 transport: Optional[TransportConfig] = None,
+                 data_dir: Optional[Path] = None):
+        self._seasons: Dict[str, SeasonData] = {}  # Built when a season's players first load
+        self.data_version = 0  # Bumped whenever players are (re)indexed; keys derived caches
         self._teams_cache = None
-        self._player_details_cache = {}  # In-memory cache for player details
-        self._setup_retry_session()
-        self._cache_file = Path(__file__).parent.parent / "data" / "players_cache.json"
-        self._player_details_cache_file = Path(__file__).parent.parent / "data" / "player_details_cache.json"
-        self._load_player_details_cache()
-    
-    def _setup_retry_session(self):
-        """Setup requests session with retry logic for NBA API calls"""
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=3,  # Total number of retries
-            backoff_factor=2,  # Wait 2, 4, 8 seconds between retries
-            status_forcelist=[429, 500, 502, 503, 504],  # Retry on these status codes
-            allowed_methods=["GET", "POST"],
-            raise_on_status=False
+        # Live stats.nba.com unless configured (or NBA_API_TRANSPORT says) to record or replay
+        self.transport = transport or TransportConfig.from_env()
+        # NBA_API_POOL_SIZE (via the transport config) unless given here
+        pool_size = http_pool_size or self.transport.pool_size
+        self._setup_http_session(pool_size)
+        # Routes give upstream work behind one request this much time in total (see retry.deadline_scope)
+        self.request_deadline_seconds = request_deadline_seconds
+        # While stats.nba.com keeps failing, skip it and go straight to the cache fallbacks
+        self.circuit_breaker = CircuitBreaker(
+            'nba_api',
+            failure_threshold=circuit_failure_threshold,
+            recovery_timeout=circuit_recovery_seconds
         )
-        
-        # Create adapter with retry strategy
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=10,
-            pool_maxsize=10
+        data_dir = Path(data_dir or os.environ.get('NBA_DATA_DIR') or DATA_DIR)
+        self._cache_file = data_dir / "players_cache.json"
+        self._player_details_cache_file = data_dir / "player_details_cache.json"
+        self._aliases_file = data_dir / "player_aliases.json"
+        self._snapshot_file = data_dir / "players_snapshot.bin"
+        # Signature of the details file as last written by a write-behind flush (any worker)
+        self._details_writes_file = data_dir / "player_details_cache.writes.json"
+        self._loaded_signatures = self._cache_file_signatures()
+        self._snapshot = self._open_snapshot()
+        self._player_details_cache = self._load_player_details_cache(self._snapshot)  # (player id, season) -> Player
+        # Reentrant: a details flush holds it and may reload the files first (see _serialize_player_details_cache)
+        self._reload_lock = threading.RLock()
+        # Fetched details are persisted from a background thread, never on the request path
+        self._details_writer = WriteBehindWriter(
+            self._player_details_cache_file,
+            self._serialize_player_details_cache,
+            after_write=self._after_details_write,
+            lock=self._reload_lock
         )
-        
-        # Create session and mount adapter
-        self.session = requests.Session()
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
-        # Set longer timeout
-        self.session.timeout = 60  # 60 seconds timeout
-        
+        # (player id, season) -> upstream error, so repeat lookups fail fast or serve minimal data
+        self._failed_lookups = TTLCache(max_entries=FAILED_LOOKUP_MAX_ENTRIES, ttl=FAILED_LOOKUP_TTL_SECONDS)
+        # Blocking upstream work for the async (aget_*) methods runs here, never on the event loop
+        # Concurrent identical upstream fetches share one call, keyed by (endpoint, id, season)
+        self._single_flight = SingleFlight()
+        # Sized with the HTTP pool so threads never wait on each other for a connection
+        self.upstream_workers = max(1, pool_size - REFRESH_WORKERS)
+        self._upstream_executor = ThreadPoolExecutor(max_workers=self.upstream_workers, thread_name_prefix='nba-api')
+        # Stale-while-revalidate: background refreshes, at most one per (player id, season)
+        self._refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix='details-refresh')
+        self._refresh_lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_attempts = LRUCache(max_entries=4096)  # (player id, season) -> last attempt time
+        self._watcher_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+    
+    def _setup_http_session(self, pool_size: int):
+        """Shared keep-alive session that every nba_api endpoint call goes through"""
         # Default headers to mimic browser (helps avoid blocking)
         self.default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -89,10 +182,61 @@ class NBADataService:
             'Referer': 'https://www.nba.com/',
             'Origin': 'https://www.nba.com'
         }
+        
+        # Reusing pooled connections skips a TLS handshake on every miss-path request
+        self.session = create_session(adapter=self.transport.adapter(pool_size))
+        install_nba_api_session(self.session)
     
-    def _load_cached_players(self, season: str) -> Optional[List[Dict]]:
-        """Load players from cached JSON file"""
+    def _open_snapshot(self) -> Optional[PlayerSnapshot]:
+        """Map the binary snapshot of the JSON caches, rebuilding it if they changed"""
+        try:
+            snapshot = open_snapshot(self._snapshot_file, self._cache_file, self._player_details_cache_file)
+            print(f"✅ Mapped player snapshot ({snapshot.roster_count} players, {snapshot.details_count} details)")
+            return snapshot
+        except Exception as e:
+            print(f"⚠️ Player snapshot unavailable, parsing JSON caches instead: {e}")
+            return None
+    
+    def _cache_file_signatures(self) -> Tuple:
+        """(mtime_ns, size) of the players list and player details cache files"""
+        return (source_signature(self._cache_file), source_signature(self._player_details_cache_file))
+    
+    def _after_details_write(self):
+        """
+        Called after the cache writer saves details
+        
+        Rebuilds the snapshot here, once, and records the new file signature so
+        our own writes don't trigger a reload and other workers only remap the
+        snapshot instead of reloading everything (see reload_cache_files). Runs
+        under the reload lock, like the serialize and write before it.
+        """
+        signature = source_signature(self._player_details_cache_file)
+        self._loaded_signatures = (self._loaded_signatures[0], signature)
         try:
+            write_snapshot(self._snapshot_file, self._cache_file, self._player_details_cache_file)
+            atomic_write(self._details_writes_file, json.dumps({'signature': list(signature)}).encode('utf-8'))
+        except Exception as e:
+            print(f"⚠️ Error rebuilding player snapshot after details write: {e}")
+    
+    def _is_write_behind_flush(self, details_signature: Tuple[int, int]) -> bool:
+        """True if the details file on disk is exactly what some worker's write-behind flush wrote"""
+        try:
+            with open(self._details_writes_file, 'r', encoding='utf-8') as f:
+                return tuple(json.load(f)['signature']) == details_signature
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+    
+    def _load_cached_players(self, season: str, snapshot: Optional[PlayerSnapshot],
+                             strict: bool = False) -> Optional[List[Dict]]:
+        """Load players from the snapshot, or the cached JSON file without one (strict: raise on errors)"""
+        try:
+            if snapshot is not None:
+                if snapshot.season != season:
+                    return None
+                cached_players = snapshot.roster()
+                print(f"✅ Loaded {len(cached_players)} players from snapshot")
+                return cached_players
+            
             if not self._cache_file.exists():
                 return None
             
@@ -106,146 +250,280 @@ class NBADataService:
             
             return None
         except Exception as e:
+            if strict:
+                raise
             print(f"⚠️ Error loading cache: {e}")
             return None
     
-    def _load_player_details_cache(self):
-        """Load player details cache from JSON file"""
+    def _load_player_details_cache(self, snapshot: Optional[PlayerSnapshot],
+                                   strict: bool = False) -> PlayerDetailsCache:
+        """Load player details cache from the snapshot, or the JSON file without one (strict: raise on errors)"""
         try:
+            if snapshot is not None:
+                # Records stay in the shared mapping; only runtime fetches live in this process
+                details_cache = PlayerDetailsCache(base=snapshot)
+                print(f"✅ Loaded {len(details_cache)} player details from snapshot")
+                return details_cache
+            
+            entries = []
             if self._player_details_cache_file.exists():
                 with open(self._player_details_cache_file, 'r', encoding='utf-8') as f:
                     cache_data = json.load(f)
-                    self._player_details_cache = cache_data.get('players', {})
-                    print(f"✅ Loaded {len(self._player_details_cache)} player details from cache")
+                # Build each record once here; everything downstream shares it
+                entries = [
+                    CachedDetails(Player.from_dict(details), parse_fetched_at(details.get('fetched_at')))
+                    for details in iter_cached_details(cache_data)
+                ]
+                print(f"✅ Loaded {len(entries)} player details from cache")
+            # The file's records form the base layer, like the snapshot's, below runtime fetches
+            return PlayerDetailsCache(base=DetailRecords(entries))
         except Exception as e:
+            if strict:
+                raise
             print(f"⚠️ Error loading player details cache: {e}")
-            self._player_details_cache = {}
+            return PlayerDetailsCache()
     
-    def _save_player_details_cache(self, player_id: int, player_details: Dict):
-        """Save player details to cache"""
+    def _load_player_aliases(self) -> Dict[str, int]:
+        """Load nickname/abbreviation -> player id table from JSON file"""
         try:
-            player_id_str = str(player_id)
-            self._player_details_cache[player_id_str] = player_details
+            if not self._aliases_file.exists():
+                return {}
             
-            # Save to file periodically (every 10 players to avoid too many writes)
-            if len(self._player_details_cache) % 10 == 0:
-                self._flush_player_details_cache()
+            with open(self._aliases_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+            return {alias: int(player_id) for alias, player_id in cache_data.get('aliases', {}).items()}
+        except Exception as e:
+            print(f"⚠️ Error loading player aliases: {e}")
+            return {}
+    
+    def _save_player_details_cache(self, player_id: int, player_details: Player):
+        """Save player details to cache"""
+        try:
+            self._player_details_cache.put(player_details)
+            # Written to disk in batches by the background writer
+            self._details_writer.mark_dirty((player_id, player_details.season))
         except Exception as e:
             print(f"⚠️ Error saving player details cache: {e}")
     
+    def _serialize_player_details_cache(self) -> Dict:
+        """
+        JSON payload of the player details cache file: what it has now plus our runtime fetches
+        
+        Called by the cache writer under the reload lock. If the files changed
+        since we loaded them (a populate run, or another worker's flush) they
+        are reloaded first, so the write can't be mistaken for our own and hide
+        that change; if the reload fails the flush fails and is retried later.
+        """
+        if self._cache_file_signatures() != self._loaded_signatures and not self.reload_cache_files():
+            raise RuntimeError("Cache files changed on disk and could not be reloaded; not overwriting them")
+        persisted = None
+        if self._player_details_cache_file.exists():
+            with open(self._player_details_cache_file, 'r', encoding='utf-8') as f:
+                persisted = json.load(f)
+        return {
+            'last_updated': datetime.now().isoformat(),
+            **self._player_details_cache.to_json(persisted)
+        }
+    
     def _flush_player_details_cache(self):
-        """Write player details cache to disk"""
+        """Write pending player details to disk now"""
         try:
-            cache_data = {
-                'last_updated': datetime.now().isoformat(),
-                'players': self._player_details_cache
-            }
-            with open(self._player_details_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
+            self._details_writer.flush()
         except Exception as e:
             print(f"⚠️ Error flushing player details cache: {e}")
     
-    def _retry_api_call(self, func, *args, max_retries=3, delay=2, **kwargs):
-        """Wrapper to retry API calls with exponential backoff"""
-        last_exception = None
-        for attempt in range(max_retries):
+    def reload_cache_files(self, force: bool = False) -> bool:
+        """
+        Reload the cache files if they changed on disk (e.g. after populate_cache.py)
+        
+        The new snapshot, details cache and every loaded season's indexes are built
+        while requests keep using the current ones, then swapped in together.
+        Requests already holding the old objects finish with them. If any file
+        fails to load (e.g. caught mid-write) nothing is swapped and the next
+        poll tries again.
+        
+        Returns:
+            True if new data was swapped in
+        """
+        with self._reload_lock:
+            signatures = self._cache_file_signatures()
+            if not force and signatures == self._loaded_signatures:
+                return False
+            
+            if (not force and signatures[0] == self._loaded_signatures[0]
+                    and self._is_write_behind_flush(signatures[1])):
+                # Another worker flushed runtime-fetched details and already rebuilt the
+                # snapshot: map it as the new details base, but keep the season indexes
+                try:
+                    snapshot = self._open_snapshot()
+                    details_cache = self._load_player_details_cache(snapshot, strict=True)
+                except Exception as e:
+                    print(f"⚠️ Reload aborted, keeping current player data: {e}")
+                    return False
+                details_cache.carry_over(self._player_details_cache)
+                self._snapshot = snapshot
+                self._player_details_cache = details_cache
+                self._loaded_signatures = signatures
+                print(f"✅ Picked up player details written by another worker ({len(details_cache)} player details)")
+                return True
+            
+            print("🔄 Cache files changed, reloading player data...")
             try:
-                # Add delay between retries (except first attempt)
-                if attempt > 0:
-                    wait_time = delay * (2 ** (attempt - 1))  # Exponential backoff
-                    if wait_time > 0:
-                        print(f"Retrying after {wait_time} seconds...")
-                        time.sleep(wait_time)
+                snapshot = self._open_snapshot()
+                details_cache = self._load_player_details_cache(snapshot, strict=True)
+                # Keep details fetched at runtime that the new files don't have
+                details_cache.carry_over(self._player_details_cache)
                 
-                return func(*args, **kwargs)
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, 
-                    requests.exceptions.ReadTimeout, Exception) as e:
-                last_exception = e
-                error_msg = str(e)
-                if max_retries > 1:
-                    print(f"API call attempt {attempt + 1}/{max_retries} failed: {error_msg}")
-                
-                # If it's the last attempt, raise the exception
-                if attempt == max_retries - 1:
-                    if max_retries > 1:
-                        print(f"All {max_retries} attempts failed. Raising exception.")
-                    raise
-                
-                # Continue to next retry
-        raise last_exception if last_exception else Exception("Unknown error in retry logic")
+                seasons = {}
+                for season, season_data in list(self._seasons.items()):
+                    season_players, source = season_data.players, season_data.source
+                    # A players list fetched from the API is fresher than any cache file
+                    if source != 'api':
+                        cached_players = self._load_cached_players(season, snapshot, strict=True)
+                        if cached_players:
+                            season_players, source = cached_players, 'cache'
+                    seasons[season] = self._build_season_data(season, season_players, source, details_cache)
+            except Exception as e:
+                print(f"⚠️ Reload aborted, keeping current player data: {e}")
+                return False
+            
+            self._snapshot = snapshot
+            self._player_details_cache = details_cache
+            self._seasons = seasons
+            self._loaded_signatures = signatures
+            self.data_version += 1
+            print(f"✅ Reloaded player data ({len(details_cache)} player details, {len(seasons)} seasons)")
+            return True
+    
+    def start_cache_watcher(self, interval: float = RELOAD_POLL_SECONDS):
+        """Poll the cache files' mtimes in a background thread and hot-reload them on change"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watcher_stop.clear()
+        
+        def watch():
+            while not self._watcher_stop.wait(interval):
+                try:
+                    self.reload_cache_files()
+                except Exception as e:
+                    print(f"⚠️ Error reloading cache files: {e}")
+        
+        self._watcher = threading.Thread(target=watch, name='cache-watcher', daemon=True)
+        self._watcher.start()
+    
+    def _call_upstream(self, func, policy: RetryPolicy):
+        """Call nba_api under a retry policy, each attempt through the circuit breaker"""
+        # CircuitOpenError and DeadlineExceeded aren't retryable, so they fail fast
+        return policy.call(self.circuit_breaker.call, func)
     
     def get_all_active_players(self, season: Optional[str] = None) -> List[Dict]:
         """Get all NBA players for a given season"""
+        return self._get_season_data(season).players
+    
+    def _get_season_data(self, season: Optional[str] = None) -> SeasonData:
+        """Get a season's players and indexes, loading and indexing them on first use"""
         # Use current season if not specified
         if season is None:
             season = self._get_current_season()
         
-        # Cache key includes season
-        cache_key = season
-        
-        if cache_key not in self._all_players_cache:
-            try:
-                def fetch_players():
-                    # For historical seasons, get all players from that season
-                    if season == self._get_current_season():
-                        all_players = commonallplayers.CommonAllPlayers(
-                            is_only_current_season=1,
-                            league_id='00',
-                            timeout=5,  # Very short timeout - fail fast to cache
-                            headers=self.default_headers
-                        )
-                    else:
-                        # For historical seasons, get all players (not just current)
-                        all_players = commonallplayers.CommonAllPlayers(
-                            is_only_current_season=0,
-                            league_id='00',
-                            season=season,
-                            timeout=5,  # Very short timeout - fail fast to cache
-                            headers=self.default_headers
-                        )
-                    return all_players.get_data_frames()[0]
-                
-                # Try API with very short timeout - fail fast to cache
-                players_data = self._retry_api_call(fetch_players, max_retries=1, delay=1)
-                
-                # Filter by season if needed (for historical seasons)
-                if season != self._get_current_season():
-                    # Filter players who played in that season
-                    # This is a simplified approach - in production, you might want
-                    # to check player game logs for that season
-                    pass
-                
-                self._all_players_cache[cache_key] = players_data.to_dict('records')
-                print(f"✅ Fetched {len(self._all_players_cache[cache_key])} players from NBA API")
-            except Exception as e:
-                # Fallback to cached JSON file
-                print(f"⚠️ NBA API failed for season {season}: {e}")
-                print("🔄 Attempting to load from cache...")
-                
-                cached_players = self._load_cached_players(season)
-                if cached_players:
-                    self._all_players_cache[cache_key] = cached_players
-                    print(f"✅ Using cached players (fallback mode)")
+        season_data = self._seasons.get(season)
+        if season_data is None:
+            season_players, source = self._fetch_season_players(season)
+            # Index the freshly loaded players once per season
+            season_data = self._build_season_data(season, season_players, source, self._player_details_cache)
+            self._seasons[season] = season_data
+            self.data_version += 1
+        return season_data
+    
+    def _fetch_season_players(self, season: str) -> Tuple[List[Dict], str]:
+        """Players list for a season from the API, the cache files or the static list, plus its source"""
+        try:
+            def fetch_players():
+                # For historical seasons, get all players from that season
+                if season == self._get_current_season():
+                    all_players = commonallplayers.CommonAllPlayers(
+                        is_only_current_season=1,
+                        league_id='00',
+                        timeout=request_timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS, UPSTREAM_TIMEOUT_SECONDS),  # Very short timeout - fail fast to cache
+                        headers=self.default_headers
+                    )
                 else:
-                    # Last resort: static players list
-                    print("⚠️ Cache not available, using static players list...")
-                    try:
-                        all_players = players.get_players()
-                        self._all_players_cache[cache_key] = [
-                            {
-                                'PERSON_ID': p['id'],
-                                'DISPLAY_FIRST_LAST': p['full_name'],
-                                'TEAM_ID': None,
-                                'TEAM_ABBREVIATION': None
-                            }
-                            for p in all_players
-                        ]
-                        print(f"✅ Using static players list ({len(self._all_players_cache[cache_key])} players)")
-                    except Exception as fallback_error:
-                        print(f"❌ All fallbacks failed: {fallback_error}")
-                        raise ValueError(f"Failed to fetch players for season {season} - API, cache, and static list all failed")
-        
-        return self._all_players_cache[cache_key]
+                    # For historical seasons, get all players (not just current)
+                    all_players = commonallplayers.CommonAllPlayers(
+                        is_only_current_season=0,
+                        league_id='00',
+                        season=season,
+                        timeout=request_timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS, UPSTREAM_TIMEOUT_SECONDS),  # Very short timeout - fail fast to cache
+                        headers=self.default_headers
+                    )
+                return all_players.get_data_frames()[0]
+            
+            # Try API with very short timeout - fail fast to cache
+            players_data = self._call_upstream(fetch_players, PLAYERS_RETRY_POLICY)
+            
+            # Filter by season if needed (for historical seasons)
+            if season != self._get_current_season():
+                # Filter players who played in that season
+                # This is a simplified approach - in production, you might want
+                # to check player game logs for that season
+                pass
+            
+            season_players = players_data.to_dict('records')
+            print(f"✅ Fetched {len(season_players)} players from NBA API")
+            return season_players, 'api'
+        except Exception as e:
+            # Fallback to cached JSON file
+            print(f"⚠️ NBA API failed for season {season}: {e}")
+            print("🔄 Attempting to load from cache...")
+            
+            cached_players = self._load_cached_players(season, self._snapshot)
+            if cached_players:
+                print(f"✅ Using cached players (fallback mode)")
+                return cached_players, 'cache'
+            else:
+                # Last resort: static players list
+                print("⚠️ Cache not available, using static players list...")
+                try:
+                    all_players = players.get_players()
+                    season_players = [
+                        {
+                            'PERSON_ID': p['id'],
+                            'DISPLAY_FIRST_LAST': p['full_name'],
+                            'TEAM_ID': None,
+                            'TEAM_ABBREVIATION': None
+                        }
+                        for p in all_players
+                    ]
+                    print(f"✅ Using static players list ({len(season_players)} players)")
+                    return season_players, 'static'
+                except Exception as fallback_error:
+                    print(f"❌ All fallbacks failed: {fallback_error}")
+                    raise ValueError(f"Failed to fetch players for season {season} - API, cache, and static list all failed")
+    
+    def _build_season_data(self, season: str, season_players: List[Dict], source: str,
+                           details_cache: PlayerDetailsCache) -> SeasonData:
+        """Build the search/facet indexes and client roster bundle for a season's players"""
+        aliases = self._load_player_aliases()
+        # Read details per player while indexing; the records themselves stay in the snapshot
+        season_details = details_cache.season_view(season)
+        popularity = {}
+        for player in season_players:
+            details = season_details.get(player['PERSON_ID'])
+            if details is not None:
+                popularity[int(player['PERSON_ID'])] = details.ppg
+        search_index = PlayerSearchIndex(season_players, popularity=popularity, aliases=aliases)
+        return SeasonData(
+            players=season_players,
+            source=source,
+            search_index=search_index,
+            roster_bundle=RosterBundle(season, season_players, aliases, ranks=search_index.popularity_ranks()),
+            facet_index=FacetIndex(season_players, season_details),
+            records={int(player['PERSON_ID']): player for player in season_players}
+        )
+    
+    def get_search_index(self, season: Optional[str] = None) -> PlayerSearchIndex:
+        """Get the name search index for a season, loading its players if needed"""
+        return self._get_season_data(season).search_index
     
     def _get_current_season(self) -> str:
         """Get current NBA season string"""
@@ -261,7 +539,7 @@ class NBADataService:
         next_year_short = str(year + 1)[-2:]
         return f"{year}-{next_year_short}"
     
-    def get_random_player(self, season: Optional[str] = None) -> Dict:
+    def get_random_player(self, season: Optional[str] = None) -> Player:
         """Get a random NBA player from a given season"""
         if season is None:
             season = self._get_current_season()
@@ -274,236 +552,429 @@ class NBADataService:
         # No delay - we'll fail fast to cache if needed
         return self.get_player_details(player['PERSON_ID'], season)
     
-    def get_player_details(self, player_id: int, season: Optional[str] = None) -> Dict:
+    def get_player_details(self, player_id: int, season: Optional[str] = None) -> Player:
         """Get detailed information about a specific player for a given season"""
         if season is None:
             season = self._get_current_season()
         
-        # Check if we have cached player details first - use cache if available
-        player_id_str = str(player_id)
-        if player_id_str in self._player_details_cache:
-            cached_details = self._player_details_cache[player_id_str]
-            # Check if cache is for the right season (or if it's general info)
-            if cached_details.get('season') == season or cached_details.get('season') is None:
-                # Use cache immediately - no API call needed
-                return cached_details
+        # Check if we have cached player details for this season (or general info) first
+        cached_details = self._get_cached_details(player_id, season)
+        if cached_details is not None:
+            return cached_details
         
-        # Only try API if we don't have cached data
+        # Only try API if we don't have cached data - and it hasn't just failed for this id
         # Try API first, fallback to cached data if it fails
+        failure_key = (int(player_id), season)
+        error_msg = self._failed_lookups.get(failure_key)
+        if error_msg is None:
+            try:
+                return self._fetch_player_details(player_id, season)
+            except Exception as e:
+                error_msg = str(e)
+                # A rejected or out-of-budget call says nothing about this id; don't remember it
+                if not isinstance(e, (CircuitOpenError, DeadlineExceeded)):
+                    self._failed_lookups.set(failure_key, error_msg)
+                print(f"⚠️ API failed for player {player_id}: {error_msg}")
+        else:
+            print(f"⚠️ API failed for player {player_id} recently, skipping it: {error_msg}")
+        return self._fallback_player_details(player_id, season, error_msg)
+    
+    def _fallback_player_details(self, player_id: int, season: str, error_msg: str,
+                                 load_season: bool = True) -> Player:
+        """
+        Details from the caches after the API failed (or ran out of time)
+        
+        With load_season=False only an already loaded players list is used, so
+        this never blocks on upstream work (e.g. when called on the event loop).
+        """
+        print(f"🔄 Attempting to use cached player data...")
+        
+        # Fallback: try to get player from cached players list
+        try:
+            if load_season:
+                player_from_cache = self.get_player_record(player_id, season)
+            else:
+                season_data = self._seasons.get(season)
+                player_from_cache = season_data.records.get(int(player_id)) if season_data else None
+            
+            if player_from_cache:
+                # Check if we have full details cached, even from another season
+                player_id_str = str(player_id)
+                cached_details = self._player_details_cache.get_any_season(player_id)
+                if cached_details is not None:
+                    print(f"✅ Using full cached player details for {player_id}")
+                    return cached_details
+                
+                # Otherwise, use minimal data from players list cache
+                print(f"✅ Using minimal cached data for player {player_id} (fallback mode)")
+                image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
+                
+                # Get team name from cache if available
+                team_name = player_from_cache.get('TEAM_NAME', '')
+                team_abbrev = player_from_cache.get('TEAM_ABBREVIATION', '')
+                team_display = team_name or team_abbrev or 'Unknown'
+                
+                # Try to get division/conference from static teams data
+                division = ''
+                conference = ''
+                if team_abbrev:
+                    try:
+                        teams_info = self.get_teams_info()
+                        if team_abbrev in teams_info:
+                            team_data = teams_info[team_abbrev]
+                            division = team_data.get('division', '')
+                            conference = team_data.get('conference', '')
+                    except:
+                        pass
+                
+                # Note: In fallback mode, detailed stats (age, height, position, jersey, ppg) are not available
+                # This is expected when NBA API is unavailable - game still works with basic info
+                minimal_details = Player.from_dict({
+                    'id': player_id,
+                    'name': player_from_cache.get('DISPLAY_FIRST_LAST', 'Unknown'),
+                    'team': team_display,
+                    'team_abbreviation': team_abbrev,
+                    'division': division,  # From static teams data if available
+                    'conference': conference,  # From static teams data if available
+                    'age': None,  # Not available in cache - API required
+                    'height': '',  # Not available in cache - API required
+                    'position': '',  # Not available in cache - API required
+                    'jersey_number': None,  # Not available in cache - API required
+                    'ppg': 0.0,  # Default to 0 when using cache - API required
+                    'image_url': image_url,
+                    'season': season
+                })
+                return minimal_details
+            else:
+                print(f"❌ Player {player_id} not found in cache either")
+                raise ValueError(f"Player {player_id} not found in API or cache")
+        except Exception as cache_error:
+            print(f"❌ Cache fallback also failed: {cache_error}")
+            # Provide helpful error message
+            if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
+                raise ValueError(f"NBA API timed out and player not in cache. Please try again.")
+            elif "connection" in error_msg.lower():
+                raise ValueError(f"Failed to connect to NBA API and player not in cache. Please try again.")
+            else:
+                raise ValueError(f"Failed to fetch player details for {player_id}: {error_msg}")
+
+    def _get_cached_details(self, player_id: int, season: str) -> Optional[Player]:
+        """Cached details for a season (or general info); stale entries are refreshed in the background"""
+        cached = self._player_details_cache.lookup(player_id, season)
+        if cached is None:
+            return None
+        if time.time() - cached.fetched_at > DETAILS_MAX_AGE_SECONDS:
+            self._schedule_details_refresh(player_id, season)
+        return cached.details
+    
+    async def _run_upstream(self, func, *args):
+        """Run a blocking service call on the bounded upstream executor"""
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so the request deadline follows the call
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._upstream_executor, functools.partial(context.run, func, *args))
+    
+    async def _within_deadline(self, awaitable, fallback: Callable[[], T]) -> T:
+        """
+        Await upstream work, or return fallback() once the request deadline passes
+        
+        Bounds time spent queued for an upstream thread as well as the call
+        itself. Work already running finishes in the background (and fills
+        the caches); only this request stops waiting for it.
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return await awaitable
         try:
-            # Get player info (this is general info, not season-specific)
-            def fetch_player_info():
-                player_info = commonplayerinfo.CommonPlayerInfo(
+            return await asyncio.wait_for(awaitable, deadline.remaining())
+        except asyncio.TimeoutError:
+            print("⚠️ Request deadline exceeded waiting for upstream work, using cached data")
+            return fallback()
+    
+    def _cached_season_data(self, season: str) -> SeasonData:
+        """A season indexed from the cache files only, for when its API load ran out of time"""
+        season_data = self._seasons.get(season)
+        if season_data is not None:
+            return season_data
+        cached_players = self._load_cached_players(season, self._snapshot)
+        if not cached_players:
+            raise ValueError(f"NBA API timed out loading season {season} and no cached players list. Please try again.")
+        season_data = self._build_season_data(season, cached_players, 'cache', self._player_details_cache)
+        # The API load still running replaces this when it completes
+        self._seasons.setdefault(season, season_data)
+        self.data_version += 1
+        return self._seasons[season]
+    
+    async def aget_season_data(self, season: Optional[str] = None) -> SeasonData:
+        """Async _get_season_data: loaded seasons return on the event loop"""
+        if season is None:
+            season = self._get_current_season()
+        season_data = self._seasons.get(season)
+        if season_data is not None:
+            return season_data
+        return await self._within_deadline(
+            self._run_upstream(self._get_season_data, season),
+            lambda: self._cached_season_data(season)
+        )
+    
+    async def aget_random_player(self, season: Optional[str] = None) -> Player:
+        """Async get_random_player"""
+        if season is None:
+            season = self._get_current_season()
+        
+        season_data = await self.aget_season_data(season)
+        if not season_data.players:
+            raise ValueError(f"No players found for season {season}")
+        
+        player = random.choice(season_data.players)
+        return await self.aget_player_details(player['PERSON_ID'], season)
+    
+    async def aget_player_details(self, player_id: int, season: Optional[str] = None) -> Player:
+        """Async get_player_details: cache hits return on the event loop, misses go to the upstream executor"""
+        if season is None:
+            season = self._get_current_season()
+        
+        cached_details = self._get_cached_details(player_id, season)
+        if cached_details is not None:
+            return cached_details
+        # Concurrent misses for the same player wait on one executor job instead of each taking a thread
+        return await self._within_deadline(
+            self._single_flight.ado(
+                ('get_player_details', int(player_id), season),
+                self._upstream_executor, self.get_player_details, player_id, season
+            ),
+            lambda: self._fallback_player_details(
+                player_id, season, "Upstream call timed out: request deadline exceeded", load_season=False
+            )
+        )
+    
+    def _schedule_details_refresh(self, player_id: int, season: str):
+        """Refresh stale cached details in the background, once per player and season at a time"""
+        key = (int(player_id), season)
+        now = time.time()
+        with self._refresh_lock:
+            last_attempt = self._refresh_attempts.peek(key)
+            if key in self._refreshing or (last_attempt is not None and now - last_attempt < REFRESH_RETRY_SECONDS):
+                return
+            self._refreshing.add(key)
+            self._refresh_attempts.set(key, now)
+        try:
+            self._refresh_executor.submit(self._refresh_player_details, *key)
+        except RuntimeError:
+            # Executor already shut down
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+    
+    def _refresh_player_details(self, player_id: int, season: str):
+        """Background half of stale-while-revalidate; failures keep the stale entry"""
+        try:
+            self._fetch_player_details(player_id, season, strict=True)
+            print(f"✅ Refreshed stale details for player {player_id} ({season})")
+        except Exception as e:
+            print(f"⚠️ Background refresh failed for player {player_id} ({season}): {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard((player_id, season))
+    
+    def _fetch_player_details(self, player_id: int, season: str, strict: bool = False) -> Player:
+        """
+        Fetch a player's details for a season from the NBA API and cache them
+        
+        With strict=True a failed stats or team lookup raises instead of saving
+        ppg 0.0 / blank division and conference, so background refreshes never
+        replace good cached data with partial data.
+        """
+        # Get player info (this is general info, not season-specific)
+        def fetch_player_info():
+            player_info = commonplayerinfo.CommonPlayerInfo(
+                player_id=player_id,
+                timeout=request_timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS, UPSTREAM_TIMEOUT_SECONDS),  # Very short timeout - fail fast
+                headers=self.default_headers
+            )
+            return player_info.get_data_frames()[0]
+        
+        # Retry with jittered exponential backoff (single retry for faster fallback)
+        # Player info is the same for every season, so callers for any season share the call
+        info_df = self._single_flight.do(
+            ('CommonPlayerInfo', int(player_id), None),
+            self._call_upstream, fetch_player_info, DETAILS_RETRY_POLICY
+        )
+        
+        if info_df.empty:
+            raise ValueError(f"Player {player_id} not found")
+        
+        player_data = info_df.iloc[0].to_dict()
+        
+        # Skip delay - we're already fast-failing
+        
+        # Calculate age from birthdate
+        age = None
+        birthdate_str = player_data.get('BIRTHDATE')
+        if birthdate_str:
+            try:
+                # Parse birthdate (format: "YYYY-MM-DDT00:00:00")
+                birth_date = datetime.strptime(birthdate_str.split("T")[0], "%Y-%m-%d").date()
+                today = date.today()
+                age = today.year - birth_date.year
+                # Adjust if birthday hasn't occurred yet this year
+                if (today.month, today.day) < (birth_date.month, birth_date.day):
+                    age -= 1
+            except Exception as e:
+                print(f"Error calculating age from birthdate {birthdate_str}: {e}")
+                age = None
+        
+        # Get stats for the specified season
+        ppg = 0.0
+        try:
+            def fetch_player_stats():
+                game_log = playergamelog.PlayerGameLog(
                     player_id=player_id,
-                    timeout=5,  # Very short timeout - fail fast
+                    season=season,
+                    timeout=request_timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS, UPSTREAM_TIMEOUT_SECONDS),  # Very short timeout - fail fast
                     headers=self.default_headers
                 )
-                return player_info.get_data_frames()[0]
-            
-            # Retry with exponential backoff (single retry for faster fallback)
-            info_df = self._retry_api_call(fetch_player_info, max_retries=1, delay=0.5)
-            
-            if info_df.empty:
-                raise ValueError(f"Player {player_id} not found")
-            
-            player_data = info_df.iloc[0].to_dict()
+                return game_log.get_data_frames()[0]
             
-            # Skip delay - we're already fast-failing
+            # Single retry, within the request deadline
+            stats_df = self._single_flight.do(
+                ('PlayerGameLog', int(player_id), season),
+                self._call_upstream, fetch_player_stats, DETAILS_RETRY_POLICY
+            )
             
-            # Calculate age from birthdate
-            age = None
-            birthdate_str = player_data.get('BIRTHDATE')
-            if birthdate_str:
-                try:
-                    # Parse birthdate (format: "YYYY-MM-DDT00:00:00")
-                    birth_date = datetime.strptime(birthdate_str.split("T")[0], "%Y-%m-%d").date()
-                    today = date.today()
-                    age = today.year - birth_date.year
-                    # Adjust if birthday hasn't occurred yet this year
-                    if (today.month, today.day) < (birth_date.month, birth_date.day):
-                        age -= 1
-                except Exception as e:
-                    print(f"Error calculating age from birthdate {birthdate_str}: {e}")
-                    age = None
-            
-            # Get stats for the specified season
+            if not stats_df.empty:
+                # Calculate PPG from the specified season
+                ppg = stats_df['PTS'].mean()
+            else:
+                # Player didn't play in this season
+                ppg = 0.0
+        except Exception as e:
+            print(f"Error fetching stats for player {player_id} in season {season}: {e}")
+            if strict:
+                raise
             ppg = 0.0
+        
+        # Get team info
+        team_id = player_data.get('TEAM_ID')
+        team_abbrev = player_data.get('TEAM_ABBREVIATION', '')
+        team_name = player_data.get('TEAM_NAME', '')
+        
+        # Get division and conference
+        division = None
+        conference = None
+        if team_id:
             try:
-                def fetch_player_stats():
-                    game_log = playergamelog.PlayerGameLog(
-                        player_id=player_id,
-                        season=season,
-                        timeout=5,  # Very short timeout - fail fast
+                def fetch_team_info():
+                    team_info = teaminfocommon.TeamInfoCommon(
+                        team_id=team_id,
+                        timeout=request_timeout(UPSTREAM_CONNECT_TIMEOUT_SECONDS, UPSTREAM_TIMEOUT_SECONDS),  # Very short timeout
                         headers=self.default_headers
                     )
-                    return game_log.get_data_frames()[0]
+                    return team_info.team_info_common.get_data_frame()
                 
-                # Single retry with no delay
-                stats_df = self._retry_api_call(fetch_player_stats, max_retries=1, delay=0.5)
+                # Skip retry for team info - it's not critical
+                team_df = self._single_flight.do(
+                    ('TeamInfoCommon', int(team_id), None),
+                    self._call_upstream, fetch_team_info, TEAM_INFO_RETRY_POLICY
+                )
                 
-                if not stats_df.empty:
-                    # Calculate PPG from the specified season
-                    ppg = stats_df['PTS'].mean()
-                else:
-                    # Player didn't play in this season
-                    ppg = 0.0
+                if not team_df.empty:
+                    division = team_df.iloc[0].get('TEAM_DIVISION', '')
+                    conference = team_df.iloc[0].get('TEAM_CONFERENCE', '')
             except Exception as e:
-                print(f"Error fetching stats for player {player_id} in season {season}: {e}")
-                ppg = 0.0
-            
-            # Get team info
-            team_id = player_data.get('TEAM_ID')
-            team_abbrev = player_data.get('TEAM_ABBREVIATION', '')
-            team_name = player_data.get('TEAM_NAME', '')
-            
-            # Get division and conference
-            division = None
-            conference = None
-            if team_id:
-                try:
-                    def fetch_team_info():
-                        team_info = teaminfocommon.TeamInfoCommon(
-                            team_id=team_id,
-                            timeout=5,  # Very short timeout
-                            headers=self.default_headers
-                        )
-                        return team_info.team_info_common.get_data_frame()
-                    
-                    # Skip retry for team info - it's not critical
-                    team_df = self._retry_api_call(fetch_team_info, max_retries=0, delay=0)
-                    
-                    if not team_df.empty:
-                        division = team_df.iloc[0].get('TEAM_DIVISION', '')
-                        conference = team_df.iloc[0].get('TEAM_CONFERENCE', '')
-                except Exception as e:
-                    print(f"Error fetching team info for team_id {team_id}: {e}")
-                    pass
-            
-            # Generate player image URL (NBA.com format)
-            player_id_str = str(player_data.get('PERSON_ID', player_id))
-            # NBA.com uses format: https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png
-            image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
-            
-            player_details = {
-                'id': int(player_data.get('PERSON_ID', player_id)),
-                'name': player_data.get('DISPLAY_FIRST_LAST', 'Unknown'),
-                'team': team_name or team_abbrev or 'Free Agent',
-                'team_abbreviation': team_abbrev or '',
-                'division': division or '',
-                'conference': conference or '',
-                'age': age,
-                'height': player_data.get('HEIGHT', ''),
-                'position': player_data.get('POSITION', ''),
-                'jersey_number': int(player_data.get('JERSEY', 0)) if player_data.get('JERSEY') else None,
-                'ppg': round(float(ppg), 1) if ppg else 0.0,
-                'image_url': image_url,
-                'season': season  # Store season for cache validation
-            }
-            
-            # Save to cache for future use
-            self._save_player_details_cache(player_id, player_details)
-            
-            return player_details
-        except Exception as e:
-            error_msg = str(e)
-            print(f"⚠️ API failed for player {player_id}: {error_msg}")
-            print(f"🔄 Attempting to use cached player data...")
-            
-            # Fallback: try to get player from cached players list
-            try:
-                cached_players = self.get_all_active_players(season)
-                player_from_cache = None
-                for p in cached_players:
-                    if p.get('PERSON_ID') == player_id:
-                        player_from_cache = p
-                        break
-                
-                if player_from_cache:
-                    # Check if we have full details cached
-                    player_id_str = str(player_id)
-                    if player_id_str in self._player_details_cache:
-                        cached_details = self._player_details_cache[player_id_str]
-                        print(f"✅ Using full cached player details for {player_id}")
-                        return cached_details
-                    
-                    # Otherwise, use minimal data from players list cache
-                    print(f"✅ Using minimal cached data for player {player_id} (fallback mode)")
-                    image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
-                    
-                    # Get team name from cache if available
-                    team_name = player_from_cache.get('TEAM_NAME', '')
-                    team_abbrev = player_from_cache.get('TEAM_ABBREVIATION', '')
-                    team_display = team_name or team_abbrev or 'Unknown'
-                    
-                    # Try to get division/conference from static teams data
-                    division = ''
-                    conference = ''
-                    if team_abbrev:
-                        try:
-                            teams_info = self.get_teams_info()
-                            if team_abbrev in teams_info:
-                                team_data = teams_info[team_abbrev]
-                                division = team_data.get('division', '')
-                                conference = team_data.get('conference', '')
-                        except:
-                            pass
-                    
-                    # Note: In fallback mode, detailed stats (age, height, position, jersey, ppg) are not available
-                    # This is expected when NBA API is unavailable - game still works with basic info
-                    minimal_details = {
-                        'id': player_id,
-                        'name': player_from_cache.get('DISPLAY_FIRST_LAST', 'Unknown'),
-                        'team': team_display,
-                        'team_abbreviation': team_abbrev,
-                        'division': division,  # From static teams data if available
-                        'conference': conference,  # From static teams data if available
-                        'age': None,  # Not available in cache - API required
-                        'height': '',  # Not available in cache - API required
-                        'position': '',  # Not available in cache - API required
-                        'jersey_number': None,  # Not available in cache - API required
-                        'ppg': 0.0,  # Default to 0 when using cache - API required
-                        'image_url': image_url,
-                        'season': season
-                    }
-                    return minimal_details
-                else:
-                    print(f"❌ Player {player_id} not found in cache either")
-                    raise ValueError(f"Player {player_id} not found in API or cache")
-            except Exception as cache_error:
-                print(f"❌ Cache fallback also failed: {cache_error}")
-                # Provide helpful error message
-                if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                    raise ValueError(f"NBA API timed out and player not in cache. Please try again.")
-                elif "connection" in error_msg.lower():
-                    raise ValueError(f"Failed to connect to NBA API and player not in cache. Please try again.")
-                else:
-                    raise ValueError(f"Failed to fetch player details for {player_id}: {error_msg}")
+                print(f"Error fetching team info for team_id {team_id}: {e}")
+                if strict:
+                    raise
+        
+        # Generate player image URL (NBA.com format)
+        player_id_str = str(player_data.get('PERSON_ID', player_id))
+        # NBA.com uses format: https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id}.png
+        image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
+        
+        player_details = Player.from_dict({
+            'id': int(player_data.get('PERSON_ID', player_id)),
+            'name': player_data.get('DISPLAY_FIRST_LAST', 'Unknown'),
+            'team': team_name or team_abbrev or 'Free Agent',
+            'team_abbreviation': team_abbrev or '',
+            'division': division or '',
+            'conference': conference or '',
+            'age': age,
+            'height': player_data.get('HEIGHT', ''),
+            'position': player_data.get('POSITION', ''),
+            'jersey_number': int(player_data.get('JERSEY', 0)) if player_data.get('JERSEY') else None,
+            'ppg': round(float(ppg), 1) if ppg else 0.0,
+            'image_url': image_url,
+            'season': season  # Store season for cache validation
+        })
+        
+        # Save to cache for future use
+        self._save_player_details_cache(player_id, player_details)
+        
+        return player_details
     
-    def search_players(self, query: str, limit: int = 20, season: Optional[str] = None) -> List[Dict]:
-        """Search for players by name for a given season"""
-        if not query or len(query) < 2:
-            return []
+    def get_player_record(self, player_id: int, season: Optional[str] = None) -> Optional[Dict]:
+        """Get a player's record from a season's players list by PERSON_ID, loading players if needed"""
+        return self._get_season_data(season).records.get(int(player_id))
+    
+    def get_facet_index(self, season: Optional[str] = None) -> FacetIndex:
+        """Get the search filter bitmaps for a season, loading its players if needed"""
+        return self._get_season_data(season).facet_index
+    
+    def get_player_table(self, season: Optional[str] = None) -> PlayerTable:
+        """
+        Get the columnar NumPy table of a season's player details, loading players if needed
+
+        Rows line up with the season's players list (the facet index filters with it);
+        players without cached details are unknown in every column.
+        """
+        return self._get_season_data(season).facet_index.table
+    
+    def get_roster_bundle(self, season: Optional[str] = None) -> RosterBundle:
+        """Get the compact roster bundle for client-side search, loading players if needed"""
+        return self._get_season_data(season).roster_bundle
+    
+    def search_players(self, query: str, limit: int = 20, season: Optional[str] = None,
+                       fuzzy: bool = False, phonetic: bool = False, boost: bool = True,
+                       filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Search for players by name for a given season, best matches first
         
-        query_lower = query.lower()
-        active_players = self.get_all_active_players(season)
+        fuzzy=True tolerates typos, phonetic=True matches names that sound alike
+        ("Yanis" -> Giannis); boost=True ranks popular and rostered players higher.
+        filters narrows results by team, conference, division, position group and
+        age/height/ppg ranges (see FacetIndex.filter_mask); with filters, an
+        empty query lists every matching player.
+        """
+        # One SeasonData for both lookups: facet rows must match the index they came from
+        season_data = self._get_season_data(season)
+        row_mask = season_data.facet_index.filter_mask(filters)
+        if row_mask is None and (not query or len(query) < 2):
+            return []
         
         matches = []
-        for player in active_players:
-            name = player.get('DISPLAY_FIRST_LAST', '')
-            if query_lower in name.lower():
-                player_id_str = str(player['PERSON_ID'])
-                image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
-                matches.append({
-                    'id': player['PERSON_ID'],
-                    'name': name,
-                    'team': player.get('TEAM_ABBREVIATION', ''),
-                    'image_url': image_url
-                })
-                if len(matches) >= limit:
-                    break
+        for player in season_data.search_index.search(query or '', limit, fuzzy=fuzzy, phonetic=phonetic, boost=boost,
+                                   row_mask=row_mask):
+            player_id_str = str(player['PERSON_ID'])
+            image_url = f"https://cdn.nba.com/headshots/nba/latest/1040x760/{player_id_str}.png"
+            matches.append({
+                'id': player['PERSON_ID'],
+                'name': player.get('DISPLAY_FIRST_LAST', ''),
+                'team': player.get('TEAM_ABBREVIATION', ''),
+                'image_url': image_url
+            })
         
         return matches
     
+    def diagnostics(self) -> Dict:
+        """Upstream circuit state and cache statistics"""
+        return {
+            'data_version': self.data_version,
+            'circuit_breaker': self.circuit_breaker.stats(),
+            'failed_lookups': self._failed_lookups.stats(),
+            'single_flight': self._single_flight.stats(),
+            'http_pool': session_stats(self.session),
+            'seasons_loaded': sorted(self._seasons)
+        }
+    
     def get_teams_info(self) -> Dict:
         """Get teams information for division/conference lookup"""
         if self._teams_cache is None:
@@ -514,10 +985,13 @@ class NBADataService:
                 self._teams_cache = {}
         return self._teams_cache
     
-    def __del__(self):
-        """Save cache on service destruction"""
+    def shutdown(self):
+        """Stop the cache watcher and background cache writer, writing any player details still pending"""
+        self._watcher_stop.set()
+        self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+        self._upstream_executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
         try:
-            if hasattr(self, '_player_details_cache') and self._player_details_cache:
-                self._flush_player_details_cache()
-        except:
-            pass
+            self._details_writer.stop()
+        except Exception as e:
+            print(f"⚠️ Error flushing player details cache: {e}")
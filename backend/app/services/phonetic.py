@@ -0,0 +1,194 @@
+"""
+Phonetic Codes - Double-Metaphone-style sound keys for player name tokens
+"""
+from typing import Set, Tuple
+
+
+# Longer than Double Metaphone's usual 4 so long surnames don't all collide
+MAX_CODE_LENGTH = 6
+
+_VOWELS = set('aeiou')
+
+
+def _is_vowel(token: str, i: int) -> bool:
+    if i < 0 or i >= len(token):
+        return False
+    char = token[i]
+    if char in _VOWELS:
+        return True
+    # "y" is a vowel unless it starts a syllable ("Yanis", "Maya")
+    return char == 'y' and not _is_vowel(token, i + 1)
+
+
+def phonetic_codes(token: str) -> Tuple[str, str]:
+    """
+    Encode a normalized name token as (primary, alternate) sound keys
+
+    Like Double Metaphone, the primary code follows English pronunciation and
+    the alternate code follows continental spellings common on NBA rosters:
+    Slavic "c"/"ch" ("Vučević" ~ "Vuchevich"), Greek/Italian "gi" and "y"
+    ("Giannis" ~ "Yanis") and German "sch"/"w" ("Schröder" ~ "Shroder").
+    Both codes are equal for most tokens.
+
+    Args:
+        token: Output of normalize_name for a single word (a-z and digits)
+    """
+    primary = []
+    alternate = []
+
+    def add(primary_code: str, alternate_code: str = None):
+        primary.append(primary_code)
+        alternate.append(primary_code if alternate_code is None else alternate_code)
+
+    token = ''.join(c for c in token if c.isalpha())
+    length = len(token)
+    i = 0
+    while i < length:
+        char = token[i]
+        next_char = token[i + 1] if i + 1 < length else ''
+        after_next = token[i + 2] if i + 2 < length else ''
+
+        # Doubled letters sound like one ("Giannis", "Curry")
+        if i > 0 and char == token[i - 1] and char != 'c':
+            i += 1
+            continue
+
+        if _is_vowel(token, i):
+            if i == 0:
+                add('A')
+            i += 1
+        elif char == 'y':
+            # Consonant "y" and "j" are the same sound in most roster languages
+            add('J')
+            i += 1
+        elif char == 'b':
+            add('P')
+            i += 1
+        elif char == 'c':
+            if next_char == 'h':
+                if after_next in ('r', 'l'):
+                    add('K')  # "Chris"
+                else:
+                    add('X')
+                i += 2
+            elif next_char == 'k':
+                add('K')
+                i += 2
+            elif next_char == 'z':
+                add('X')  # Polish "cz"
+                i += 2
+            elif next_char in ('e', 'i', 'y'):
+                add('S', 'X')
+                i += 1
+            elif i == length - 1:
+                add('K', 'X')  # Slavic "-ić" endings ("Jokić", "Dončić")
+                i += 1
+            else:
+                add('K')
+                i += 1
+        elif char == 'd':
+            if next_char == 'j':
+                add('J')  # "Djordje"
+                i += 2
+            else:
+                add('T')
+                i += 1
+        elif char == 'g':
+            if next_char == 'h':
+                if i == 0:
+                    add('K')
+                i += 2
+            elif next_char in ('e', 'i', 'y'):
+                if next_char == 'i' and _is_vowel(token, i + 2):
+                    # "Giannis": the "i" only softens the "g"
+                    add('J')
+                    i += 2
+                else:
+                    add('J', 'K')
+                    i += 1
+            else:
+                add('K')
+                i += 1
+        elif char == 'h':
+            # Only sounded before a vowel at the start of a syllable
+            if _is_vowel(token, i + 1) and (i == 0 or _is_vowel(token, i - 1)):
+                add('H')
+            i += 1
+        elif char == 'j':
+            add('J')
+            i += 1
+        elif char == 'k':
+            if i == 0 and next_char == 'n':
+                i += 1  # silent "k" in "Knox"
+                continue
+            add('K')
+            i += 1
+        elif char == 'p':
+            if next_char == 'h':
+                add('F')
+                i += 2
+            else:
+                add('P')
+                i += 1
+        elif char == 'q':
+            add('K')
+            i += 1
+        elif char == 's':
+            if next_char == 'c' and after_next == 'h':
+                add('SK', 'X')  # "Schröder"
+                i += 3
+            elif next_char == 'h':
+                add('X')
+                i += 2
+            elif next_char == 'z':
+                add('S', 'X')
+                i += 2
+            else:
+                add('S')
+                i += 1
+        elif char == 't':
+            if next_char == 'h':
+                add('0', 'T')
+                i += 2
+            elif next_char == 'c' and after_next == 'h':
+                add('X')
+                i += 3
+            elif next_char in ('s', 'z'):
+                add('S')
+                i += 2
+            else:
+                add('T')
+                i += 1
+        elif char == 'v':
+            add('F')
+            i += 1
+        elif char == 'w':
+            if _is_vowel(token, i + 1):
+                add('W', 'F')
+            i += 1
+        elif char == 'x':
+            add('S' if i == 0 else 'KS')
+            i += 1
+        elif char == 'z':
+            add('S')
+            i += 1
+        else:
+            # f, l, m, n, r
+            add(char.upper())
+            i += 1
+
+    return _collapse(primary), _collapse(alternate)
+
+
+def _collapse(parts) -> str:
+    """Join code parts, merge repeated sounds and trim to MAX_CODE_LENGTH"""
+    code = []
+    for char in ''.join(parts):
+        if not code or code[-1] != char:
+            code.append(char)
+    return ''.join(code[:MAX_CODE_LENGTH])
+
+
+def phonetic_keys(token: str) -> Set[str]:
+    """Distinct non-empty codes for a token (one or two)"""
+    return {code for code in phonetic_codes(token) if code}
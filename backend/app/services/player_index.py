@@ -0,0 +1,381 @@
+"""
+Player Search Index - In-memory inverted index over player names for autocomplete
+"""
+from typing import List, Dict, Set, Iterable, Optional, Tuple
+import heapq
+import re
+import unicodedata
+from app.services.caching import LRUCache
+from app.services.facets import iter_rows
+from app.services.phonetic import phonetic_keys
+
+
+# Queries shorter than this never reach the index (see NBADataService.search_players)
+MIN_QUERY_LENGTH = 2
+NGRAM_SIZE = 3
+# Fuzzy search tolerates at most this many edits per query token
+MAX_EDIT_DISTANCE = 2
+# A phonetic match ranks like a one-edit typo; very short tokens have no useful sound key
+PHONETIC_DISTANCE = 1
+MIN_PHONETIC_TOKEN_LENGTH = 3
+# Recent query results kept for keystroke narrowing ("le" -> "leb" -> "lebr")
+QUERY_CACHE_ENTRIES = 512
+QUERY_CACHE_MAX_ROWS = 50_000
+
+# Match tiers - lower ranks first
+TIER_ALIAS = 0         # "the king" -> LeBron James
+TIER_EXACT_TOKEN = 1   # "james" -> LeBron James
+TIER_PREFIX = 2        # "leb" -> LeBron James
+TIER_SUBSTRING = 3     # "bron" -> LeBron James
+TIER_FUZZY = 4         # only reachable through fuzzy search
+# Boosts only reorder players inside the same tier
+POPULARITY_BOOST_PER_PPG = 0.1
+ROSTER_BOOST = 1.0
+
+_SEPARATORS = re.compile(r"[-_/\s]+")
+_DROPPED = re.compile(r"[^a-z0-9 ]")
+
+
+def normalize_name(text: str) -> str:
+    """
+    Normalize a player name or query for matching
+
+    Strips accents ("Jokić" -> "jokic"), lowercases, turns hyphens into spaces
+    ("Gilgeous-Alexander") and drops periods/apostrophes ("A.J.", "De'Aaron").
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    spaced = _SEPARATORS.sub(' ', stripped.lower())
+    return _DROPPED.sub('', spaced).strip()
+
+
+def max_edits_for(token: str) -> int:
+    """Edit budget for a token - short tokens get fewer typos so they stay precise"""
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 5:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def _deletes(token: str, max_distance: int) -> Set[str]:
+    """All strings reachable from token by deleting up to max_distance characters"""
+    results = set()
+    frontier = {token}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+
+    Returns max_distance + 1 as soon as the distance is known to exceed the bound.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class PlayerSearchIndex:
+    """
+    Token, prefix and n-gram index over one season's player list
+
+    Built once when a season's players are loaded. Rows are positions in the
+    original players list; ties in ranking fall back to that roster order.
+
+    Args:
+        players: Player records from the players list (PERSON_ID, DISPLAY_FIRST_LAST, ...)
+        popularity: Optional PERSON_ID -> points per game, used as a ranking boost
+        aliases: Optional nickname/abbreviation -> PERSON_ID ("SGA", "Greek Freak")
+    """
+
+    def __init__(self, players: List[Dict], popularity: Optional[Dict[int, float]] = None,
+                 aliases: Optional[Dict[str, int]] = None,
+                 query_cache_entries: int = QUERY_CACHE_ENTRIES,
+                 query_cache_max_rows: int = QUERY_CACHE_MAX_ROWS):
+        self.players = players
+        # normalized query -> frozenset of matching rows, capped by total rows held
+        self._query_cache = LRUCache(query_cache_entries, query_cache_max_rows, weigher=len)
+        self._names: List[str] = []
+        # Padded names make whole-token and token-prefix checks a single `in`
+        self._padded_names: List[str] = []
+        self._boosts: List[float] = []
+        self._tokens: Dict[str, Set[int]] = {}
+        self._prefixes: Dict[str, Set[int]] = {}
+        self._ngrams: Dict[str, Set[int]] = {}
+        # SymSpell-style deletion dictionary: delete variant -> name tokens
+        self._token_deletes: Dict[str, Set[str]] = {}
+        # phonetic code -> name tokens, so sound-alike lookups are hash hits
+        self._phonetic: Dict[str, Set[str]] = {}
+        # normalized alias -> rows, answered with a single dict lookup
+        self._aliases: Dict[str, Set[int]] = {}
+
+        for row, player in enumerate(players):
+            name = normalize_name(player.get('DISPLAY_FIRST_LAST', ''))
+            self._names.append(name)
+            self._padded_names.append(f" {name} ")
+
+            boost = 0.0
+            if popularity:
+                boost += POPULARITY_BOOST_PER_PPG * (popularity.get(player.get('PERSON_ID')) or 0.0)
+            if player.get('ROSTERSTATUS') == 1:
+                boost += ROSTER_BOOST
+            self._boosts.append(boost)
+
+            for token in name.split():
+                self._tokens.setdefault(token, set()).add(row)
+                # First/last-name prefixes, e.g. "leb", "lebr" -> LeBron
+                for end in range(MIN_QUERY_LENGTH, len(token) + 1):
+                    self._prefixes.setdefault(token[:end], set()).add(row)
+
+            # Full-name bigrams answer 2-char queries directly, trigrams
+            # narrow longer substring queries before verification
+            for size in (MIN_QUERY_LENGTH, NGRAM_SIZE):
+                for start in range(len(name) - size + 1):
+                    self._ngrams.setdefault(name[start:start + size], set()).add(row)
+
+        for token in self._tokens:
+            for variant in _deletes(token, max_edits_for(token)):
+                self._token_deletes.setdefault(variant, set()).add(token)
+
+        for token in self._tokens:
+            for code in phonetic_keys(token):
+                self._phonetic.setdefault(code, set()).add(token)
+
+        if aliases:
+            rows_by_id = {player.get('PERSON_ID'): row for row, player in enumerate(players)}
+            for alias, player_id in aliases.items():
+                row = rows_by_id.get(player_id)
+                # Aliases for players outside this season's roster are skipped
+                if row is not None:
+                    self._aliases.setdefault(normalize_name(alias), set()).add(row)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def match_rows(self, query: str) -> Set[int]:
+        """Return rows whose normalized name contains the normalized query"""
+        query = normalize_name(query)
+        if len(query) < MIN_QUERY_LENGTH:
+            return set()
+
+        cached = self._query_cache.get(query)
+        if cached is not None:
+            return set(cached)
+
+        # A name containing "lebr" also contains "leb", so the longest cached
+        # prefix of this query is a superset of its matches
+        for end in range(len(query) - 1, MIN_QUERY_LENGTH - 1, -1):
+            narrowed_from = self._query_cache.peek(query[:end])
+            if narrowed_from is not None:
+                rows = {row for row in narrowed_from if query in self._names[row]}
+                break
+        else:
+            rows = self._index_match_rows(query)
+
+        self._query_cache.set(query, frozenset(rows))
+        return rows
+
+    def _index_match_rows(self, query: str) -> Set[int]:
+        """Substring match for an already-normalized query, answered from the index"""
+        if len(query) < NGRAM_SIZE:
+            return set(self._ngrams.get(query, ()))
+
+        # Intersect the n-gram postings, smallest first
+        postings = []
+        for start in range(len(query) - NGRAM_SIZE + 1):
+            rows = self._ngrams.get(query[start:start + NGRAM_SIZE])
+            if not rows:
+                return set()
+            postings.append(rows)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for rows in postings[1:]:
+            candidates &= rows
+            if not candidates:
+                return candidates
+
+        # Token prefix hits are known matches; only the rest need a substring check
+        known = self._prefixes.get(query, set()) if ' ' not in query else set()
+        return {row for row in candidates if row in known or query in self._names[row]}
+
+    def query_cache_stats(self) -> Dict:
+        """Keystroke narrowing cache counters for diagnostics"""
+        return self._query_cache.stats()
+
+    def _fuzzy_tokens(self, query_token: str, allow_prefix: bool) -> Dict[str, int]:
+        """Map name tokens within the edit budget of query_token to their distance"""
+        max_distance = max_edits_for(query_token)
+        candidates: Set[str] = set()
+        for variant in _deletes(query_token, max_distance) | {query_token}:
+            if variant in self._tokens:
+                candidates.add(variant)
+            candidates |= self._token_deletes.get(variant, set())
+
+        matches = {}
+        for token in candidates:
+            distance = edit_distance(query_token, token, max_distance)
+            if distance <= max_distance:
+                matches[token] = distance
+
+        # The last token may still be mid-keystroke, so exact prefixes count as hits
+        if allow_prefix:
+            for row in self._prefixes.get(query_token, ()):
+                for token in self._names[row].split():
+                    if token.startswith(query_token):
+                        matches[token] = 0
+        return matches
+
+    def _match_all_tokens(self, query: str, token_matcher) -> Dict[int, int]:
+        """
+        Combine per-token matches into {row: distance}
+
+        token_matcher(query_token, is_last) returns {name_token: distance}. Every
+        query token has to match some token of the name; a row's distance is the
+        sum of its best per-token distances.
+        """
+        query_tokens = query.split()
+        row_distances: Dict[int, int] = {}
+        for position, query_token in enumerate(query_tokens):
+            token_matches = token_matcher(query_token, position == len(query_tokens) - 1)
+            best: Dict[int, int] = {}
+            for token, distance in token_matches.items():
+                for row in self._tokens[token]:
+                    if distance < best.get(row, MAX_EDIT_DISTANCE + 1):
+                        best[row] = distance
+            if position == 0:
+                row_distances = best
+            else:
+                row_distances = {row: row_distances[row] + d for row, d in best.items() if row in row_distances}
+            if not row_distances:
+                break
+        return row_distances
+
+    def fuzzy_match_rows(self, query: str) -> Dict[int, int]:
+        """Return {row: edit distance} for rows matching the query within the edit budget"""
+        query = normalize_name(query)
+        if len(query) < MIN_QUERY_LENGTH:
+            return {}
+        return self._match_all_tokens(query, self._fuzzy_tokens)
+
+    def _phonetic_tokens(self, query_token: str, allow_prefix: bool) -> Dict[str, int]:
+        """Map name tokens that sound like query_token to PHONETIC_DISTANCE (exact tokens to 0)"""
+        matches = {}
+        if len(query_token) >= MIN_PHONETIC_TOKEN_LENGTH:
+            for code in phonetic_keys(query_token):
+                for token in self._phonetic.get(code, ()):
+                    matches[token] = PHONETIC_DISTANCE
+        if query_token in self._tokens:
+            matches[query_token] = 0
+        if allow_prefix:
+            for row in self._prefixes.get(query_token, ()):
+                for token in self._names[row].split():
+                    if token.startswith(query_token):
+                        matches[token] = 0
+        return matches
+
+    def phonetic_match_rows(self, query: str) -> Dict[int, int]:
+        """Return {row: distance} for rows whose name tokens sound like the query's"""
+        query = normalize_name(query)
+        if len(query) < MIN_QUERY_LENGTH:
+            return {}
+        return self._match_all_tokens(query, self._phonetic_tokens)
+
+    def alias_rows(self, query: str) -> Set[int]:
+        """Return rows whose nickname/abbreviation equals the normalized query"""
+        return self._aliases.get(query, set())
+
+    def match_tier(self, row: int, query: str) -> int:
+        """Rank how well a row's name matches an already-normalized query"""
+        if row in self._aliases.get(query, ()):
+            return TIER_ALIAS
+        padded = self._padded_names[row]
+        if f" {query} " in padded:
+            return TIER_EXACT_TOKEN
+        if f" {query}" in padded:
+            return TIER_PREFIX
+        if query in padded:
+            return TIER_SUBSTRING
+        return TIER_FUZZY
+
+    def popularity_ranks(self) -> List[int]:
+        """Each row's position when ordered by its ranking boost alone (0 ranks first)"""
+        ranks = [0] * len(self._boosts)
+        for rank, row in enumerate(sorted(range(len(self._boosts)), key=lambda row: (-self._boosts[row], row))):
+            ranks[row] = rank
+        return ranks
+
+    def _rank_key(self, row: int, query: str, boost: bool) -> Tuple:
+        return (self.match_tier(row, query), -self._boosts[row] if boost else 0.0, row)
+
+    def _rows_to_players(self, rows: Iterable[int]) -> List[Dict]:
+        return [self.players[row] for row in rows]
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = False, phonetic: bool = False,
+               boost: bool = True, row_mask: Optional[int] = None) -> List[Dict]:
+        """
+        Return the top `limit` players for the query
+
+        Exact search ranks nickname/alias hits, then whole-token matches, then
+        token prefixes, then other substrings. Fuzzy search also returns names
+        within the edit budget and phonetic search names that sound alike; both
+        order by distance first. With boost=True, more popular players (by ppg)
+        and players currently on a roster rank higher within a tier.
+        Results are selected with a bounded heap rather than a full sort.
+
+        row_mask (from FacetIndex.filter_mask) restricts results to its set
+        bits; with a mask, an empty query lists the matching players.
+        """
+        if limit <= 0:
+            return []
+        normalized = normalize_name(query)
+
+        if row_mask is not None and len(normalized) < MIN_QUERY_LENGTH:
+            ranked = heapq.nsmallest(
+                limit, iter_rows(row_mask), key=lambda row: (-self._boosts[row] if boost else 0.0, row)
+            )
+            return self._rows_to_players(ranked)
+
+        distances = {row: 0 for row in self.match_rows(normalized) | self.alias_rows(normalized)}
+        extra_matches = []
+        if fuzzy:
+            extra_matches.append(self.fuzzy_match_rows(normalized))
+        if phonetic:
+            extra_matches.append(self.phonetic_match_rows(normalized))
+        for matches in extra_matches:
+            for row, distance in matches.items():
+                if distance < distances.get(row, distance + 1):
+                    distances[row] = distance
+
+        if row_mask is not None:
+            distances = {row: distance for row, distance in distances.items() if (row_mask >> row) & 1}
+
+        ranked = heapq.nsmallest(
+            limit, distances, key=lambda row: (distances[row],) + self._rank_key(row, normalized, boost)
+        )
+        return self._rows_to_players(ranked)
@@ -0,0 +1,75 @@
+"""
+Player Record - Compact immutable player details shared by the services
+"""
+from typing import Dict, Optional, Tuple, Union
+from dataclasses import dataclass, fields
+import sys
+
+
+# Keys of the guessed_player payload in guess responses and game state
+GUESSED_PLAYER_FIELDS = (
+    'id', 'name', 'team', 'division', 'conference', 'age', 'height',
+    'position', 'jersey_number', 'ppg', 'image_url'
+)
+
+
+def _interned(value) -> str:
+    """Intern low-cardinality strings so every player on a team shares one copy"""
+    return sys.intern(value) if value else ''
+
+
+@dataclass(frozen=True, slots=True)
+class Player:
+    """
+    Details for one player in one season
+
+    Built once when the details cache is loaded (or a player is fetched) and
+    passed by reference through the service, engine and routes. Converted to
+    the JSON dict shape only at the HTTP boundary via to_dict().
+    """
+    id: int
+    name: str
+    team: str = ''
+    team_abbreviation: str = ''
+    division: str = ''
+    conference: str = ''
+    age: Optional[int] = None
+    height: str = ''
+    position: str = ''
+    jersey_number: Optional[int] = None
+    ppg: float = 0.0
+    image_url: Optional[str] = None
+    season: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Player':
+        """Build a record from the player details dict shape (cache file / API)"""
+        return cls(
+            id=int(data['id']),
+            name=data.get('name') or 'Unknown',
+            team=_interned(data.get('team')),
+            team_abbreviation=_interned(data.get('team_abbreviation')),
+            division=_interned(data.get('division')),
+            conference=_interned(data.get('conference')),
+            age=data.get('age'),
+            height=_interned(data.get('height')),
+            position=_interned(data.get('position')),
+            jersey_number=data.get('jersey_number'),
+            ppg=data.get('ppg') or 0.0,
+            image_url=data.get('image_url'),
+            season=sys.intern(data['season']) if data.get('season') else None
+        )
+
+    @classmethod
+    def coerce(cls, player: Union['Player', Dict]) -> 'Player':
+        """Accept either a record or a details dict"""
+        return player if isinstance(player, cls) else cls.from_dict(player)
+
+    def to_dict(self, keys: Optional[Tuple[str, ...]] = None) -> Dict:
+        """JSON shape of the record, optionally limited to `keys`"""
+        if keys is None:
+            keys = _ALL_FIELDS
+        return {key: getattr(self, key) for key in keys}
+
+
+_ALL_FIELDS = tuple(field.name for field in fields(Player))
@@ -0,0 +1,138 @@
+"""
+Player Table - Columnar NumPy view of a season's player details
+"""
+from typing import List, Dict, Optional
+import numpy as np
+from app.services.player_record import Player
+from app.services.wordle_engine import height_to_inches
+
+
+# Stored in integer columns when a value is unknown (age, height, jersey)
+MISSING = -1
+
+NUMERIC_COLUMNS = ('age', 'height', 'jersey_number', 'ppg')
+CATEGORY_COLUMNS = ('team_abbreviation', 'division', 'conference', 'position')
+
+
+class PlayerTable:
+    """
+    One NumPy array per attribute plus an id -> row index
+
+    Attribute comparisons, range filters and roster aggregates become vectorized
+    operations over the whole season instead of loops over Player records.
+    Category columns hold int16 codes into a per-column label list.
+
+    Args:
+        details: Player id (as str) -> Player details for the season
+    """
+
+    def __init__(self, details: Dict[str, Player]):
+        self._build(list(details.values()))
+
+    @classmethod
+    def from_rows(cls, rows: List[Optional[Player]]) -> 'PlayerTable':
+        """
+        Table with one row per entry, so rows can line up with another index
+
+        None entries (players without cached details) are unknown in every column.
+        """
+        table = cls.__new__(cls)
+        table._build(rows)
+        return table
+
+    def _build(self, players: List[Optional[Player]]):
+        self.size = len(players)
+        self.present = np.array([player is not None for player in players], dtype=bool)
+        self.ids = np.array([MISSING if player is None else player.id for player in players], dtype=np.int64)
+        self._row_by_id = {player.id: row for row, player in enumerate(players) if player is not None}
+        # Blank stand-in so every column below reads None / '' for missing rows
+        players = [player or Player(id=MISSING, name='') for player in players]
+
+        def _int_column(values) -> np.ndarray:
+            return np.array([MISSING if value is None else value for value in values], dtype=np.int16)
+
+        self.age = _int_column(player.age for player in players)
+        self.height = _int_column(height_to_inches(player.height) for player in players)
+        self.jersey_number = _int_column(player.jersey_number for player in players)
+        # float64 so filter bounds like ppg_min=24.3 compare exactly against the stored values
+        self.ppg = np.array([player.ppg or 0.0 for player in players], dtype=np.float64)
+
+        self.labels: Dict[str, List[str]] = {}
+        for column in CATEGORY_COLUMNS:
+            values = [getattr(player, column) or '' for player in players]
+            labels, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+            self.labels[column] = [str(label) for label in labels]
+            setattr(self, column, codes.astype(np.int16))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def row(self, player_id: int) -> Optional[int]:
+        """Row of a player, or None if they have no cached details"""
+        return self._row_by_id.get(player_id)
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in NUMERIC_COLUMNS and name not in CATEGORY_COLUMNS:
+            raise ValueError(f"Unknown player table column: {name}")
+        return getattr(self, name)
+
+    def known(self, name: str) -> np.ndarray:
+        """Boolean mask of rows with a value for the column"""
+        column = self.column(name)
+        if name in CATEGORY_COLUMNS:
+            return np.array(self.labels[name])[column] != ''
+        if name == 'ppg':
+            return self.present.copy()
+        return column != MISSING
+
+    def range_mask(self, name: str, low: Optional[float] = None, high: Optional[float] = None) -> np.ndarray:
+        """Boolean mask of rows whose numeric column lies in [low, high]"""
+        column = self.column(name)
+        mask = self.known(name)
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column <= high
+        return mask
+
+    def equals_mask(self, name: str, label: str) -> np.ndarray:
+        """Boolean mask of rows whose category column equals label (case-insensitive)"""
+        column = self.column(name)
+        label = (label or '').lower()
+        matches = [code for code, value in enumerate(self.labels[name]) if value.lower() == label]
+        if not matches:
+            return np.zeros(self.size, dtype=bool)
+        return column == matches[0]
+
+    def compare(self, name: str, target_id: int) -> np.ndarray:
+        """
+        Direction from every row to the target player for a numeric column
+
+        Returns an int8 array: 1 where the target is higher, -1 where lower,
+        0 where equal (the Wordle higher/lower/correct feedback for everyone at once).
+        Rows missing the value, or a target without details, compare as 0.
+        """
+        target_row = self.row(target_id)
+        if target_row is None:
+            return np.zeros(self.size, dtype=np.int8)
+        column = self.column(name)
+        directions = np.sign(column[target_row] - column.astype(np.float64)).astype(np.int8)
+        if name != 'ppg':
+            if column[target_row] == MISSING:
+                return np.zeros(self.size, dtype=np.int8)
+        directions[~self.known(name)] = 0
+        return directions
+
+    def summary(self, name: str, mask: Optional[np.ndarray] = None) -> Dict:
+        """min/max/mean/median of a numeric column over known (and masked) rows"""
+        selected = self.known(name) if mask is None else self.known(name) & mask
+        values = self.column(name)[selected].astype(np.float64)
+        if values.size == 0:
+            return {'count': 0, 'min': None, 'max': None, 'mean': None, 'median': None}
+        return {
+            'count': int(values.size),
+            'min': round(float(values.min()), 2),
+            'max': round(float(values.max()), 2),
+            'mean': round(float(values.mean()), 2),
+            'median': round(float(np.median(values)), 2)
+        }
@@ -0,0 +1,155 @@
+"""
+Retry - Deadline-budgeted retries for upstream (stats.nba.com) calls
+"""
+from typing import Callable, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import random
+import time
+import requests
+
+
+# HTTP statuses worth another attempt: rate limiting and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the originating request's time budget is spent"""
+
+
+class Deadline:
+    """
+    Point in time by which all upstream work for a request must be done
+
+    Args:
+        seconds: Budget from now
+        clock: Monotonic time source (injectable for tests)
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left in the budget, never negative"""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('upstream_deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being handled, if any"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds: float, clock: Callable[[], float] = time.monotonic) -> Iterator[Deadline]:
+    """
+    Give upstream calls made inside the block a shared time budget
+
+    Nested scopes never extend an outer deadline. The deadline lives in a
+    context variable, so work handed to an executor only sees it if it is
+    run in a copy of the caller's context.
+    """
+    deadline = Deadline(seconds, clock)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def request_timeout(connect: float, read: float) -> Tuple[float, float]:
+    """
+    Per-attempt (connect, read) HTTP timeouts, each capped to what is left of the current deadline
+
+    requests applies a single number to both the connect and every read, so
+    the two are passed separately to keep a slow connect from taking the read budget too.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return (connect, read)
+    remaining = deadline.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded("Upstream call timed out: request deadline exceeded")
+    return (min(connect, remaining), min(read, remaining))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Timeouts, dropped connections and 429/5xx responses; not bad requests or bad data
+
+    nba_api doesn't raise for HTTP statuses itself: sessions from
+    http_pool.create_session turn 429/5xx responses into the HTTPError checked here.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                          ConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter, bounded by attempts and the current deadline
+
+    Attempt n (from 1) is followed by a wait of base_delay * 2 ** (n - 1), capped
+    at max_delay and scaled by a random factor in [1 - jitter, 1]. Only errors
+    the retryable predicate accepts are retried, and a retry is skipped when
+    the wait alone would use up the remaining deadline.
+
+    Args:
+        max_attempts: Calls made at most, including the first (>= 1)
+        base_delay: Wait after the first failed attempt, in seconds
+        max_delay: Upper bound of a single wait
+        jitter: Fraction of each wait that is randomized (0 disables jitter)
+        retryable: Predicate deciding whether an error is worth another attempt
+        sleep: Sleep function (injectable for tests)
+        rng: Source of random floats in [0, 1) (injectable for tests)
+    """
+
+    def __init__(self, max_attempts: int = 2, base_delay: float = 0.5, max_delay: float = 4.0,
+                 jitter: float = 0.5, retryable: Callable[[BaseException], bool] = is_retryable,
+                 sleep: Callable[[float], None] = time.sleep, rng: Callable[[], float] = random.random):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retryable = retryable
+        self._sleep = sleep
+        self._rng = rng
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait after the given failed attempt"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * self._rng())
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call func, retrying retryable errors within the attempt limit and current deadline"""
+        deadline = _current_deadline.get()
+        for attempt in range(1, self.max_attempts + 1):
+            if deadline is not None and deadline.expired:
+                raise DeadlineExceeded("Upstream call timed out: request deadline exceeded")
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_attempts or not self.retryable(e):
+                    raise
+                wait = self.backoff(attempt)
+                # Waiting out the rest of the budget can't produce a result
+                if deadline is not None and wait >= deadline.remaining():
+                    raise
+                self._sleep(wait)
@@ -0,0 +1,61 @@
+"""
+Roster Bundle - Compact, content-addressed season roster for client-side search
+"""
+from typing import List, Dict, Optional
+import gzip
+import hashlib
+import json
+from app.services.player_index import normalize_name
+
+
+# Column order of each row in the bundle's "players" array
+BUNDLE_FIELDS = ['id', 'name', 'team', 'key', 'rank']
+
+
+class RosterBundle:
+    """
+    Gzipped JSON roster for one season, addressed by the hash of its content
+
+    The browser fetches it once and filters locally; since the URL changes
+    whenever the content does, the payload can be cached forever. Each row's
+    rank orders matches within a tier the way the server's popularity and
+    roster boosts do (see PlayerSearchIndex.popularity_ranks).
+    """
+
+    def __init__(self, season: str, players: List[Dict], aliases: Optional[Dict[str, int]] = None,
+                 ranks: Optional[List[int]] = None):
+        self.season = season
+
+        rows = []
+        roster_ids = set()
+        for row, player in enumerate(players):
+            name = player.get('DISPLAY_FIRST_LAST', '')
+            rows.append([
+                player['PERSON_ID'],
+                name,
+                player.get('TEAM_ABBREVIATION') or '',
+                normalize_name(name),
+                ranks[row] if ranks is not None else row
+            ])
+            roster_ids.add(player['PERSON_ID'])
+
+        payload = {
+            'season': season,
+            'fields': BUNDLE_FIELDS,
+            'players': rows,
+            'aliases': {
+                normalize_name(alias): player_id
+                for alias, player_id in sorted((aliases or {}).items())
+                if player_id in roster_ids
+            }
+        }
+        raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+        self.digest = hashlib.sha256(raw).hexdigest()[:16]
+        self.player_count = len(rows)
+        # mtime=0 keeps the compressed bytes identical for identical content
+        self.body = gzip.compress(raw, compresslevel=9, mtime=0)
+
+    def decompressed(self) -> bytes:
+        """Plain JSON body for clients that don't accept gzip"""
+        return gzip.decompress(self.body)
@@ -0,0 +1,89 @@
+"""
+Single Flight - Coalesce concurrent identical upstream calls into one
+"""
+from typing import Any, Callable, Dict, Hashable, Tuple
+from concurrent.futures import Executor, Future
+import asyncio
+import contextvars
+import threading
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its outcome
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for the leader's result or exception
+    instead of repeating the call. Once the call finishes the key is forgotten,
+    so later callers start a fresh one - this coalesces, it doesn't cache.
+
+    Both blocking callers (do) and event-loop callers (ado) share the same
+    in-flight calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _claim(self, key: Hashable) -> Tuple[Future, bool]:
+        # Returns the in-flight future for key and whether the caller must run it
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.calls += 1
+            return future, True
+
+    def _run(self, key: Hashable, future: Future, func: Callable, args: Tuple, kwargs: Dict):
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(e)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_result(result)
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Call func, or wait for the identical call already in flight under key"""
+        future, leader = self._claim(key)
+        if leader:
+            self._run(key, future, func, args, kwargs)
+        return future.result()
+
+    async def ado(self, key: Hashable, executor: Executor, func: Callable, *args, **kwargs) -> Any:
+        """Like do, but awaitable: the leader runs func on executor and nobody blocks the loop"""
+        future, leader = self._claim(key)
+        if leader:
+            try:
+                # The leader's context (e.g. its request deadline) applies to the shared call
+                executor.submit(contextvars.copy_context().run, self._run, key, future, func, args, kwargs)
+            except BaseException as e:
+                # Executor shut down; fail this call and anyone already waiting on it
+                with self._lock:
+                    self._calls.pop(key, None)
+                future.set_exception(e)
+        # Shielded: a cancelled waiter (e.g. a client disconnect) must not cancel the
+        # shared future under the leader and every other caller
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict:
+        """Counters for diagnostics"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,272 @@
+"""
+Player Snapshot - Memory-mapped binary copy of the players and player details caches
+"""
+from typing import List, Dict, Optional, Iterator, Tuple
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+import sys
+from app.services.player_record import Player
+from app.services.details_cache import iter_cached_details, parse_fetched_at
+from app.services.cache_writer import atomic_write
+
+
+SNAPSHOT_MAGIC = b'NBAS'
+SNAPSHOT_VERSION = 4
+
+# Stored in 32-bit / 16-bit integer fields for a JSON null
+INT_NONE = -2 ** 31
+SHORT_NONE = -2 ** 15
+# String id 0 is a JSON null; real strings start at 1
+STRING_NONE = 0
+
+ROSTER_INT_FIELDS = ('PERSON_ID', 'ROSTERSTATUS', 'TEAM_ID')
+ROSTER_STRING_FIELDS = (
+    'DISPLAY_LAST_COMMA_FIRST', 'DISPLAY_FIRST_LAST', 'FROM_YEAR', 'TO_YEAR',
+    'PLAYERCODE', 'PLAYER_SLUG', 'TEAM_CITY', 'TEAM_NAME', 'TEAM_ABBREVIATION',
+    'TEAM_SLUG', 'TEAM_CODE', 'GAMES_PLAYED_FLAG', 'OTHERLEAGUE_EXPERIENCE_CH'
+)
+DETAIL_STRING_FIELDS = (
+    'name', 'team', 'team_abbreviation', 'division', 'conference',
+    'height', 'position', 'image_url', 'season'
+)
+
+# magic, format version, season string id, then (mtime_ns, size) of both source files,
+# then count/offset of the roster records, detail records, id index and string table
+_HEADER = struct.Struct('<4sHxxI4Q7I')
+_ROSTER_RECORD = struct.Struct('<3i' + 'I' * len(ROSTER_STRING_FIELDS))
+# player id, age, jersey number, ppg, fetched-at Unix time, then the detail strings
+_DETAIL_RECORD = struct.Struct('<ihhdd' + 'I' * len(DETAIL_STRING_FIELDS))
+# (player id, detail row), sorted; a player has one row per cached season
+_INDEX_ENTRY = struct.Struct('<iI')
+_U32 = struct.Struct('<I')
+
+
+def source_signature(path: Path) -> Tuple[int, int]:
+    """(mtime_ns, size) of a source JSON file, or zeros if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_json(path: Path) -> Dict:
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class _StringTable:
+    """Deduplicated UTF-8 strings, referenced from records by id"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._encoded: List[bytes] = []
+
+    def add(self, value) -> int:
+        if value is None:
+            return STRING_NONE
+        value = str(value)
+        if value not in self._ids:
+            self._encoded.append(value.encode('utf-8'))
+            self._ids[value] = len(self._encoded)
+        return self._ids[value]
+
+    def __len__(self) -> int:
+        return len(self._encoded)
+
+    def pack(self) -> bytes:
+        # offsets[i] is where string i + 1 starts in the blob; one extra end offset
+        offsets = [0]
+        for encoded in self._encoded:
+            offsets.append(offsets[-1] + len(encoded))
+        return struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(self._encoded)
+
+
+def _int_field(value, none: int = INT_NONE) -> int:
+    return none if value is None else int(value)
+
+
+def build_snapshot(players_file: Path, details_file: Path) -> bytes:
+    """
+    Encode the two JSON caches as one snapshot
+
+    Layout: header, fixed-width roster records (players list order), fixed-width
+    detail records (details cache order), an id index sorted by player id for
+    binary search, and the string table every record points into.
+    """
+    players_signature = source_signature(players_file)
+    details_signature = source_signature(details_file)
+    roster_data = _read_json(players_file)
+    details_data = _read_json(details_file)
+    strings = _StringTable()
+    season_id = strings.add(roster_data.get('season'))
+
+    roster = bytearray()
+    roster_players = roster_data.get('players', [])
+    for player in roster_players:
+        roster += _ROSTER_RECORD.pack(
+            *(_int_field(player.get(field)) for field in ROSTER_INT_FIELDS),
+            *(strings.add(player.get(field)) for field in ROSTER_STRING_FIELDS)
+        )
+
+    details = bytearray()
+    index_entries = []
+    detail_players = list(iter_cached_details(details_data))
+    for row, info in enumerate(detail_players):
+        details += _DETAIL_RECORD.pack(
+            int(info['id']),
+            _int_field(info.get('age'), SHORT_NONE),
+            _int_field(info.get('jersey_number'), SHORT_NONE),
+            float(info.get('ppg') or 0.0),
+            parse_fetched_at(info.get('fetched_at')),
+            *(strings.add(info.get(field)) for field in DETAIL_STRING_FIELDS)
+        )
+        index_entries.append((int(info['id']), row))
+    index = b''.join(_INDEX_ENTRY.pack(*entry) for entry in sorted(index_entries))
+
+    roster_offset = _HEADER.size
+    details_offset = roster_offset + len(roster)
+    index_offset = details_offset + len(details)
+    strings_offset = index_offset + len(index)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, season_id,
+        *players_signature, *details_signature,
+        len(roster_players), roster_offset,
+        len(detail_players), details_offset,
+        index_offset,
+        len(strings), strings_offset
+    )
+    return header + bytes(roster) + bytes(details) + index + strings.pack()
+
+
+def write_snapshot(snapshot_file: Path, players_file: Path, details_file: Path):
+    """Build a snapshot and atomically replace snapshot_file with it"""
+    # Readers only ever map a complete file
+    atomic_write(snapshot_file, build_snapshot(players_file, details_file))
+
+
+class PlayerSnapshot:
+    """
+    Read-only view over a memory-mapped snapshot file
+
+    Detail records are decoded on each access and never kept, so every worker
+    process reads the same page-cache copy of them instead of holding its own
+    parsed JSON. Callers that need a record repeatedly keep it themselves.
+
+    Args:
+        snapshot_file: Path written by write_snapshot
+    """
+
+    def __init__(self, snapshot_file: Path):
+        with open(snapshot_file, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Player snapshot {snapshot_file} is truncated")
+        (magic, version, season_id,
+         players_mtime, players_size, details_mtime, details_size,
+         self.roster_count, self._roster_offset,
+         self.details_count, self._details_offset,
+         self._index_offset,
+         self._string_count, self._strings_offset) = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{snapshot_file} is not a version {SNAPSHOT_VERSION} player snapshot")
+        self.sources = ((players_mtime, players_size), (details_mtime, details_size))
+        self._blob_offset = self._strings_offset + _U32.size * (self._string_count + 1)
+        self.season = self.string(season_id)
+
+    def close(self):
+        self._map.close()
+
+    def matches_sources(self, players_file: Path, details_file: Path) -> bool:
+        """True if the snapshot was built from the current versions of both JSON files"""
+        return self.sources == (source_signature(players_file), source_signature(details_file))
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == STRING_NONE:
+            return None
+        start, end = struct.unpack_from('<2I', self._map, self._strings_offset + _U32.size * (string_id - 1))
+        return self._map[self._blob_offset + start:self._blob_offset + end].decode('utf-8')
+
+    def roster(self) -> List[Dict]:
+        """Decode the players list, in the same dict shape as players_cache.json"""
+        players = []
+        int_count = len(ROSTER_INT_FIELDS)
+        for row in range(self.roster_count):
+            values = _ROSTER_RECORD.unpack_from(self._map, self._roster_offset + row * _ROSTER_RECORD.size)
+            player = {
+                field: None if value == INT_NONE else value
+                for field, value in zip(ROSTER_INT_FIELDS, values[:int_count])
+            }
+            for field, string_id in zip(ROSTER_STRING_FIELDS, values[int_count:]):
+                player[field] = self.string(string_id)
+            players.append(player)
+        return players
+
+    def detail(self, row: int) -> Player:
+        """Decode one detail record"""
+        player_id, age, jersey_number, ppg, _, *string_ids = _DETAIL_RECORD.unpack_from(
+            self._map, self._details_offset + row * _DETAIL_RECORD.size)
+        values = dict(zip(DETAIL_STRING_FIELDS, (self.string(string_id) for string_id in string_ids)))
+        return Player(
+            id=player_id,
+            name=values['name'] or 'Unknown',
+            team=sys.intern(values['team'] or ''),
+            team_abbreviation=sys.intern(values['team_abbreviation'] or ''),
+            division=sys.intern(values['division'] or ''),
+            conference=sys.intern(values['conference'] or ''),
+            age=None if age == SHORT_NONE else age,
+            height=sys.intern(values['height'] or ''),
+            position=sys.intern(values['position'] or ''),
+            jersey_number=None if jersey_number == SHORT_NONE else jersey_number,
+            ppg=ppg,
+            image_url=values['image_url'],
+            season=sys.intern(values['season']) if values['season'] else None
+        )
+
+    def detail_fetched_at(self, row: int) -> float:
+        """Unix time a detail record was fetched from the API (0.0 if unknown)"""
+        return _DETAIL_RECORD.unpack_from(self._map, self._details_offset + row * _DETAIL_RECORD.size)[4]
+
+    def details(self) -> Iterator[Player]:
+        """Decode every detail record, in cache file order"""
+        for row in range(self.details_count):
+            yield self.detail(row)
+
+    def find_detail_rows(self, player_id: int) -> List[int]:
+        """Binary search the id index for a player's detail records (one per season)"""
+        low, high = 0, self.details_count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, _ = _INDEX_ENTRY.unpack_from(self._map, self._index_offset + middle * _INDEX_ENTRY.size)
+            if entry_id < player_id:
+                low = middle + 1
+            else:
+                high = middle
+        rows = []
+        for position in range(low, self.details_count):
+            entry_id, row = _INDEX_ENTRY.unpack_from(self._map, self._index_offset + position * _INDEX_ENTRY.size)
+            if entry_id != player_id:
+                break
+            rows.append(row)
+        return rows
+
+
+def open_snapshot(snapshot_file: Path, players_file: Path, details_file: Path) -> PlayerSnapshot:
+    """Map the snapshot, (re)building it first if it is missing or older than the JSON caches"""
+    if Path(snapshot_file).exists():
+        try:
+            snapshot = PlayerSnapshot(snapshot_file)
+            if snapshot.matches_sources(players_file, details_file):
+                return snapshot
+            snapshot.close()
+        except ValueError:
+            pass
+    write_snapshot(snapshot_file, players_file, details_file)
+    return PlayerSnapshot(snapshot_file)
@@ -0,0 +1,181 @@
+"""
+Transport - Pluggable stats.nba.com transport: live, record or replay, with fault injection
+"""
+from typing import Callable, Dict, Mapping, Optional
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import hashlib
+import json
+import os
+import random
+import time
+import requests
+from app.services.cache_writer import atomic_write
+from app.services.http_pool import HTTP_POOL_SIZE, PooledHTTPAdapter
+
+
+LIVE = 'live'
+RECORD = 'record'
+REPLAY = 'replay'
+TRANSPORT_MODES = (LIVE, RECORD, REPLAY)
+
+# Recorded responses, one JSON file per (endpoint, query)
+DEFAULT_FIXTURES_DIR = Path(__file__).parent.parent.parent / "tests" / "fixtures" / "nba_api"
+
+
+class MissingFixtureError(requests.exceptions.RequestException):
+    """Replay mode has no recorded response for a request (not retryable)"""
+
+    def __init__(self, message: str, path: Path):
+        super().__init__(message)
+        self.path = path
+
+
+def fixture_path(fixtures_dir: Path, url: str) -> Path:
+    """File a response to url is recorded in: endpoint name plus a hash of the sorted query"""
+    parts = urlsplit(url)
+    endpoint = parts.path.rstrip('/').rsplit('/', 1)[-1].lower() or 'root'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]
+    return Path(fixtures_dir) / f"{endpoint}-{digest}.json"
+
+
+class TransportAdapter(PooledHTTPAdapter):
+    """
+    Pooled adapter that can record responses, replay them offline and inject faults
+
+    live: send requests upstream. record: send them and save each response
+    under fixtures_dir. replay: answer from fixtures_dir only; a request with
+    no recording raises MissingFixtureError. In every mode, each request first
+    waits latency seconds (a ReadTimeout if that exceeds its timeout) and then
+    fails with a ConnectionError with probability error_rate.
+
+    Args:
+        mode: One of TRANSPORT_MODES
+        fixtures_dir: Where recorded responses are written and read
+        latency: Seconds added to every request
+        error_rate: Share of requests (0-1) that fail with a ConnectionError
+        pool_size: Keep-alive connections per host (live and record modes)
+        rng: Source of random floats in [0, 1) deciding injected errors
+        sleep: Sleep function (injectable for tests)
+    """
+
+    def __init__(self, mode: str = LIVE, fixtures_dir: Path = DEFAULT_FIXTURES_DIR,
+                 latency: float = 0.0, error_rate: float = 0.0, pool_size: int = HTTP_POOL_SIZE,
+                 rng: Callable[[], float] = random.random, sleep: Callable[[float], None] = time.sleep):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown transport mode {mode!r}; expected one of {', '.join(TRANSPORT_MODES)}")
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.mode = mode
+        self.fixtures_dir = Path(fixtures_dir)
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = rng
+        self._sleep = sleep
+        self.replayed = 0
+        self.recorded = 0
+        self.missing = 0
+        self.injected_errors = 0
+        self.injected_timeouts = 0
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        self._inject_faults(request, timeout)
+        if self.mode == REPLAY:
+            return self._replay(request)
+        response = super().send(request, stream=stream, timeout=timeout, **kwargs)
+        if self.mode == RECORD:
+            self._record(request, response)
+        return response
+
+    def _inject_faults(self, request, timeout):
+        if self.latency > 0:
+            read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+            if read_timeout is not None and self.latency >= read_timeout:
+                self._sleep(read_timeout)
+                self.injected_timeouts += 1
+                raise requests.exceptions.ReadTimeout(
+                    f"Injected latency {self.latency}s exceeded read timeout {read_timeout}s", request=request)
+            self._sleep(self.latency)
+        if self.error_rate > 0 and self._rng() < self.error_rate:
+            self.injected_errors += 1
+            raise requests.exceptions.ConnectionError("Injected connection error", request=request)
+
+    def _replay(self, request) -> requests.Response:
+        path = fixture_path(self.fixtures_dir, request.url)
+        if not path.exists():
+            self.missing += 1
+            raise MissingFixtureError(f"No recorded response for {request.url} ({path.name})", path)
+        with open(path, 'r', encoding='utf-8') as f:
+            recording = json.load(f)
+        response = requests.Response()
+        response.status_code = recording['status_code']
+        response.headers.update(recording.get('headers', {}))
+        response._content = recording['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = recording.get('reason', '')
+        self.replayed += 1
+        return response
+
+    def _record(self, request, response: requests.Response):
+        self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+        recording = {
+            'url': request.url,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': {'Content-Type': response.headers.get('Content-Type', 'application/json')},
+            'body': response.text
+        }
+        payload = json.dumps(recording, indent=2, ensure_ascii=False)
+        atomic_write(fixture_path(self.fixtures_dir, request.url), payload.encode('utf-8'))
+        self.recorded += 1
+
+    def stats(self) -> Dict:
+        """Pool stats plus the transport mode and its counters"""
+        return {
+            **super().stats(),
+            'transport': self.mode,
+            'replayed': self.replayed,
+            'recorded': self.recorded,
+            'missing_fixtures': self.missing,
+            'injected_errors': self.injected_errors,
+            'injected_timeouts': self.injected_timeouts
+        }
+
+
+@dataclass(frozen=True)
+class TransportConfig:
+    """
+    How NBADataService and populate_cache.py reach stats.nba.com
+
+    from_env reads NBA_API_TRANSPORT (live / record / replay), NBA_API_FIXTURES_DIR,
+    NBA_API_LATENCY (seconds), NBA_API_ERROR_RATE (0-1), NBA_API_FAULT_SEED,
+    which makes injected errors repeatable, and NBA_API_POOL_SIZE (keep-alive
+    connections; NBADataService sizes its upstream threads to match).
+    """
+    mode: str = LIVE
+    fixtures_dir: Path = DEFAULT_FIXTURES_DIR
+    latency: float = 0.0
+    error_rate: float = 0.0
+    fault_seed: Optional[int] = None
+    pool_size: int = HTTP_POOL_SIZE
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> 'TransportConfig':
+        seed = environ.get('NBA_API_FAULT_SEED')
+        return cls(
+            mode=environ.get('NBA_API_TRANSPORT', LIVE).lower(),
+            fixtures_dir=Path(environ.get('NBA_API_FIXTURES_DIR', DEFAULT_FIXTURES_DIR)),
+            latency=float(environ.get('NBA_API_LATENCY', 0.0)),
+            error_rate=float(environ.get('NBA_API_ERROR_RATE', 0.0)),
+            fault_seed=int(seed) if seed else None,
+            pool_size=int(environ.get('NBA_API_POOL_SIZE', HTTP_POOL_SIZE))
+        )
+
+    def adapter(self, pool_size: Optional[int] = None) -> TransportAdapter:
+        """A TransportAdapter for this configuration (pool_size overrides the configured one)"""
+        rng = random.Random(self.fault_seed).random if self.fault_seed is not None else random.random
+        return TransportAdapter(self.mode, self.fixtures_dir, self.latency, self.error_rate,
+                                pool_size=pool_size or self.pool_size, rng=rng)
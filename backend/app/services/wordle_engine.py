@@ -1,45 +1,108 @@
 """
 Wordle Engine - Game logic for comparing guesses to target player
 """
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import re
+from app.services.player_record import Player
+
+
+def get_position_groups(pos_str: str) -> set:
+    """
+    Extract all position groups ('guard', 'forward', 'center') from a position string
+    
+    Handles formats like "C", "PF", "SF", "Center-Forward", "C-F", etc.
+    """
+    groups = set()
+    pos_upper = pos_str.upper().strip()
+    
+    # Split by hyphen, slash, or space to handle "Center-Forward", "C-F", "C/F", etc.
+    # Replace hyphens and slashes with spaces, then split
+    normalized = re.sub(r'[-/]', ' ', pos_upper)
+    parts = [p.strip() for p in normalized.split() if p.strip()]
+    
+    # If no parts after splitting, check the original string
+    if not parts:
+        parts = [pos_upper]
+    
+    # Check each part for position indicators
+    # Use separate if statements (not elif) so hyphenated positions can match multiple groups
+    for part in parts:
+        # Center positions
+        if part in ['C', 'CENTER']:
+            groups.add('center')
+        # Guard positions  
+        if part in ['PG', 'POINT', 'G', 'GUARD'] or part.startswith('SHOOTING'):
+            groups.add('guard')
+        if part == 'SG':
+            groups.add('guard')
+        # Forward positions
+        if part in ['PF', 'POWER', 'SF', 'SMALL']:
+            groups.add('forward')
+        if part in ['F', 'FORWARD']:
+            groups.add('forward')
+    
+    # Handle standalone abbreviations that might not have been split
+    if not groups:
+        if pos_upper in ['C']:
+            groups.add('center')
+        elif pos_upper in ['PG', 'SG', 'G']:
+            groups.add('guard')
+        elif pos_upper in ['SF', 'PF', 'F']:
+            groups.add('forward')
+    
+    return groups
+
+
+def height_to_inches(height_str: str) -> Optional[int]:
+    """Convert height string (e.g., '6-8') to inches"""
+    try:
+        parts = height_str.split('-')
+        if len(parts) == 2:
+            feet = int(parts[0])
+            inches = int(parts[1])
+            return feet * 12 + inches
+    except:
+        pass
+    return None
 
 
 class WordleEngine:
     """Engine for comparing player guesses to target player"""
     
-    def __init__(self, target_player: Dict, season: Optional[str] = None):
+    def __init__(self, target_player: Union[Player, Dict], season: Optional[str] = None):
         """
         Initialize engine with target player
         
         Args:
-            target_player: Dict with player details (id, name, team, division, 
-                         conference, age, height, position, jersey_number, ppg)
+            target_player: Player record (or a dict with the same keys: id, name, team,
+                         division, conference, age, height, position, jersey_number, ppg)
             season: NBA season string (e.g., '2023-24')
         """
-        self.target_player = target_player
+        self.target_player = Player.coerce(target_player)
         self.season = season
         self.guesses = []
         self.max_guesses = 8
     
-    def make_guess(self, guessed_player: Dict) -> Dict:
+    def make_guess(self, guessed_player: Union[Player, Dict]) -> Dict:
         """
         Compare guessed player to target player
         
         Args:
-            guessed_player: Dict with player details to compare
+            guessed_player: Player record (or details dict) to compare
             
         Returns:
-            Dict with comparison results for each attribute
+            Dict with comparison results for each attribute; 'guessed_player'
+            is the Player record itself
         """
+        guessed_player = Player.coerce(guessed_player)
         if len(self.guesses) >= self.max_guesses:
             raise ValueError("Maximum guesses reached")
         
         # Check if this player has already been guessed
-        guessed_player_id = guessed_player.get('id')
+        guessed_player_id = guessed_player.id
         for previous_guess in self.guesses:
-            if previous_guess['guessed_player']['id'] == guessed_player_id:
-                raise ValueError(f"You have already guessed {guessed_player.get('name', 'this player')}")
+            if previous_guess['guessed_player'].id == guessed_player_id:
+                raise ValueError(f"You have already guessed {guessed_player.name or 'this player'}")
         
         comparison = {
             'team': self._compare_team(guessed_player),
@@ -52,22 +115,10 @@ class WordleEngine:
             'ppg': self._compare_ppg(guessed_player)
         }
         
-        is_correct = guessed_player.get('id') == self.target_player.get('id')
+        is_correct = guessed_player.id == self.target_player.id
         
         guess_result = {
-            'guessed_player': {
-                'id': guessed_player.get('id'),
-                'name': guessed_player.get('name'),
-                'team': guessed_player.get('team', ''),
-                'division': guessed_player.get('division', ''),
-                'conference': guessed_player.get('conference', ''),
-                'age': guessed_player.get('age'),
-                'height': guessed_player.get('height', ''),
-                'position': guessed_player.get('position', ''),
-                'jersey_number': guessed_player.get('jersey_number'),
-                'ppg': guessed_player.get('ppg', 0.0),
-                'image_url': guessed_player.get('image_url')
-            },
+            'guessed_player': guessed_player,
             'comparison': comparison,
             'is_correct': is_correct,
             'guess_number': len(self.guesses) + 1
@@ -77,10 +128,10 @@ class WordleEngine:
         
         return guess_result
     
-    def _compare_team(self, guessed: Dict) -> Dict:
+    def _compare_team(self, guessed: Player) -> Dict:
         """Compare team - exact match only"""
-        target_team = self.target_player.get('team', '')
-        guessed_team = guessed.get('team', '')
+        target_team = self.target_player.team
+        guessed_team = guessed.team
         
         target_team_lower = target_team.lower() if target_team else ''
         guessed_team_lower = guessed_team.lower() if guessed_team else ''
@@ -102,8 +153,8 @@ class WordleEngine:
             }
         
         # Check abbreviation match
-        target_abbrev = self.target_player.get('team_abbreviation', '').lower()
-        guessed_abbrev = guessed.get('team_abbreviation', '').lower()
+        target_abbrev = self.target_player.team_abbreviation.lower()
+        guessed_abbrev = guessed.team_abbreviation.lower()
         
         if target_abbrev and guessed_abbrev and target_abbrev == guessed_abbrev:
             return {
@@ -120,10 +171,10 @@ class WordleEngine:
             'status': 'incorrect'
         }
     
-    def _compare_division(self, guessed: Dict) -> Dict:
+    def _compare_division(self, guessed: Player) -> Dict:
         """Compare division - exact match only"""
-        target_div = self.target_player.get('division', '')
-        guessed_div = guessed.get('division', '')
+        target_div = self.target_player.division
+        guessed_div = guessed.division
         
         target_div_lower = target_div.lower() if target_div else ''
         guessed_div_lower = guessed_div.lower() if guessed_div else ''
@@ -151,10 +202,10 @@ class WordleEngine:
             'status': 'incorrect'
         }
     
-    def _compare_conference(self, guessed: Dict) -> Dict:
+    def _compare_conference(self, guessed: Player) -> Dict:
         """Compare conference - exact match only"""
-        target_conf = self.target_player.get('conference', '')
-        guessed_conf = guessed.get('conference', '')
+        target_conf = self.target_player.conference
+        guessed_conf = guessed.conference
         
         target_conf_lower = target_conf.lower() if target_conf else ''
         guessed_conf_lower = guessed_conf.lower() if guessed_conf else ''
@@ -182,10 +233,10 @@ class WordleEngine:
             'status': 'incorrect'
         }
     
-    def _compare_age(self, guessed: Dict) -> Dict:
+    def _compare_age(self, guessed: Player) -> Dict:
         """Compare age - directional feedback (higher/lower/correct)"""
-        target_age = self.target_player.get('age')
-        guessed_age = guessed.get('age')
+        target_age = self.target_player.age
+        guessed_age = guessed.age
         
         if target_age is None or guessed_age is None:
             return {
@@ -218,10 +269,10 @@ class WordleEngine:
             'status': 'lower'
         }
     
-    def _compare_height(self, guessed: Dict) -> Dict:
+    def _compare_height(self, guessed: Player) -> Dict:
         """Compare height - directional feedback (higher/lower/correct)"""
-        target_height = self.target_player.get('height', '')
-        guessed_height = guessed.get('height', '')
+        target_height = self.target_player.height
+        guessed_height = guessed.height
         
         if not target_height or not guessed_height:
             return {
@@ -274,10 +325,10 @@ class WordleEngine:
             'status': 'lower'
         }
     
-    def _compare_position(self, guessed: Dict) -> Dict:
+    def _compare_position(self, guessed: Player) -> Dict:
         """Compare position - exact match or partial (same position group)"""
-        target_pos = self.target_player.get('position', '')
-        guessed_pos = guessed.get('position', '')
+        target_pos = self.target_player.position
+        guessed_pos = guessed.position
         
         target_pos_upper = target_pos.upper() if target_pos else ''
         guessed_pos_upper = guessed_pos.upper() if guessed_pos else ''
@@ -298,50 +349,6 @@ class WordleEngine:
                 'status': 'correct'
             }
         
-        # Helper function to extract position groups from a position string
-        # Handles formats like "C", "PF", "SF", "Center-Forward", "C-F", etc.
-        def get_position_groups(pos_str):
-            """Extract all position groups from a position string"""
-            groups = set()
-            pos_upper = pos_str.upper().strip()
-            
-            # Split by hyphen, slash, or space to handle "Center-Forward", "C-F", "C/F", etc.
-            # Replace hyphens and slashes with spaces, then split
-            normalized = re.sub(r'[-/]', ' ', pos_upper)
-            parts = [p.strip() for p in normalized.split() if p.strip()]
-            
-            # If no parts after splitting, check the original string
-            if not parts:
-                parts = [pos_upper]
-            
-            # Check each part for position indicators
-            # Use separate if statements (not elif) so hyphenated positions can match multiple groups
-            for part in parts:
-                # Center positions
-                if part in ['C', 'CENTER']:
-                    groups.add('center')
-                # Guard positions  
-                if part in ['PG', 'POINT', 'G', 'GUARD'] or part.startswith('SHOOTING'):
-                    groups.add('guard')
-                if part == 'SG':
-                    groups.add('guard')
-                # Forward positions
-                if part in ['PF', 'POWER', 'SF', 'SMALL']:
-                    groups.add('forward')
-                if part in ['F', 'FORWARD']:
-                    groups.add('forward')
-            
-            # Handle standalone abbreviations that might not have been split
-            if not groups:
-                if pos_upper in ['C']:
-                    groups.add('center')
-                elif pos_upper in ['PG', 'SG', 'G']:
-                    groups.add('guard')
-                elif pos_upper in ['SF', 'PF', 'F']:
-                    groups.add('forward')
-            
-            return groups
-        
         # Get position groups for both target and guessed
         target_groups = get_position_groups(target_pos_upper)
         guessed_groups = get_position_groups(guessed_pos_upper)
@@ -362,10 +369,10 @@ class WordleEngine:
             'status': 'incorrect'
         }
     
-    def _compare_jersey(self, guessed: Dict) -> Dict:
+    def _compare_jersey(self, guessed: Player) -> Dict:
         """Compare jersey number - directional feedback (higher/lower/correct)"""
-        target_jersey = self.target_player.get('jersey_number')
-        guessed_jersey = guessed.get('jersey_number')
+        target_jersey = self.target_player.jersey_number
+        guessed_jersey = guessed.jersey_number
         
         if target_jersey is None or guessed_jersey is None:
             return {
@@ -398,10 +405,10 @@ class WordleEngine:
             'status': 'lower'
         }
     
-    def _compare_ppg(self, guessed: Dict) -> Dict:
+    def _compare_ppg(self, guessed: Player) -> Dict:
         """Compare PPG - directional feedback (higher/lower/correct)"""
-        target_ppg = self.target_player.get('ppg', 0.0)
-        guessed_ppg = guessed.get('ppg', 0.0)
+        target_ppg = self.target_player.ppg
+        guessed_ppg = guessed.ppg
         
         if target_ppg == guessed_ppg:
             return {
@@ -428,15 +435,7 @@ class WordleEngine:
     
     def _height_to_inches(self, height_str: str) -> Optional[int]:
         """Convert height string (e.g., '6-8') to inches"""
-        try:
-            parts = height_str.split('-')
-            if len(parts) == 2:
-                feet = int(parts[0])
-                inches = int(parts[1])
-                return feet * 12 + inches
-        except:
-            pass
-        return None
+        return height_to_inches(height_str)
     
     def is_game_over(self) -> bool:
         """Check if game is over (won or max guesses reached)"""
@@ -451,8 +450,8 @@ class WordleEngine:
     def get_game_state(self) -> Dict:
         """Get current game state"""
         return {
-            'target_player_id': self.target_player.get('id'),
-            'target_player_name': self.target_player.get('name'),
+            'target_player_id': self.target_player.id,
+            'target_player_name': self.target_player.name,
             'season': self.season,
             'guesses': self.guesses,
             'guess_count': len(self.guesses),
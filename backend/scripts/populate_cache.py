@@ -14,6 +14,10 @@ from datetime import datetime, date
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from nba_api.stats.endpoints import commonallplayers, commonplayerinfo, playergamelog, teaminfocommon
+from app.services.snapshot import write_snapshot
+from app.services.cache_writer import atomic_write
+from app.services.http_pool import create_session, install_nba_api_session
+from app.services.transport import TransportConfig
 
 def populate_cache():
     """Fetch all players and their full details for 2025-26 season and save to cache"""
@@ -26,6 +30,10 @@ def populate_cache():
     print("This will fetch ALL player details - may take 30-60 minutes")
     print("=" * 60)
     
+    # Requests run one after another, so a single keep-alive connection serves them all.
+    # NBA_API_TRANSPORT=record saves every response as a replayable test fixture
+    install_nba_api_session(create_session(adapter=TransportConfig.from_env().adapter(pool_size=1)))
+    
     try:
         # Step 1: Fetch players list
         print("\nStep 1: Fetching players list...")
@@ -49,8 +57,8 @@ def populate_cache():
             "last_updated": datetime.now().isoformat()
         }
         
-        with open(players_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(players_cache_data, f, indent=2, ensure_ascii=False)
+        # Atomic, so a running server's hot reload never reads a half-written file
+        atomic_write(players_cache_file, json.dumps(players_cache_data, indent=2, ensure_ascii=False).encode('utf-8'))
         print(f"✅ Saved players list to {players_cache_file}")
         
         # Step 2: Fetch full details for each player
@@ -160,7 +168,9 @@ def populate_cache():
                     'jersey_number': int(player_data.get('JERSEY', 0)) if player_data.get('JERSEY') else None,
                     'ppg': round(float(ppg), 1) if ppg else 0.0,
                     'image_url': image_url,
-                    'season': season
+                    'season': season,
+                    # The app refreshes details older than 6 hours in the background
+                    'fetched_at': datetime.now().isoformat()
                 }
                 
                 player_details_cache[player_id_str] = player_details
@@ -186,8 +196,12 @@ def populate_cache():
             'players': player_details_cache
         }
         
-        with open(details_cache_file, 'w', encoding='utf-8') as f:
-            json.dump(details_cache_data, f, indent=2, ensure_ascii=False)
+        atomic_write(details_cache_file, json.dumps(details_cache_data, indent=2, ensure_ascii=False).encode('utf-8'))
+        
+        # Regenerate the binary snapshot the app maps at startup
+        snapshot_file = cache_dir / "players_snapshot.bin"
+        write_snapshot(snapshot_file, players_cache_file, details_cache_file)
+        print(f"✅ Saved player snapshot to {snapshot_file}")
         
         print("\n" + "=" * 60)
         print("✅ Cache Population Complete!")
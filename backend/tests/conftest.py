@@ -0,0 +1,83 @@
+"""
+Shared test setup: replay recorded stats.nba.com responses instead of the network,
+and give the app a scratch copy of its cache files
+"""
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import pytest
+
+# Set before app modules are imported, since the routes build their NBADataService at import time.
+# Requests without a recording under tests/fixtures/nba_api fail at once (MissingFixtureError),
+# so tests exercise the cache fallbacks deterministically and offline. This relies on
+# nba_api's session hook; NBADataService refuses to start without it.
+os.environ.setdefault('NBA_API_TRANSPORT', 'replay')
+
+# The service writes fetched details (and the snapshot) back to its data dir; keep test
+# data out of the committed app/data files
+_data_dir = tempfile.mkdtemp(prefix='nba-data-')
+for _name in ('players_cache.json', 'player_details_cache.json', 'player_aliases.json'):
+    shutil.copy(Path(__file__).parent.parent / 'app' / 'data' / _name, _data_dir)
+os.environ['NBA_DATA_DIR'] = _data_dir
+atexit.register(shutil.rmtree, _data_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def make_service(tmp_path):
+    """Build NBADataServices over a scratch copy of the cache files in tmp_path"""
+    from app.services.nba_data import NBADataService
+    from app.services.http_pool import install_nba_api_session
+
+    for name in ('players_cache.json', 'player_details_cache.json', 'player_aliases.json'):
+        shutil.copy(Path(_data_dir) / name, tmp_path)
+    services = []
+
+    def make(**kwargs):
+        service = NBADataService(data_dir=tmp_path, **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+    # Each service installs its session into nba_api; give it back to the app's service
+    from app.routes.game import nba_service
+    install_nba_api_session(nba_service.session)
+
+
+def _make_handler(status: int = 200):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body = json.dumps({'path': self.path, 'resultSets': []}).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def server(request):
+    """
+    Local keep-alive HTTP server echoing each request's path as JSON
+
+    Answers with status 200 unless parametrized indirectly with another status.
+    """
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(getattr(request, 'param', 200)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
@@ -91,6 +91,10 @@ def test_make_guess_flow():
         assert "guess_number" in guess_data
         assert "is_game_over" in guess_data
         assert "is_won" in guess_data
+        assert set(guess_data["guessed_player"]) == {
+            "id", "name", "team", "division", "conference", "age", "height",
+            "position", "jersey_number", "ppg", "image_url"
+        }
         
         # Verify comparison structure
         comparison = guess_data["comparison"]
@@ -280,3 +284,489 @@ def test_duplicate_guess_prevention():
             )
             assert guess3.status_code == 200
             assert guess3.json()["guess_number"] == 2
+
+
+def test_player_search_fuzzy():
+    """Test fuzzy player search tolerates misspellings"""
+    response = client.get("/api/player-search", params={"q": "Stehpen Curry", "limit": 5})
+    assert response.status_code == 200
+    assert response.json() == []
+    
+    response = client.get("/api/player-search", params={"q": "Stehpen Curry", "limit": 5, "fuzzy": True})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) > 0
+    assert results[0]["name"] == "Stephen Curry"
+
+
+def test_player_search_alias():
+    """Test nickname search returns the aliased player first"""
+    response = client.get("/api/player-search", params={"q": "SGA", "limit": 5})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) > 0
+    assert results[0]["name"] == "Shai Gilgeous-Alexander"
+
+
+def test_roster_bundle():
+    """Test the roster bundle is served by content hash with long-lived caching"""
+    response = client.get("/api/roster-bundle")
+    assert response.status_code == 200
+    info = response.json()
+    assert info["player_count"] > 0
+    assert info["url"] == f"/api/roster-bundle/{info['version']}"
+    
+    response = client.get(info["url"])
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "immutable" in response.headers["cache-control"]
+    bundle = response.json()
+    assert bundle["fields"] == ["id", "name", "team", "key", "rank"]
+    assert len(bundle["players"]) == info["player_count"]
+    
+    # Within a tier the bundle's rank orders players like the server's boosts
+    server = [player["id"] for player in client.get("/api/player-search", params={"q": "jo", "limit": 3}).json()]
+    by_rank = sorted(bundle["players"], key=lambda row: row[4])
+    assert [row[0] for row in by_rank if " jo" in f" {row[3]}"][:3] == server
+    
+    # Revalidation with the ETag is answered without a body
+    response = client.get(info["url"], headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    
+    response = client.get("/api/roster-bundle/not-a-version")
+    assert response.status_code == 404
+
+
+def test_player_search_filters():
+    """Test faceted player search without a name query"""
+    response = client.get("/api/player-search", params={"division": "Pacific", "position": "guard", "limit": 50})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) > 0
+    
+    response = client.get("/api/player-search", params={"q": "Stephen Curry", "team": "GSW"})
+    assert response.status_code == 200
+    assert [p["name"] for p in response.json()] == ["Stephen Curry"]
+    
+    response = client.get("/api/player-search", params={"q": "Stephen Curry", "team": "LAL"})
+    assert response.status_code == 200
+    assert response.json() == []
+    
+    response = client.get("/api/player-search", params={"ppg_min": 100})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_player_search_response_cache():
+    """Test repeated searches are served from the pre-serialized cache"""
+    from app.routes.game import search_response_cache, nba_service
+    
+    first = client.get("/api/player-search", params={"q": "Jokic", "limit": 3})
+    hits = search_response_cache.hits
+    # Same normalized query ("jokić" -> "jokic") hits the cached bytes
+    second = client.get("/api/player-search", params={"q": "JOKIĆ", "limit": 3})
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert search_response_cache.hits == hits + 1
+    
+    # Re-indexing the players invalidates every cached body
+    nba_service.data_version += 1
+    client.get("/api/player-search", params={"q": "Jokic", "limit": 3})
+    assert search_response_cache.hits == hits + 1
+
+
+def test_player_record_index():
+    """Test players list records are looked up by PERSON_ID without a scan"""
+    from app.routes.game import nba_service
+    
+    record = nba_service.get_player_record(2544, "2025-26")
+    assert record["DISPLAY_FIRST_LAST"] == "LeBron James"
+    assert nba_service.get_player_record("2544", "2025-26") is record
+    assert nba_service.get_player_record(999999999, "2025-26") is None
+
+
+def test_player_search_websocket():
+    """Test autocomplete over the WebSocket channel"""
+    with client.websocket_connect("/api/ws/player-search") as websocket:
+        websocket.send_json({"id": 1, "q": "Stephen Cu", "limit": 3})
+        reply = websocket.receive_json()
+        assert reply["id"] == 1
+        assert reply["q"] == "Stephen Cu"
+        assert reply["results"][0]["name"] == "Stephen Curry"
+        
+        websocket.send_json({"id": 2, "q": "Yanis", "phonetic": True, "limit": 1})
+        reply = websocket.receive_json()
+        assert reply["id"] == 2
+        assert reply["results"][0]["name"] == "Giannis Antetokounmpo"
+        
+        websocket.send_text("not json")
+        reply = websocket.receive_json()
+        assert "error" in reply
+
+
+def test_shutdown_flushes_player_details(monkeypatch):
+    """Test the app lifespan flushes the details cache writer on shutdown"""
+    from app.routes.game import nba_service
+    
+    calls = []
+    monkeypatch.setattr(nba_service, "shutdown", lambda: calls.append(True))
+    with TestClient(app) as lifespan_client:
+        assert lifespan_client.get("/health").status_code == 200
+        assert calls == []
+    assert calls == [True]
+
+
+def test_reload_cache_endpoint(monkeypatch):
+    """Test the admin reload only swaps data when asked to or when files changed"""
+    from app.routes.game import nba_service
+    
+    # Disabled unless an admin token is configured, and only usable with it
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.post("/api/admin/reload-cache").status_code == 404
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    assert client.post("/api/admin/reload-cache", params={"force": True}).status_code == 403
+    assert client.post("/api/admin/reload-cache", headers={"X-Admin-Token": "guess"}).status_code == 403
+    headers = {"X-Admin-Token": "s3cret"}
+    
+    client.get("/api/player-search", params={"q": "LeBron"})
+    response = client.post("/api/admin/reload-cache", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["reloaded"] is False
+    
+    version = nba_service.data_version
+    response = client.post("/api/admin/reload-cache", params={"force": True}, headers=headers)
+    assert response.json() == {"reloaded": True, "data_version": version + 1}
+    
+    results = client.get("/api/player-search", params={"q": "LeBron"}).json()
+    assert results[0]["id"] == 2544
+
+
+def test_reload_picks_up_changed_files(tmp_path, monkeypatch):
+    """Test regenerated cache files are hot-reloaded into details and indexes"""
+    import json
+    from app.routes.game import nba_service
+    from app.services.details_cache import iter_cached_details
+    
+    details_file = tmp_path / "player_details_cache.json"
+    cache_data = json.loads(nba_service._player_details_cache_file.read_text(encoding="utf-8"))
+    # Whichever layout the file has by now, rewrite it with LeBron's ppg changed
+    entries = [dict(details, ppg=99.9) if details["id"] == 2544 else details
+               for details in iter_cached_details(cache_data)]
+    details_file.write_text(json.dumps({"players": dict(enumerate(entries))}), encoding="utf-8")
+    
+    nba_service.get_search_index("2025-26")
+    monkeypatch.setattr(nba_service, "_player_details_cache_file", details_file)
+    monkeypatch.setattr(nba_service, "_snapshot_file", tmp_path / "players_snapshot.bin")
+    try:
+        assert nba_service.reload_cache_files()
+        assert nba_service.get_player_details(2544, "2025-26").ppg == 99.9
+        assert nba_service.search_players("", 1, "2025-26", filters={"ppg_min": 90})[0]["id"] == 2544
+    finally:
+        monkeypatch.undo()
+        assert nba_service.reload_cache_files()
+    assert nba_service.get_player_details(2544, "2025-26").ppg != 99.9
+
+
+def test_stale_details_refreshed_in_background(monkeypatch):
+    """Test stale details are served immediately and refreshed once in the background"""
+    import threading
+    from app.routes.game import nba_service
+    from app.services.player_record import Player
+    
+    stale = Player(id=2544, name="LeBron James", ppg=25.7, season="2019-20")
+    nba_service._player_details_cache.put(stale, fetched_at=0.0)
+    
+    release = threading.Event()
+    calls = []
+    
+    def fake_fetch(player_id, season, strict=False):
+        calls.append((player_id, season, strict))
+        release.wait(5)
+        refreshed = Player(id=player_id, name="LeBron James", ppg=27.4, season=season)
+        nba_service._player_details_cache.put(refreshed)
+        return refreshed
+    
+    monkeypatch.setattr(nba_service, "_fetch_player_details", fake_fetch)
+    assert nba_service.get_player_details(2544, "2019-20") is stale
+    assert nba_service.get_player_details(2544, "2019-20") is stale
+    release.set()
+    
+    for _ in range(100):
+        if not nba_service._refreshing:
+            break
+        threading.Event().wait(0.02)
+    assert calls == [(2544, "2019-20", True)]
+    assert nba_service.get_player_details(2544, "2019-20").ppg == 27.4
+
+
+def test_failed_lookups_skip_upstream(monkeypatch):
+    """Test ids that just failed upstream fail fast without another API call"""
+    from app.routes.game import nba_service
+    from app.services.caching import TTLCache
+    
+    calls = []
+    
+    def failing_fetch(player_id, season, strict=False):
+        calls.append(player_id)
+        raise ConnectionError("Read timed out")
+    
+    monkeypatch.setattr(nba_service, "_fetch_player_details", failing_fetch)
+    monkeypatch.setattr(nba_service, "_failed_lookups", TTLCache(ttl=60))
+    for _ in range(3):
+        with pytest.raises(ValueError, match="timed out"):
+            nba_service.get_player_details(999999999, "2025-26")
+    assert calls == [999999999]
+
+
+def test_diagnostics_and_open_circuit(monkeypatch):
+    """Test the circuit state is exposed and an open circuit skips upstream calls"""
+    from app.routes.game import nba_service
+    from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, OPEN
+    from app.services.caching import TTLCache
+    from app.services.retry import RetryPolicy
+    
+    breaker = CircuitBreaker("nba_api", failure_threshold=1, recovery_timeout=60)
+    with pytest.raises(ConnectionError):
+        breaker.call(lambda: (_ for _ in ()).throw(ConnectionError("blocked")))
+    monkeypatch.setattr(nba_service, "circuit_breaker", breaker)
+    monkeypatch.setattr(nba_service, "_failed_lookups", TTLCache(ttl=60))
+    
+    upstream_calls = []
+    with pytest.raises(CircuitOpenError):
+        nba_service._call_upstream(lambda: upstream_calls.append(1), RetryPolicy(max_attempts=3, base_delay=0))
+    assert upstream_calls == []
+    # An open circuit isn't a reason to remember the id as failing
+    with pytest.raises(ValueError):
+        nba_service.get_player_details(987654321, "2025-26")
+    assert 987654321 not in [key[0] for key, _ in nba_service._failed_lookups.items()]
+    
+    response = client.get("/api/diagnostics")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["circuit_breaker"]["state"] == OPEN
+    assert data["circuit_breaker"]["rejected"] >= 2
+    assert "search_response_cache" in data
+    assert "reuse_rate" in data["http_pool"]
+
+
+async def test_async_details_run_off_the_event_loop(monkeypatch):
+    """Test cache hits return on the event loop and misses run on the upstream executor"""
+    import threading
+    from app.routes.game import nba_service
+    from app.services.player_record import Player
+    
+    cached = Player(id=2544, name="LeBron James", team="Lakers", team_abbreviation="LAL",
+                    division="Pacific", conference="West", age=40, height="6-9",
+                    position="Forward", jersey_number=23, ppg=24.4, season="2025-26")
+    nba_service._player_details_cache.put(cached)
+    
+    threads = []
+    
+    def fake_get_player_details(player_id, season=None):
+        threads.append(threading.current_thread().name)
+        return cached
+    
+    monkeypatch.setattr(nba_service, "get_player_details", fake_get_player_details)
+    assert await nba_service.aget_player_details(2544, "2025-26") is cached
+    assert threads == []
+    
+    assert await nba_service.aget_player_details(111111111, "2025-26") is cached
+    assert len(threads) == 1 and threads[0].startswith("nba-api")
+
+
+async def test_request_deadline_reaches_upstream_threads(monkeypatch):
+    """Test upstream work on the executor sees the deadline of the request that started it"""
+    from app.routes.game import nba_service
+    from app.services.retry import current_deadline, deadline_scope
+    
+    seen = []
+    
+    def fake_get_player_details(player_id, season=None):
+        seen.append(current_deadline())
+        return None
+    
+    monkeypatch.setattr(nba_service, "get_player_details", fake_get_player_details)
+    with deadline_scope(3.0) as deadline:
+        await nba_service.aget_player_details(222222222, "2025-26")
+    await nba_service.aget_player_details(222222223, "2025-26")
+    assert seen == [deadline, None]
+
+
+async def test_deadline_bounds_time_queued_for_upstream(make_service, monkeypatch):
+    """Test a request stops waiting for busy upstream threads at its deadline and serves cached data"""
+    import threading
+    import time
+    from app.services.retry import deadline_scope
+    
+    service = make_service()
+    service.get_search_index("2025-26")
+    release = threading.Event()
+    monkeypatch.setattr(service, "_get_cached_details", lambda player_id, season: None)
+    monkeypatch.setattr(service, "get_player_details", lambda player_id, season=None: release.wait(5))
+    # Every upstream thread is taken by slower requests
+    for _ in range(service.upstream_workers):
+        service._upstream_executor.submit(release.wait, 5)
+    
+    started = time.monotonic()
+    try:
+        with deadline_scope(0.2):
+            details = await service.aget_player_details(2544, "2025-26")
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1.0
+    assert (details.id, details.name) == (2544, "LeBron James")
+
+
+def test_pool_size_from_environment(make_service, monkeypatch):
+    """Test NBA_API_POOL_SIZE sizes the HTTP pool and the upstream threads together"""
+    from app.services.http_pool import session_stats
+    from app.services.nba_data import REFRESH_WORKERS, UPSTREAM_WORKERS
+    
+    assert make_service().upstream_workers == UPSTREAM_WORKERS
+    monkeypatch.setenv("NBA_API_POOL_SIZE", "16")
+    service = make_service()
+    assert session_stats(service.session)["pool_size"] == 16
+    assert service.upstream_workers == 16 - REFRESH_WORKERS
+
+
+def test_player_table_backs_facet_filters():
+    """Test the player table is the facet index's, lined up with the season's players"""
+    from app.routes.game import nba_service
+    
+    table = nba_service.get_player_table("2025-26")
+    assert table is nba_service.get_facet_index("2025-26").table
+    assert len(table) == len(nba_service.get_all_active_players("2025-26"))
+    assert table.present.any()
+
+
+def test_tests_use_scratch_data_dir():
+    """Test the app under test writes its caches outside the committed app/data files"""
+    from app.routes.game import nba_service
+    from app.services.nba_data import DATA_DIR
+    
+    assert nba_service._player_details_cache_file.parent != DATA_DIR
+    assert nba_service._details_writer.path == nba_service._player_details_cache_file
+
+
+def test_write_behind_flush_only_remaps_other_workers(make_service):
+    """Test one worker's details flush rebuilds the snapshot once and others just remap it"""
+    from app.services.player_record import Player
+    from app.services.snapshot import source_signature
+    
+    writer, other = make_service(), make_service()
+    other.get_search_index("2025-26")
+    version = other.data_version
+    
+    fetched = Player(id=1641705, name="Victor Wembanyama", ppg=24.3, season="2025-26")
+    writer._save_player_details_cache(fetched.id, fetched)
+    writer._flush_player_details_cache()
+    snapshot_signature = source_signature(writer._snapshot_file)
+    # The writer's own flush never looks like a change to it
+    assert not writer.reload_cache_files()
+    
+    assert other.reload_cache_files()
+    assert other.data_version == version
+    assert other.get_player_details(1641705, "2025-26").ppg == 24.3
+    assert source_signature(other._snapshot_file) == snapshot_signature
+
+
+def test_flush_keeps_a_newer_populate_run(make_service):
+    """Test a details flush after the files were regenerated keeps the new data and loads it"""
+    import json
+    import os
+    from app.services.details_cache import iter_cached_details
+    from app.services.player_record import Player
+    
+    service = make_service()
+    details_file = service._player_details_cache_file
+    fetched = Player(id=1999999, name="Rookie Callup", ppg=4.5, season="2025-26")
+    service._save_player_details_cache(fetched.id, fetched)
+    
+    # populate_cache.py rewrites the file before the writer gets to it
+    entries = [dict(details, ppg=99.9) if details["id"] == 2544 else details
+               for details in iter_cached_details(json.loads(details_file.read_text(encoding="utf-8")))]
+    details_file.write_text(json.dumps({"players": dict(enumerate(entries))}), encoding="utf-8")
+    os.utime(details_file, ns=(0, 10 ** 18))
+    service._flush_player_details_cache()
+    
+    written = {(details["id"], details["season"]): details
+               for details in iter_cached_details(json.loads(details_file.read_text(encoding="utf-8")))}
+    assert written[(2544, "2025-26")]["ppg"] == 99.9
+    assert written[(1999999, "2025-26")]["ppg"] == 4.5
+    assert service.get_player_details(2544, "2025-26").ppg == 99.9
+    assert not service.reload_cache_files()
+
+
+def test_reload_keeps_data_when_a_file_is_half_written(make_service):
+    """Test a cache file caught mid-write aborts the reload instead of emptying the caches"""
+    import os
+    service = make_service()
+    service.get_search_index("2025-26")
+    details_file = service._player_details_cache_file
+    complete = details_file.read_bytes()
+    count, version = len(service._player_details_cache), service.data_version
+    
+    details_file.write_bytes(complete[:len(complete) // 2])
+    assert not service.reload_cache_files()
+    assert (len(service._player_details_cache), service.data_version) == (count, version)
+    assert service.get_player_details(2544, "2025-26").ppg > 0
+    
+    # Once the write completes the next poll picks it up
+    details_file.write_bytes(complete)
+    os.utime(details_file, ns=(0, 10 ** 18))
+    assert service.reload_cache_files()
+
+
+def test_populate_records_age_from_the_file(make_service):
+    """Test records without their own fetch time are as old as the file and refreshed once when stale"""
+    import json
+    from datetime import datetime, timedelta
+    
+    service = make_service()
+    details_file = service._player_details_cache_file
+    cache_data = json.loads(details_file.read_text(encoding="utf-8"))
+    cache_data["last_updated"] = (datetime.now() - timedelta(days=2)).isoformat()
+    details_file.write_text(json.dumps(cache_data), encoding="utf-8")
+    assert service.reload_cache_files(force=True)
+    
+    scheduled = []
+    service._schedule_details_refresh = lambda player_id, season: scheduled.append((player_id, season))
+    assert service.get_player_details(2544, "2025-26") is not None
+    assert scheduled == [(2544, "2025-26")]
+    
+    cache_data["last_updated"] = datetime.now().isoformat()
+    details_file.write_text(json.dumps(cache_data), encoding="utf-8")
+    assert service.reload_cache_files(force=True)
+    assert service.get_player_details(2544, "2025-26") is not None
+    assert scheduled == [(2544, "2025-26")]
+
+
+async def test_concurrent_guesses_after_game_won(monkeypatch):
+    """Test a guess whose details arrive after another guess won the game is rejected"""
+    import asyncio
+    from fastapi import HTTPException
+    from app.routes import game
+    from app.services.player_record import Player
+    from app.services.wordle_engine import WordleEngine
+    
+    target = Player(id=2544, name="LeBron James", team="Lakers", season="2025-26")
+    other = Player(id=201939, name="Stephen Curry", team="Warriors", season="2025-26")
+    released = asyncio.Event()
+    
+    async def slow_details(player_id, season=None):
+        await released.wait()
+        return target if player_id == target.id else other
+    
+    monkeypatch.setattr(game.nba_service, "aget_player_details", slow_details)
+    monkeypatch.setitem(game.games, "race", WordleEngine(target, "2025-26"))
+    
+    winning = asyncio.ensure_future(game.make_guess(game.GuessRequest(game_id="race", player_id=target.id)))
+    late = asyncio.ensure_future(game.make_guess(game.GuessRequest(game_id="race", player_id=other.id)))
+    await asyncio.sleep(0)
+    released.set()
+    
+    assert (await winning).is_won
+    with pytest.raises(HTTPException) as error:
+        await late
+    assert error.value.status_code == 400
+    assert len(game.games["race"].guesses) == 1
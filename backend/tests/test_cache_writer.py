@@ -0,0 +1,71 @@
+"""
+Unit tests for the write-behind cache writer
+"""
+import json
+import pytest
+from app.services.cache_writer import WriteBehindWriter, atomic_write
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    """Test the target is replaced and no temp files are left behind"""
+    path = tmp_path / 'cache.json'
+    path.write_text('old', encoding='utf-8')
+    atomic_write(path, b'new')
+    assert path.read_text(encoding='utf-8') == 'new'
+    assert [p.name for p in tmp_path.iterdir()] == ['cache.json']
+
+
+def test_batches_until_flush(tmp_path):
+    """Test dirty keys are written together, once"""
+    path = tmp_path / 'cache.json'
+    cache = {}
+    writer = WriteBehindWriter(path, lambda: {'players': dict(cache)}, interval=60, batch_size=100)
+
+    for key in ('1', '2', '2'):
+        cache[key] = key
+        writer.mark_dirty(key)
+    assert writer.pending == 2
+    assert not path.exists()
+
+    assert writer.flush()
+    assert not writer.flush()
+    assert writer.writes == 1
+    assert json.loads(path.read_text(encoding='utf-8')) == {'players': {'1': '1', '2': '2'}}
+    writer.stop()
+
+
+def test_batch_size_wakes_writer(tmp_path):
+    """Test a full batch is written by the background thread"""
+    path = tmp_path / 'cache.json'
+    writer = WriteBehindWriter(path, lambda: {'ok': True}, interval=60, batch_size=2)
+    writer.mark_dirty('a')
+    writer.mark_dirty('b')
+    for _ in range(100):
+        if writer.writes:
+            break
+        writer._thread.join(timeout=0.05)
+    assert writer.writes == 1
+    assert writer.pending == 0
+    writer.stop()
+
+
+def test_stop_flushes_and_failures_are_retried(tmp_path):
+    """Test stop() writes pending keys and a failed write keeps them dirty"""
+    path = tmp_path / 'cache.json'
+    payload = {'fail': True}
+
+    def serialize():
+        if payload['fail']:
+            raise OSError('disk full')
+        return payload
+
+    writer = WriteBehindWriter(path, serialize, interval=60, batch_size=100)
+    writer.mark_dirty('a')
+    with pytest.raises(OSError):
+        writer.flush()
+    assert writer.pending == 1
+
+    payload['fail'] = False
+    writer.stop()
+    assert writer.pending == 0
+    assert json.loads(path.read_text(encoding='utf-8')) == {'fail': False}
@@ -0,0 +1,78 @@
+"""
+Unit tests for the upstream circuit breaker
+"""
+import pytest
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def failing():
+    raise ConnectionError("stats.nba.com timed out")
+
+
+@pytest.fixture
+def clock():
+    now = [0.0]
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('test', failure_threshold=3, recovery_timeout=10, clock=lambda: clock[0])
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """Test the threshold counts consecutive failures only"""
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+    assert breaker.state == OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError, match="timed out"):
+        breaker.call(calls.append, 1)
+    assert calls == []
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_probe(breaker, clock):
+    """Test one probe is let through after the timeout; it closes or re-opens the circuit"""
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+
+    clock[0] = 10
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    assert breaker.state == OPEN
+
+    clock[0] = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'ok')
+
+    clock[0] = 20
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED
+    assert breaker.stats()['consecutive_failures'] == 0
+
+
+def test_half_open_allows_one_probe_at_a_time(breaker, clock):
+    """Test concurrent calls are rejected while a probe is in flight"""
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+    clock[0] = 10
+
+    def probe():
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: 'second')
+        return 'probe'
+
+    assert breaker.call(probe) == 'probe'
+    assert breaker.state == CLOSED
@@ -0,0 +1,125 @@
+"""
+Unit tests for the season-aware player details cache
+"""
+import json
+from app.services.player_record import Player
+from app.services.details_cache import PlayerDetailsCache, iter_cached_details, parse_fetched_at
+from app.services.snapshot import open_snapshot
+
+
+def make_player(player_id, season, **fields):
+    return Player.from_dict({'id': player_id, 'name': f'Player {player_id}', 'season': season, **fields})
+
+
+def test_seasons_do_not_overwrite_each_other():
+    """Test (player_id, season) keys keep one record per season"""
+    cache = PlayerDetailsCache()
+    cache.put(make_player(2544, '2025-26', ppg=24.4))
+    cache.put(make_player(2544, '2024-25', ppg=23.7))
+
+    assert cache.get(2544, '2025-26').ppg == 24.4
+    assert cache.get('2544', '2024-25').ppg == 23.7
+    assert cache.get(2544, '2023-24') is None
+    assert cache.get_any_season(2544) is not None
+    assert len(cache) == 2
+
+
+def test_general_details_apply_to_every_season():
+    """Test season-less details are found for any season but lose to exact ones"""
+    cache = PlayerDetailsCache()
+    cache.put(make_player(1, None, team='Lakers'))
+    cache.put(make_player(2, None))
+    cache.put(make_player(2, '2025-26', team='Celtics'))
+
+    assert cache.get(1, '2019-20').team == 'Lakers'
+    season = cache.season_details('2025-26')
+    assert set(season) == {'1', '2'}
+    assert season['2'].team == 'Celtics'
+
+
+def test_partition_lru_eviction():
+    """Test each season is capped on its own"""
+    cache = PlayerDetailsCache(max_entries_per_season=2)
+    for player_id in (1, 2, 3):
+        cache.put(make_player(player_id, '2025-26'))
+    cache.put(make_player(1, '2024-25'))
+
+    assert cache.get(1, '2025-26') is None
+    assert cache.get(3, '2025-26') is not None
+    assert cache.get(1, '2024-25') is not None
+
+
+def test_snapshot_base_layer(tmp_path):
+    """Test runtime entries shadow snapshot records and both are written back"""
+    players_file = tmp_path / 'players_cache.json'
+    details_file = tmp_path / 'player_details_cache.json'
+    players_file.write_text(json.dumps({'season': '2025-26', 'players': []}), encoding='utf-8')
+    legacy = {'players': {'2544': make_player(2544, '2025-26', ppg=24.4).to_dict()}}
+    details_file.write_text(json.dumps(legacy), encoding='utf-8')
+    snapshot = open_snapshot(tmp_path / 'players_snapshot.bin', players_file, details_file)
+    cache = PlayerDetailsCache(base=snapshot)
+
+    assert cache.get(2544, '2025-26').ppg == 24.4
+    cache.put(make_player(2544, '2025-26', ppg=30.0))
+    cache.put(make_player(2544, '2024-25', ppg=23.7))
+    assert cache.get(2544, '2025-26').ppg == 30.0
+    assert len(cache) == 2
+
+    saved = cache.to_json()
+    assert saved['seasons']['2025-26']['2544']['ppg'] == 30.0
+    assert sorted(details['season'] for details in iter_cached_details(saved)) == ['2024-25', '2025-26']
+    snapshot.close()
+
+
+def test_len_and_season_view_read_base_on_demand(tmp_path, monkeypatch):
+    """Test counting doesn't decode base records and a season view reads one record per lookup"""
+    players_file = tmp_path / 'players_cache.json'
+    details_file = tmp_path / 'player_details_cache.json'
+    players_file.write_text(json.dumps({'season': '2025-26', 'players': []}), encoding='utf-8')
+    records = {str(i): make_player(i, '2025-26', ppg=float(i)).to_dict() for i in (1, 2, 3)}
+    details_file.write_text(json.dumps({'players': records}), encoding='utf-8')
+    snapshot = open_snapshot(tmp_path / 'players_snapshot.bin', players_file, details_file)
+    cache = PlayerDetailsCache(base=snapshot)
+    cache.put(make_player(4, '2025-26'))
+
+    decoded = []
+    detail = snapshot.detail
+    monkeypatch.setattr(snapshot, 'detail', lambda row: decoded.append(row) or detail(row))
+    assert len(cache) == 4
+    assert decoded == []
+    view = cache.season_view('2025-26')
+    assert view.get('2').ppg == 2.0 and view.get(4).id == 4 and view.get(9) is None
+    assert len(decoded) == 1
+    snapshot.close()
+
+
+def test_fetched_at_round_trip():
+    """Test entries keep their fetch time and records without one are as old as the file"""
+    cache = PlayerDetailsCache()
+    cache.put(make_player(1, '2025-26'), fetched_at=1_700_000_000.0)
+    assert cache.lookup(1, '2025-26').fetched_at == 1_700_000_000.0
+
+    saved = {'last_updated': '2024-01-01T00:00:00', **cache.to_json()}
+    saved['players'] = {'2': make_player(2, '2025-26').to_dict()}
+    fetched = {details['id']: parse_fetched_at(details['fetched_at']) for details in iter_cached_details(saved)}
+    assert fetched[1] == 1_700_000_000.0
+    assert fetched[2] == parse_fetched_at('2024-01-01T00:00:00')
+    assert parse_fetched_at(None) == 0.0
+
+    cache.put(make_player(2, '2025-26'), fetched_at=0.0)
+    assert cache.to_json()['seasons']['2025-26']['2']['fetched_at'] is None
+
+
+def test_evicted_entries_stay_persisted():
+    """Test entries evicted from memory are kept in the file payload"""
+    cache = PlayerDetailsCache(max_entries_per_season=1)
+    cache.put(make_player(2544, '2025-26', ppg=24.4))
+    persisted = json.loads(json.dumps(cache.to_json()))
+    cache.put(make_player(201939, '2025-26', ppg=26.3))
+    assert cache.get(2544, '2025-26') is None
+
+    written = cache.to_json(persisted)
+    assert sorted(written['seasons']['2025-26']) == ['201939', '2544']
+    # Memory wins over what the file had
+    cache.put(make_player(2544, '2025-26', ppg=30.1))
+    assert cache.to_json(written)['seasons']['2025-26']['2544']['ppg'] == 30.1
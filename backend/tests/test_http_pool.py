@@ -0,0 +1,40 @@
+"""
+Unit tests for the shared nba_api connection pool
+"""
+import pytest
+from app.services.http_pool import create_session, install_nba_api_session, session_stats
+
+
+def test_keep_alive_reuse_rate(server):
+    """Test sequential requests reuse one pooled connection"""
+    session = create_session(pool_size=2)
+    assert session_stats(session)['reuse_rate'] is None
+    for _ in range(4):
+        assert session.get(f"{server}/stats/commonplayerinfo").status_code == 200
+
+    stats = session_stats(session)
+    assert stats == {'pool_size': 2, 'requests': 4, 'connections_opened': 1, 'reuse_rate': 0.75}
+    session.close()
+
+
+def test_nba_api_uses_installed_session():
+    """Test nba_api endpoints send requests through the installed session"""
+    from nba_api.stats.library.http import NBAStatsHTTP
+
+    assert hasattr(NBAStatsHTTP, 'set_session'), "nba_api is older than requirements.txt pins (no session hook)"
+    previous = NBAStatsHTTP.get_session()
+    session = create_session()
+    try:
+        install_nba_api_session(session)
+        assert NBAStatsHTTP().get_session() is session
+    finally:
+        NBAStatsHTTP.set_session(previous)
+
+
+def test_missing_session_hook_fails_loudly(monkeypatch):
+    """Test an nba_api without the session hook is an error, not a silent fallback"""
+    from nba_api.library.http import NBAHTTP
+
+    monkeypatch.delattr(NBAHTTP, 'set_session')
+    with pytest.raises(RuntimeError, match="set_session"):
+        install_nba_api_session(create_session())
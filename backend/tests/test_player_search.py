@@ -0,0 +1,273 @@
+"""
+Unit tests for the player search index
+"""
+import pytest
+from app.services.caching import LRUCache, TTLCache
+from app.services.phonetic import phonetic_codes
+from app.services.facets import FacetIndex, iter_rows
+from app.services.player_record import Player
+from app.services.player_index import PlayerSearchIndex, normalize_name, edit_distance
+
+
+@pytest.fixture
+def sample_players():
+    """Small roster in cache-file order (alphabetical by last name)"""
+    return [
+        {'PERSON_ID': 1, 'DISPLAY_FIRST_LAST': 'Nickeil Alexander-Walker', 'TEAM_ABBREVIATION': 'ATL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 2, 'DISPLAY_FIRST_LAST': 'Stephen Curry', 'TEAM_ABBREVIATION': 'GSW', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 3, 'DISPLAY_FIRST_LAST': 'Luka Dončić', 'TEAM_ABBREVIATION': 'LAL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 4, 'DISPLAY_FIRST_LAST': 'Shai Gilgeous-Alexander', 'TEAM_ABBREVIATION': 'OKC', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 5, 'DISPLAY_FIRST_LAST': 'Bronny James', 'TEAM_ABBREVIATION': 'LAL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 6, 'DISPLAY_FIRST_LAST': 'LeBron James', 'TEAM_ABBREVIATION': 'LAL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 7, 'DISPLAY_FIRST_LAST': 'Nikola Jokić', 'TEAM_ABBREVIATION': 'DEN', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 8, 'DISPLAY_FIRST_LAST': "De'Aaron Fox", 'TEAM_ABBREVIATION': 'SAS', 'ROSTERSTATUS': 1},
+    ]
+
+
+def ids(results):
+    return [p['PERSON_ID'] for p in results]
+
+
+def test_normalize_name():
+    """Test accents, case and punctuation are normalized"""
+    assert normalize_name('Nikola Jokić') == 'nikola jokic'
+    assert normalize_name('Shai Gilgeous-Alexander') == 'shai gilgeous alexander'
+    assert normalize_name("De'Aaron Fox") == 'deaaron fox'
+    assert normalize_name('A.J. Lawson') == 'aj lawson'
+    assert normalize_name('') == ''
+
+
+def test_search_substring(sample_players):
+    """Test substring matches anywhere in the full name"""
+    index = PlayerSearchIndex(sample_players)
+    assert ids(index.search('bron')) == [5, 6]
+    assert ids(index.search('lebron james')) == [6]
+    assert ids(index.search('en cu')) == [2]
+
+
+def test_search_two_char_query(sample_players):
+    """Test 2-character queries are answered from bigrams"""
+    index = PlayerSearchIndex(sample_players)
+    assert ids(index.search('ja')) == [5, 6]
+
+
+def test_search_ignores_accents_and_punctuation(sample_players):
+    """Test unaccented and punctuation-free queries still match"""
+    index = PlayerSearchIndex(sample_players)
+    assert ids(index.search('jokic')) == [7]
+    assert ids(index.search('Dončić')) == [3]
+    assert ids(index.search('gilgeous alexander')) == [4]
+    assert ids(index.search('deaaron')) == [8]
+
+
+def test_search_limit_and_no_match(sample_players):
+    """Test limit is respected and unknown names return nothing"""
+    index = PlayerSearchIndex(sample_players)
+    assert ids(index.search('alexander', limit=1)) == [1]
+    assert index.search('wembanyama') == []
+    assert index.search('a') == []
+    assert index.search('james', limit=0) == []
+
+
+def test_edit_distance():
+    """Test bounded edit distance with transpositions"""
+    assert edit_distance('curry', 'curry', 2) == 0
+    assert edit_distance('stehpen', 'stephen', 2) == 1
+    assert edit_distance('antetokoumpo', 'antetokounmpo', 2) == 1
+    assert edit_distance('james', 'harden', 2) == 3
+
+
+def test_fuzzy_search_misspellings(sample_players):
+    """Test misspelled queries come back within the edit budget"""
+    index = PlayerSearchIndex(sample_players)
+    assert index.search('Stehpen Curry') == []
+    assert ids(index.search('Stehpen Curry', fuzzy=True)) == [2]
+    assert ids(index.search('lebrn', fuzzy=True)) == [6]
+    assert ids(index.search('Doncic', fuzzy=True)) == [3]
+
+
+def test_fuzzy_search_ranked_by_distance(sample_players):
+    """Test exact matches come before closer-edit matches"""
+    index_players = sample_players + [
+        {'PERSON_ID': 9, 'DISPLAY_FIRST_LAST': 'Nikola Jović', 'TEAM_ABBREVIATION': 'MIA', 'ROSTERSTATUS': 1},
+    ]
+    index = PlayerSearchIndex(index_players)
+    assert ids(index.search('jokic', fuzzy=True)) == [7, 9]
+    assert ids(index.search('jovic', fuzzy=True)) == [9, 7]
+
+
+def test_fuzzy_search_short_tokens_stay_exact(sample_players):
+    """Test very short tokens get no edit budget"""
+    index = PlayerSearchIndex(sample_players)
+    assert index.search('fix', fuzzy=True) == []
+
+
+def test_keystroke_narrowing_cache(sample_players):
+    """Test longer queries are narrowed from a cached prefix result"""
+    index = PlayerSearchIndex(sample_players)
+    assert ids(index.search('le')) == [6, 1, 4]
+    # "leb" is not cached yet: answered by filtering the cached "le" rows
+    index._ngrams.clear()
+    assert ids(index.search('leb')) == [6]
+    assert ids(index.search('lebron')) == [6]
+    assert ids(index.search('le')) == [6, 1, 4]
+    assert index.query_cache_stats()['hits'] == 1
+
+
+def test_lru_cache_limits():
+    """Test LRU eviction by entry count and total weight"""
+    cache = LRUCache(max_entries=2, max_weight=5, weigher=len)
+    cache.set('a', {1, 2})
+    cache.set('b', {3})
+    cache.get('a')
+    cache.set('c', {4})
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+
+    cache.set('d', {5, 6, 7, 8})
+    assert 'a' not in cache
+    assert 'c' in cache and 'd' in cache
+    assert cache.stats()['weight'] == 5
+
+    cache.set('too-big', set(range(10)))
+    assert 'too-big' not in cache
+
+
+def test_ttl_cache_expiry():
+    """Test TTL entries expire and the cache stays bounded"""
+    now = [100.0]
+    cache = TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    cache.set('a', 'timeout')
+    now[0] = 109.0
+    assert cache.get('a') == 'timeout'
+    now[0] = 110.0
+    assert cache.get('a') is None
+    assert 'a' not in cache
+
+    for key in ('b', 'c', 'd'):
+        cache.set(key, key)
+    assert len(cache) == 2 and 'b' not in cache
+
+
+def test_ranking_tiers(sample_players):
+    """Test whole-token matches beat prefixes, which beat substrings"""
+    index = PlayerSearchIndex(sample_players)
+    # "alex": prefix of "alexander" in both names
+    assert ids(index.search('alex')) == [1, 4]
+    # "an": prefix of nothing, substring of several names
+    players = sample_players + [
+        {'PERSON_ID': 10, 'DISPLAY_FIRST_LAST': 'Anthony Davis', 'TEAM_ABBREVIATION': 'DAL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 11, 'DISPLAY_FIRST_LAST': 'Kevin Ant', 'TEAM_ABBREVIATION': '', 'ROSTERSTATUS': 1},
+    ]
+    index = PlayerSearchIndex(players)
+    assert ids(index.search('ant', limit=2)) == [11, 10]
+
+
+def test_ranking_boosts(sample_players):
+    """Test popularity and current-roster boosts order players within a tier"""
+    # Same scoring, but Bronny is off the roster
+    sample_players[4]['ROSTERSTATUS'] = 0
+    index = PlayerSearchIndex(sample_players, popularity={5: 25.0, 6: 25.0})
+    assert ids(index.search('james')) == [6, 5]
+
+    popularity = {5: 3.0, 6: 25.0}
+    sample_players[4]['ROSTERSTATUS'] = 1
+    index = PlayerSearchIndex(sample_players, popularity=popularity)
+    assert ids(index.search('james')) == [6, 5]
+    assert ids(index.search('james', boost=False)) == [5, 6]
+
+
+def test_alias_search(sample_players):
+    """Test nicknames and abbreviations resolve to players and rank first"""
+    aliases = {'SGA': 4, 'The King': 6, 'Chef Curry': 2, 'Wemby': 999}
+    index = PlayerSearchIndex(sample_players, aliases=aliases)
+    assert ids(index.search('sga')) == [4]
+    assert ids(index.search('the king')) == [6]
+    assert ids(index.search('Chef Curry', fuzzy=True)) == [2]
+    # Aliases for players not on this roster are ignored
+    assert index.search('wemby') == []
+
+    index = PlayerSearchIndex(sample_players, aliases={'Bron': 6})
+    assert ids(index.search('bron')) == [6, 5]
+
+
+def test_phonetic_codes():
+    """Test sound-alike spellings share a primary or alternate code"""
+    def sounds_alike(a, b):
+        return bool(set(phonetic_codes(a)) & set(phonetic_codes(b)))
+
+    assert sounds_alike('giannis', 'yanis')
+    assert sounds_alike('vucevic', 'vuchevich')
+    assert sounds_alike('doncic', 'donchich')
+    assert sounds_alike('schroder', 'shroder')
+    assert sounds_alike('stephen', 'steven')
+    assert not sounds_alike('curry', 'james')
+
+
+def test_phonetic_search(sample_players):
+    """Test phonetic mode finds names that sound alike"""
+    players = sample_players + [
+        {'PERSON_ID': 12, 'DISPLAY_FIRST_LAST': 'Giannis Antetokounmpo', 'TEAM_ABBREVIATION': 'MIL', 'ROSTERSTATUS': 1},
+        {'PERSON_ID': 13, 'DISPLAY_FIRST_LAST': 'Nikola Vučević', 'TEAM_ABBREVIATION': 'CHI', 'ROSTERSTATUS': 1},
+    ]
+    index = PlayerSearchIndex(players)
+    assert index.search('yanis') == []
+    assert ids(index.search('yanis', phonetic=True)) == [12]
+    assert ids(index.search('vuchevich', phonetic=True)) == [13]
+    assert ids(index.search('nikola vuchevich', phonetic=True)) == [13]
+    # Exact matches still rank ahead of sound-alikes ("Nickeil")
+    assert ids(index.search('nikola', phonetic=True)) == [7, 13, 1]
+
+
+@pytest.fixture
+def sample_details():
+    """Cached details for part of the sample roster"""
+    details = {
+        '2': {'team': 'Golden State Warriors', 'team_abbreviation': 'GSW', 'division': 'Pacific',
+              'conference': 'West', 'age': 37, 'height': '6-2', 'position': 'Guard', 'ppg': 24.5},
+        '3': {'team': 'Los Angeles Lakers', 'team_abbreviation': 'LAL', 'division': 'Pacific',
+              'conference': 'West', 'age': 26, 'height': '6-6', 'position': 'Guard-Forward', 'ppg': 33.0},
+        '5': {'team': 'Los Angeles Lakers', 'team_abbreviation': 'LAL', 'division': 'Pacific',
+              'conference': 'West', 'age': 21, 'height': '6-2', 'position': 'Guard', 'ppg': 2.1},
+        '6': {'team': 'Los Angeles Lakers', 'team_abbreviation': 'LAL', 'division': 'Pacific',
+              'conference': 'West', 'age': 40, 'height': '6-9', 'position': 'Forward', 'ppg': 24.0},
+        '7': {'team': 'Denver Nuggets', 'team_abbreviation': 'DEN', 'division': 'Northwest',
+              'conference': 'West', 'age': 30, 'height': '6-11', 'position': 'Center', 'ppg': 29.0},
+    }
+    return {
+        player_id_str: Player.from_dict({'id': int(player_id_str), 'name': '', **info})
+        for player_id_str, info in details.items()
+    }
+
+
+def test_facet_filter_masks(sample_players, sample_details):
+    """Test category and range filters combine as bitmask ANDs"""
+    facets = FacetIndex(sample_players, sample_details)
+    rows = lambda mask: list(iter_rows(mask))
+
+    assert facets.filter_mask({}) is None
+    assert facets.filter_mask({'team': None}) is None
+    # Pacific-division guards: Curry, Dončić, Bronny
+    assert rows(facets.filter_mask({'division': 'pacific', 'position': 'guard'})) == [1, 2, 4]
+    assert rows(facets.filter_mask({'team': 'Los Angeles Lakers', 'position': 'Forward'})) == [2, 5]
+    assert rows(facets.filter_mask({'conference': 'Western', 'ppg_min': 25})) == [2, 6]
+    assert rows(facets.filter_mask({'height_min': 75, 'height_max': 81, 'age_max': 30})) == [2]
+    assert rows(facets.filter_mask({'age_min': 41})) == []
+    assert rows(facets.filter_mask({'team': 'nyk'})) == []
+    # Range filters come from the row-aligned player table; rows without details never match
+    assert facets.table.ids[facets.table.range_mask('ppg', 0)].tolist() == [2, 3, 5, 6, 7]
+    assert rows(facets.filter_mask({'ppg_min': 24.5})) == [1, 2, 6]
+
+    with pytest.raises(ValueError):
+        facets.filter_mask({'weight_min': 200})
+
+
+def test_filtered_search(sample_players, sample_details):
+    """Test search results are restricted to the filter mask"""
+    index = PlayerSearchIndex(sample_players, popularity={2: 24.5, 3: 33.0, 5: 2.1})
+    facets = FacetIndex(sample_players, sample_details)
+
+    guards = facets.filter_mask({'division': 'Pacific', 'position': 'guard'})
+    assert ids(index.search('', row_mask=guards)) == [3, 2, 5]
+    assert ids(index.search('james', row_mask=guards)) == [5]
+    assert index.search('jokic', row_mask=guards) == []
@@ -0,0 +1,71 @@
+"""
+Unit tests for the columnar player table
+"""
+import pytest
+import numpy as np
+from app.services.player_record import Player
+from app.services.player_table import PlayerTable
+
+
+@pytest.fixture
+def sample_table():
+    """Table over a few players, one with missing details"""
+    players = [
+        {'id': 1, 'name': 'LeBron James', 'team_abbreviation': 'LAL', 'division': 'Pacific',
+         'conference': 'West', 'age': 40, 'height': '6-9', 'position': 'Forward', 'jersey_number': 23, 'ppg': 24.0},
+        {'id': 2, 'name': 'Stephen Curry', 'team_abbreviation': 'GSW', 'division': 'Pacific',
+         'conference': 'West', 'age': 37, 'height': '6-2', 'position': 'Guard', 'jersey_number': 30, 'ppg': 24.5},
+        {'id': 3, 'name': 'Jalen Brunson', 'team_abbreviation': 'NYK', 'division': 'Atlantic',
+         'conference': 'East', 'age': 29, 'height': '6-2', 'position': 'Guard', 'jersey_number': 11, 'ppg': 26.0},
+        {'id': 4, 'name': 'Unknown Rookie', 'team_abbreviation': '', 'age': None, 'height': '', 'ppg': 0.0},
+    ]
+    return PlayerTable({str(p['id']): Player.from_dict(p) for p in players})
+
+
+def test_columns_and_rows(sample_table):
+    """Test numeric columns and the id -> row index"""
+    assert len(sample_table) == 4
+    assert sample_table.row(3) == 2
+    assert sample_table.row(99) is None
+    assert sample_table.height.tolist() == [81, 74, 74, -1]
+    assert sample_table.labels['conference'] == ['', 'East', 'West']
+
+
+def test_rows_without_details():
+    """Test a row-aligned table treats missing players as unknown in every column"""
+    table = PlayerTable.from_rows([None, Player(id=7, name='Nikola Jokic', age=30, ppg=29.0, conference='West')])
+    assert len(table) == 2
+    assert table.row(7) == 1
+    assert table.range_mask('ppg', 0).tolist() == [False, True]
+    assert table.range_mask('age').tolist() == [False, True]
+    assert table.equals_mask('conference', 'West').tolist() == [False, True]
+    assert table.compare('ppg', 7).tolist() == [0, 0]
+    assert table.summary('ppg')['count'] == 1
+
+
+def test_masks(sample_table):
+    """Test vectorized range and category filters"""
+    assert sample_table.range_mask('age', 30).tolist() == [True, True, False, False]
+    assert sample_table.range_mask('height', high=75).tolist() == [False, True, True, False]
+    pacific_guards = sample_table.equals_mask('division', 'pacific') & sample_table.equals_mask('position', 'Guard')
+    assert sample_table.ids[pacific_guards].tolist() == [2]
+    assert not sample_table.equals_mask('team_abbreviation', 'BOS').any()
+
+
+def test_compare(sample_table):
+    """Test higher/lower directions against a target for every row at once"""
+    assert sample_table.compare('age', 2).tolist() == [-1, 0, 1, 0]
+    assert sample_table.compare('ppg', 3).tolist() == [1, 1, 0, 1]
+    assert sample_table.compare('age', 99).tolist() == [0, 0, 0, 0]
+
+
+def test_summary(sample_table):
+    """Test aggregates skip missing values"""
+    summary = sample_table.summary('age')
+    assert summary['count'] == 3
+    assert summary['min'] == 29 and summary['max'] == 40
+    west = sample_table.equals_mask('conference', 'West')
+    assert sample_table.summary('ppg', west)['mean'] == 24.25
+    assert sample_table.summary('age', np.zeros(4, dtype=bool))['count'] == 0
+    with pytest.raises(ValueError):
+        sample_table.summary('weight')
@@ -0,0 +1,135 @@
+"""
+Unit tests for the deadline-budgeted retry policy
+"""
+import pytest
+import requests
+from app.services.retry import (
+    DeadlineExceeded, RetryPolicy, current_deadline, deadline_scope, is_retryable, request_timeout
+)
+
+
+@pytest.fixture
+def clock():
+    now = [0.0]
+    return now
+
+
+def make_policy(clock, sleeps, **kwargs):
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+    return RetryPolicy(sleep=sleep, rng=lambda: 1.0, **kwargs)
+
+
+def flaky(failures, error=ConnectionError("Connection reset by peer")):
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return 'ok'
+    return call, calls
+
+
+def test_backoff_with_jitter(clock):
+    """Test waits double per attempt, cap at max_delay and keep their jitter within range"""
+    policy = RetryPolicy(base_delay=0.5, max_delay=1.5, jitter=0.5, rng=lambda: 1.0)
+    assert [policy.backoff(attempt) for attempt in (1, 2, 3)] == [0.25, 0.5, 0.75]
+    assert RetryPolicy(base_delay=0.5, jitter=0.5, rng=lambda: 0.0).backoff(1) == 0.5
+
+    sleeps = []
+    func, calls = flaky(2)
+    assert make_policy(clock, sleeps, max_attempts=3, base_delay=0.5, jitter=0.5).call(func) == 'ok'
+    assert len(calls) == 3
+    assert sleeps == [0.25, 0.5]
+
+
+def test_only_retryable_errors_are_retried(clock):
+    """Test unknown players and 404s fail at once while timeouts and 503s are retried"""
+    sleeps = []
+    policy = make_policy(clock, sleeps, max_attempts=3)
+    func, calls = flaky(1, ValueError('Player 1 not found'))
+    with pytest.raises(ValueError):
+        policy.call(func)
+    assert len(calls) == 1
+
+    def http_error(status):
+        response = requests.Response()
+        response.status_code = status
+        return requests.exceptions.HTTPError(response=response)
+
+    assert is_retryable(requests.exceptions.ReadTimeout())
+    assert is_retryable(http_error(503))
+    assert not is_retryable(http_error(404))
+    assert not is_retryable(DeadlineExceeded())
+
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
+    func, calls = flaky(0)
+    assert RetryPolicy(max_attempts=1).call(func) == 'ok'
+
+
+def test_retries_stay_within_deadline(clock):
+    """Test no retry is attempted once its wait would outlast the request deadline"""
+    sleeps = []
+    policy = make_policy(clock, sleeps, max_attempts=5, base_delay=1.0, jitter=0)
+    func, calls = flaky(10)
+    with deadline_scope(2.5, clock=lambda: clock[0]) as deadline:
+        with pytest.raises(ConnectionError):
+            policy.call(func)
+        # Waited 1s, then a 2s wait would reach the deadline
+        assert sleeps == [1.0]
+        assert len(calls) == 2
+        assert request_timeout(1.0, 5.0) == (1.0, 1.5)
+
+        clock[0] += 2.0
+        assert deadline.expired
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(1.0, 5.0)
+        with pytest.raises(DeadlineExceeded):
+            policy.call(func)
+    assert current_deadline() is None
+    assert request_timeout(1.0, 5.0) == (1.0, 5.0)
+
+
+def test_nested_scope_never_extends_deadline(clock):
+    """Test an inner scope keeps the earlier of the two deadlines"""
+    with deadline_scope(2.0, clock=lambda: clock[0]) as outer:
+        with deadline_scope(10.0, clock=lambda: clock[0]) as inner:
+            assert inner is outer
+        with deadline_scope(1.0, clock=lambda: clock[0]) as inner:
+            assert inner.remaining() == 1.0
+        assert current_deadline() is outer
+
+
+def test_replayed_503_is_retried(tmp_path, clock):
+    """Test a throttled stats.nba.com response reaches the policy as a retryable HTTPError"""
+    import json
+    from nba_api.stats.endpoints import commonplayerinfo
+    from nba_api.stats.library.http import NBAStatsHTTP
+    from app.services.http_pool import create_session, install_nba_api_session
+    from app.services.transport import REPLAY, MissingFixtureError, TransportAdapter
+
+    adapter = TransportAdapter(REPLAY, tmp_path)
+    previous = NBAStatsHTTP.get_session()
+    install_nba_api_session(create_session(adapter=adapter))
+    try:
+        def fetch():
+            return commonplayerinfo.CommonPlayerInfo(player_id=2544, timeout=5)
+
+        with pytest.raises(MissingFixtureError) as missing:
+            fetch()
+        missing.value.path.write_text(json.dumps({
+            'status_code': 503, 'reason': 'Service Unavailable',
+            'body': '<html><body>Service Unavailable</body></html>'
+        }), encoding='utf-8')
+
+        sleeps = []
+        with pytest.raises(requests.exceptions.HTTPError) as error:
+            make_policy(clock, sleeps, max_attempts=3).call(fetch)
+        assert error.value.response.status_code == 503
+        assert len(sleeps) == 2
+        assert adapter.replayed == 3
+    finally:
+        NBAStatsHTTP.set_session(previous)
@@ -0,0 +1,102 @@
+"""
+Unit tests for single-flight coalescing of upstream calls
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    """Test threads asking for the same key while it runs get the leader's result"""
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(player_id):
+        calls.append(player_id)
+        started.set()
+        release.wait(5)
+        return {'id': player_id}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, ('CommonPlayerInfo', 2544, None), fetch, 2544)
+        started.wait(5)
+        followers = [pool.submit(flight.do, ('CommonPlayerInfo', 2544, None), fetch, 2544) for _ in range(4)]
+        while flight.stats()['coalesced'] < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        results = [leader.result()] + [follower.result() for follower in followers]
+
+    assert calls == [2544]
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'calls': 1, 'coalesced': 4, 'in_flight': 0}
+
+    # Finished calls are forgotten, not cached
+    flight.do(('CommonPlayerInfo', 2544, None), fetch, 2544)
+    assert calls == [2544, 2544]
+
+
+def test_errors_are_shared_and_keys_independent():
+    """Test a failing call raises for every waiter and other keys run separately"""
+    flight = SingleFlight()
+
+    def failing():
+        raise ConnectionError("Read timed out")
+
+    with pytest.raises(ConnectionError):
+        flight.do(('PlayerGameLog', 2544, '2025-26'), failing)
+    assert flight.do(('PlayerGameLog', 2544, '2024-25'), lambda: 'ok') == 'ok'
+    assert flight.in_flight == 0
+
+
+async def test_async_callers_share_one_executor_job():
+    """Test concurrent awaits for one key run a single job on the executor"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch(player_id, season):
+        calls.append((player_id, season))
+        release.wait(5)
+        return player_id
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        waiters = [
+            asyncio.ensure_future(flight.ado(('get_player_details', 2544, '2025-26'), pool, fetch, 2544, '2025-26'))
+            for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == [2544] * 10
+
+    assert calls == [(2544, '2025-26')]
+    assert flight.stats()['coalesced'] == 9
+
+
+async def test_cancelled_waiter_leaves_shared_call_running():
+    """Test cancelling one awaiting caller doesn't cancel the call for the others"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return 'details'
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        waiters = [asyncio.ensure_future(flight.ado('key', pool, fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        waiters[1].cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await waiters[0] == 'details'
+        assert await waiters[2] == 'details'
+        with pytest.raises(asyncio.CancelledError):
+            await waiters[1]
+
+    assert calls == [1]
+    assert flight.in_flight == 0
@@ -0,0 +1,102 @@
+"""
+Unit tests for the memory-mapped player snapshot
+"""
+import json
+import os
+import pytest
+from app.services.player_record import Player
+from app.services.snapshot import PlayerSnapshot, open_snapshot, write_snapshot
+
+
+ROSTER = [
+    {'PERSON_ID': 2544, 'DISPLAY_LAST_COMMA_FIRST': 'James, LeBron', 'DISPLAY_FIRST_LAST': 'LeBron James',
+     'ROSTERSTATUS': 1, 'TEAM_ID': 1610612747, 'TEAM_CITY': 'Los Angeles', 'TEAM_NAME': 'Lakers',
+     'TEAM_ABBREVIATION': 'LAL', 'TEAM_SLUG': None},
+    {'PERSON_ID': 1629029, 'DISPLAY_LAST_COMMA_FIRST': 'Dončić, Luka', 'DISPLAY_FIRST_LAST': 'Luka Dončić',
+     'ROSTERSTATUS': 1, 'TEAM_ID': 1610612747, 'TEAM_CITY': 'Los Angeles', 'TEAM_NAME': 'Lakers',
+     'TEAM_ABBREVIATION': 'LAL', 'TEAM_SLUG': 'lakers'},
+]
+DETAILS = {
+    '2544': {'id': 2544, 'name': 'LeBron James', 'team': 'Lakers', 'team_abbreviation': 'LAL',
+             'division': 'Pacific', 'conference': 'West', 'age': 40, 'height': '6-9', 'position': 'Forward',
+             'jersey_number': 23, 'ppg': 24.4, 'image_url': None, 'season': '2025-26'},
+    '1629029': {'id': 1629029, 'name': 'Luka Dončić', 'team': 'Lakers', 'team_abbreviation': 'LAL',
+                'division': 'Pacific', 'conference': 'West', 'age': 26, 'height': '6-6', 'position': 'Guard',
+                'jersey_number': None, 'ppg': 28.2, 'image_url': 'https://example.com/1629029.png',
+                'season': None},
+}
+
+
+@pytest.fixture
+def cache_files(tmp_path):
+    """Players list and details caches in the JSON shapes the app writes"""
+    players_file = tmp_path / 'players_cache.json'
+    details_file = tmp_path / 'player_details_cache.json'
+    players_file.write_text(json.dumps({'season': '2025-26', 'players': ROSTER}), encoding='utf-8')
+    details_file.write_text(json.dumps({'last_updated': 'x', 'players': DETAILS}), encoding='utf-8')
+    return tmp_path / 'players_snapshot.bin', players_file, details_file
+
+
+def test_round_trip(cache_files):
+    """Test the snapshot decodes to the same roster and details as the JSON"""
+    snapshot_file, players_file, details_file = cache_files
+    write_snapshot(snapshot_file, players_file, details_file)
+    snapshot = PlayerSnapshot(snapshot_file)
+
+    assert snapshot.season == '2025-26'
+    roster = snapshot.roster()
+    assert [player['DISPLAY_FIRST_LAST'] for player in roster] == ['LeBron James', 'Luka Dončić']
+    assert roster[0]['TEAM_SLUG'] is None
+    assert roster[1]['TEAM_ID'] == 1610612747
+
+    assert list(snapshot.details()) == [Player.from_dict(info) for info in DETAILS.values()]
+    assert snapshot.find_detail_rows(1629029) == [1]
+    assert snapshot.find_detail_rows(201939) == []
+    snapshot.close()
+
+
+def test_rebuilt_when_sources_change(cache_files):
+    """Test open_snapshot reuses a fresh snapshot and rebuilds a stale one"""
+    snapshot_file, players_file, details_file = cache_files
+    snapshot = open_snapshot(snapshot_file, players_file, details_file)
+    assert snapshot.matches_sources(players_file, details_file)
+    snapshot.close()
+
+    details = dict(DETAILS, **{'201939': dict(DETAILS['2544'], id=201939, name='Stephen Curry')})
+    details_file.write_text(json.dumps({'players': details}), encoding='utf-8')
+    os.utime(details_file, ns=(0, 10 ** 18))
+
+    snapshot = open_snapshot(snapshot_file, players_file, details_file)
+    assert snapshot.details_count == 3
+    assert snapshot.detail(snapshot.find_detail_rows(201939)[0]).name == 'Stephen Curry'
+    snapshot.close()
+
+
+def test_multiple_seasons(cache_files):
+    """Test the per-season cache layout gets one record per (player, season)"""
+    snapshot_file, players_file, details_file = cache_files
+    seasons = {
+        '2025-26': {'2544': DETAILS['2544']},
+        '2024-25': {'2544': dict(DETAILS['2544'], ppg=24.4, age=39, season='2024-25')},
+        'general': {'1629029': DETAILS['1629029']},
+    }
+    details_file.write_text(json.dumps({'seasons': seasons}), encoding='utf-8')
+    write_snapshot(snapshot_file, players_file, details_file)
+    snapshot = PlayerSnapshot(snapshot_file)
+
+    rows = snapshot.find_detail_rows(2544)
+    assert sorted(snapshot.detail(row).season for row in rows) == ['2024-25', '2025-26']
+    assert snapshot.find_detail_rows(1629029) == [2]
+    snapshot.close()
+
+
+def test_detail_records_read_on_demand(cache_files):
+    """Test detail records are decoded from the mapping per access and never kept"""
+    snapshot_file, players_file, details_file = cache_files
+    write_snapshot(snapshot_file, players_file, details_file)
+    snapshot = PlayerSnapshot(snapshot_file)
+
+    assert snapshot.detail(0) == snapshot.detail(0)
+    assert snapshot.detail(0) is not snapshot.detail(0)
+    assert not hasattr(snapshot, '_details')
+    snapshot.close()
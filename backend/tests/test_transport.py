@@ -0,0 +1,158 @@
+"""
+Unit tests for the record / replay / fault-injecting upstream transport
+"""
+import json
+import pytest
+import requests
+from app.services.http_pool import create_session, session_stats
+from app.services.transport import (
+    MissingFixtureError, TransportAdapter, TransportConfig, RECORD, REPLAY, fixture_path
+)
+
+
+def test_record_then_replay_offline(server, tmp_path):
+    """Test recorded responses replay without the server, regardless of query order"""
+    recorder = create_session(adapter=TransportAdapter(RECORD, tmp_path))
+    live = recorder.get(f"{server}/stats/commonplayerinfo", params={'PlayerID': 2544, 'LeagueID': ''})
+    assert session_stats(recorder)['recorded'] == 1
+
+    replayer = create_session(adapter=TransportAdapter(REPLAY, tmp_path))
+    replayed = replayer.get(f"{server}/stats/commonplayerinfo?LeagueID=&PlayerID=2544")
+    assert replayed.status_code == 200
+    assert replayed.json() == live.json()
+
+    with pytest.raises(MissingFixtureError) as error:
+        replayer.get(f"{server}/stats/commonplayerinfo", params={'PlayerID': 1629029})
+    assert error.value.path.name.startswith('commonplayerinfo-')
+    assert session_stats(replayer)['missing_fixtures'] == 1
+
+
+def test_injected_latency_and_errors(tmp_path):
+    """Test latency past the timeout becomes a ReadTimeout and error_rate fails requests"""
+    url = 'https://stats.nba.com/stats/playergamelog?PlayerID=2544'
+    fixture = fixture_path(tmp_path, url)
+    fixture.write_text(json.dumps({'status_code': 200, 'body': '{}'}), encoding='utf-8')
+
+    sleeps = []
+    slow = create_session(adapter=TransportAdapter(REPLAY, tmp_path, latency=10, sleep=sleeps.append))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        slow.get(url, timeout=2)
+    assert slow.get(url, timeout=30).json() == {}
+    assert sleeps == [2, 10]
+
+    config = TransportConfig.from_env({'NBA_API_TRANSPORT': 'replay', 'NBA_API_FIXTURES_DIR': str(tmp_path),
+                                       'NBA_API_ERROR_RATE': '0.5', 'NBA_API_FAULT_SEED': '7'})
+
+    def outcomes():
+        flaky = create_session(adapter=config.adapter())
+        results = []
+        for _ in range(20):
+            try:
+                flaky.get(url)
+                results.append('ok')
+            except requests.exceptions.ConnectionError:
+                results.append('error')
+        return results
+
+    first = outcomes()
+    assert first == outcomes()
+    assert 'ok' in first and 'error' in first
+
+    with pytest.raises(ValueError):
+        TransportAdapter('mock', tmp_path)
+
+
+def test_service_miss_path_uses_replayed_response(make_service, tmp_path):
+    """Test a details miss is served from a recorded CommonPlayerInfo response"""
+    from nba_api.stats.endpoints import commonplayerinfo
+    from app.services.details_cache import iter_cached_details
+
+    fixtures_dir = tmp_path / 'fixtures'
+    # An isolated service: its cache files and fetched details stay under tmp_path
+    service = make_service(transport=TransportConfig(mode=REPLAY, fixtures_dir=fixtures_dir))
+    with pytest.raises(MissingFixtureError) as error:
+        commonplayerinfo.CommonPlayerInfo(player_id=1641705, timeout=5)
+    headers = ['PERSON_ID', 'DISPLAY_FIRST_LAST', 'BIRTHDATE', 'HEIGHT', 'POSITION',
+               'JERSEY', 'TEAM_ID', 'TEAM_NAME', 'TEAM_ABBREVIATION']
+    row = [1641705, 'Victor Wembanyama', '2004-01-04T00:00:00', '7-4', 'Center',
+           '1', None, 'Spurs', 'SAS']
+    body = {'resultSets': [
+        {'name': 'CommonPlayerInfo', 'headers': headers, 'rowSet': [row]},
+        {'name': 'PlayerHeadlineStats', 'headers': [], 'rowSet': []},
+        {'name': 'AvailableSeasons', 'headers': [], 'rowSet': []}
+    ]}
+    error.value.path.parent.mkdir(parents=True)
+    error.value.path.write_text(json.dumps({'status_code': 200, 'body': json.dumps(body)}), encoding='utf-8')
+
+    # Game log has no recording, so ppg falls back to 0.0 like any failed stats lookup
+    details = service._fetch_player_details(1641705, '2099-00')
+    assert (details.name, details.height, details.jersey_number, details.ppg) == \
+        ('Victor Wembanyama', '7-4', 1, 0.0)
+
+    service._flush_player_details_cache()
+    assert service._player_details_cache_file.parent == tmp_path
+    saved = json.loads(service._player_details_cache_file.read_text(encoding='utf-8'))
+    assert any(entry['season'] == '2099-00' for entry in iter_cached_details(saved))
+
+
+def test_suite_traffic_goes_through_replay():
+    """Test the app's nba_api traffic is answered by the replay transport, never the network"""
+    from nba_api.stats.endpoints import commonplayerinfo
+    from nba_api.stats.library.http import NBAStatsHTTP
+    from app.routes.game import nba_service
+
+    assert nba_service.transport.mode == REPLAY
+    assert NBAStatsHTTP.get_session() is nba_service.session
+    missing = session_stats(nba_service.session)['missing_fixtures']
+    with pytest.raises(MissingFixtureError):
+        commonplayerinfo.CommonPlayerInfo(player_id=1, timeout=1)
+    assert session_stats(nba_service.session)['missing_fixtures'] == missing + 1
+
+
+@pytest.mark.parametrize('server', [503], indirect=True)
+def test_recorded_error_status_replays_as_http_error(server, tmp_path):
+    """Test a recorded 503 is saved as-is and raises HTTPError when recorded and replayed"""
+    recorder = create_session(adapter=TransportAdapter(RECORD, tmp_path))
+    with pytest.raises(requests.exceptions.HTTPError):
+        recorder.get(f"{server}/stats/playergamelog", params={'PlayerID': 2544})
+    replayer = create_session(adapter=TransportAdapter(REPLAY, tmp_path))
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        replayer.get(f"{server}/stats/playergamelog", params={'PlayerID': 2544})
+    assert error.value.response.status_code == 503
+
+
+def test_service_fallbacks_under_injected_faults(make_service):
+    """Test retry, stale-while-revalidate, circuit breaker and deadline fallbacks against the committed recordings"""
+    import threading
+    from app.services.circuit_breaker import OPEN
+    from app.services.player_record import Player
+    from app.services.retry import deadline_scope
+
+    # Seed 1 fails the first request only: CommonPlayerInfo is retried and succeeds
+    flaky = make_service(transport=TransportConfig(mode=REPLAY, error_rate=0.5, fault_seed=1))
+    details = flaky.get_player_details(1628973, '2024-25')
+    assert (details.name, details.team, details.ppg) == ('Jalen Brunson', 'Knicks', 26.0)
+    assert session_stats(flaky.session)['injected_errors'] >= 1
+
+    # Every request fails: a stale entry is served and kept, then the circuit opens
+    down = make_service(transport=TransportConfig(mode=REPLAY, error_rate=1.0), circuit_failure_threshold=2)
+    stale = Player(id=1628973, name='Jalen Brunson', ppg=24.0, season='2024-25')
+    down._player_details_cache.put(stale, fetched_at=0.0)
+    assert down.get_player_details(1628973, '2024-25') is stale
+    for _ in range(100):
+        if not down._refreshing:
+            break
+        threading.Event().wait(0.02)
+    assert down.get_player_details(1628973, '2024-25') is stale
+    assert down.circuit_breaker.state == OPEN
+    injected = session_stats(down.session)['injected_errors']
+    # Open circuit: no upstream request, the cached details from another season are served
+    assert down.get_player_details(1628973, '2023-24') is stale
+    assert session_stats(down.session)['injected_errors'] == injected
+
+    # Latency: the player info arrives, the game log times out within the request deadline
+    slow = make_service(transport=TransportConfig(mode=REPLAY, latency=0.3))
+    with deadline_scope(0.5):
+        details = slow._fetch_player_details(1628973, '2024-25')
+    assert (details.name, details.ppg) == ('Jalen Brunson', 0.0)
+    assert session_stats(slow.session)['injected_timeouts'] == 1
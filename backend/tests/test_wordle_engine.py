@@ -3,6 +3,7 @@ Unit tests for Wordle Engine game logic
 """
 import pytest
 from app.services.wordle_engine import WordleEngine
+from app.services.player_record import Player, GUESSED_PLAYER_FIELDS
 
 
 @pytest.fixture
@@ -464,3 +465,21 @@ def test_duplicate_guess_prevention(sample_target_player, sample_guessed_player)
     different_player['name'] = 'Different Player'
     result2 = engine.make_guess(different_player)
     assert result2['guess_number'] == 2
+
+
+def test_player_records(sample_target_player, sample_guessed_player):
+    """Test the engine works on shared Player records without copying them"""
+    target = Player.from_dict(sample_target_player)
+    guessed = Player.from_dict(sample_guessed_player)
+    engine = WordleEngine(target)
+    
+    result = engine.make_guess(guessed)
+    assert result['guessed_player'] is guessed
+    assert result['comparison']['conference']['status'] == 'correct'
+    assert engine.get_game_state()['target_player_id'] == 1
+    
+    # Records round-trip to the JSON dict shape
+    assert guessed.to_dict(GUESSED_PLAYER_FIELDS) == {
+        key: sample_guessed_player.get(key) for key in GUESSED_PLAYER_FIELDS
+    }
+    assert Player.from_dict(target.to_dict()) == target
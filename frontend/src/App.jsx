@@ -4,6 +4,45 @@ import './App.css'
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 
+// Mirrors normalize_name in backend/app/services/player_index.py
+const normalizeName = (text) =>
+  (text || '')
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/[-_/\s]+/g, ' ')
+    .replace(/[^a-z0-9 ]/g, '')
+    .trim()
+
+// Rank like the backend: alias, whole token, token prefix, then substring, and
+// within a tier by the bundle's precomputed popularity/roster rank. Returns null
+// when nothing beats a substring match, so the server can try typos and sound-alikes.
+const searchRosterBundle = (bundle, query, limit) => {
+  const normalized = normalizeName(query)
+  if (normalized.length < 2) return []
+
+  const aliasId = bundle.aliases[normalized]
+  const ranked = []
+  bundle.players.forEach(([id, name, team, key, rank]) => {
+    const padded = ` ${key} `
+    let tier
+    if (id === aliasId) tier = 0
+    else if (padded.includes(` ${normalized} `)) tier = 1
+    else if (padded.includes(` ${normalized}`)) tier = 2
+    else if (key.includes(normalized)) tier = 3
+    else return
+    ranked.push({ tier, rank, player: {
+      id,
+      name,
+      team,
+      image_url: `https://cdn.nba.com/headshots/nba/latest/1040x760/${id}.png`
+    } })
+  })
+  if (!ranked.some((entry) => entry.tier <= 2)) return null
+  ranked.sort((a, b) => a.tier - b.tier || a.rank - b.rank)
+  return ranked.slice(0, limit).map((entry) => entry.player)
+}
+
 // NBA Logo Component - Using official NBA logo from NBA CDN
 const NBALogo = ({ className }) => {
   return (
@@ -58,11 +97,25 @@ function App() {
   const [isLoading, setIsLoading] = useState(false)
   const [error, setError] = useState(null)
   const [showOverlay, setShowOverlay] = useState(false)
+  const [rosterBundle, setRosterBundle] = useState(null)
 
   useEffect(() => {
     startNewGame()
+    loadRosterBundle()
   }, [])
 
+  // Download the season roster once; the versioned URL is cached by the browser
+  const loadRosterBundle = async () => {
+    try {
+      const info = await axios.get(`${API_BASE_URL}/api/roster-bundle`)
+      const bundle = await axios.get(`${API_BASE_URL}${info.data.url}`)
+      setRosterBundle(bundle.data)
+    } catch (err) {
+      // Search keeps using /api/player-search
+      console.error(err)
+    }
+  }
+
   const startNewGame = async () => {
     try {
       setIsLoading(true)
@@ -92,11 +145,21 @@ function App() {
       return
     }
 
+    if (rosterBundle) {
+      const localResults = searchRosterBundle(rosterBundle, query, 10)
+      if (localResults) {
+        setSearchResults(localResults)
+        return
+      }
+    }
+
     try {
       const response = await axios.get(`${API_BASE_URL}/api/player-search`, {
         params: { 
           q: query, 
-          limit: 10
+          limit: 10,
+          fuzzy: true,
+          phonetic: true
         }
       })
       setSearchResults(response.data)